@@ -0,0 +1,101 @@
+"""
+Benchmark solving exported model files with each OR-Tools backend, against building the same models from Python.
+
+Models of a synthetic meet are exported once, then every backend loads and solves the same files, so solvers can be
+compared without the Python model build in the way. For example
+`uv run benchmarks/bench_model_files.py --swimmers 1000 --days 6 --backends SAT,CBC,SCIP,HIGHS`
+"""
+
+import argparse
+import contextlib
+import io
+import math
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.resolve() / "src"))
+
+from solvers.full_meet_solver import FullMeetSolver
+from solvers.model_files import LOAD_FORMATS, load_model
+from solvers.single_day_solver import SingleDaySolver
+from synthetic_meet import COST_DISTRIBUTIONS, generate_meet
+from utils.constants import SWITCHES
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+MODELS_DIR = ROOT_DIR / "models"
+
+
+def export_models(args: argparse.Namespace) -> dict[Path, float]:
+    """Export the single day and full meet models of a synthetic meet, returning how long each took to build and write."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser = generate_meet(args.swimmers, args.days, cost_distribution=args.costs, seed=args.seed)
+        parser.update_seeds()
+        parser.update_projected_points()
+
+    solvers = {f"day-{day}": SingleDaySolver(parser.data, day) for day in range(1, args.days + 1)}
+    if args.full_meet_days:
+        full_meet_days = min(args.full_meet_days, args.days)
+        solvers[f"days-1-{full_meet_days}"] = FullMeetSolver(parser.data, SWITCHES, 1, full_meet_days)
+
+    build_times = {}
+    for name, solver in solvers.items():
+        path = args.model_dir / f"{args.swimmers}-swimmers-{name}{args.format}"
+        start = time.perf_counter()
+        solver.export_model(path)
+        build_times[path] = time.perf_counter() - start
+
+    return build_times
+
+
+def solve_model_file(path: Path, backend: str, time_limit: float) -> dict:
+    """Load and solve a model file with a backend, returning the load and solve times and the objective value."""
+    start = time.perf_counter()
+    solver, _ = load_model(path, backend)
+    load_time = time.perf_counter() - start
+
+    solver.SetTimeLimit(int(time_limit * 1000))
+    start = time.perf_counter()
+    status = solver.Solve()
+    solve_time = time.perf_counter() - start
+
+    objective_value = solver.Objective().Value() if status in (solver.OPTIMAL, solver.FEASIBLE) else math.nan
+    return {"load": load_time, "solve": solve_time, "optimal": status == solver.OPTIMAL, "objective_value": objective_value}
+
+
+def main() -> None:
+    """Export the models, solve each with every backend, and fail if the backends disagree on an optimal objective."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--swimmers", type=int, default=500, help="number of swimmers in the synthetic meet")
+    arg_parser.add_argument("--days", type=int, default=6, help="number of days in the synthetic meet")
+    arg_parser.add_argument("--costs", choices=COST_DISTRIBUTIONS, default="skill", help="how swimmer costs are drawn")
+    arg_parser.add_argument("--full-meet-days", type=int, default=3, help="number of days to export the full meet model for (0 to skip)")
+    arg_parser.add_argument("--seed", type=int, default=0, help="random seed for generating the meet")
+    arg_parser.add_argument("--format", choices=LOAD_FORMATS, default=".pb", help="format to export the models in")
+    arg_parser.add_argument("--backends", default="SAT,CBC,SCIP,HIGHS", help="comma separated OR-Tools backends to solve with")
+    arg_parser.add_argument("--time-limit", type=float, default=60, help="seconds each backend gets for each model")
+    arg_parser.add_argument("--model-dir", type=Path, default=MODELS_DIR, help="directory to export the models to")
+    args = arg_parser.parse_args()
+
+    build_times = export_models(args)
+    backends = args.backends.split(",")
+
+    disagreements = []
+    print(f"{'Model':<36}{'Backend':>8}{'Export':>9}{'Load':>9}{'Solve':>9}{'Objective':>11}")
+    for path, build_time in build_times.items():
+        objective_values = set()
+        for backend in backends:
+            result = solve_model_file(path, backend, args.time_limit)
+            if result["optimal"]:
+                objective_values.add(round(result["objective_value"], 6))
+            objective = f"{result['objective_value']:.0f}" + ("" if result["optimal"] else "*")
+            print(f"{path.stem:<36}{backend:>8}{build_time:>9.3f}{result['load']:>9.3f}{result['solve']:>9.3f}{objective:>11}")
+        if len(objective_values) > 1:
+            disagreements.append(f"Backends disagree on the optimal objective of {path.name}: {sorted(objective_values)}")
+
+    print("\n* not proven optimal within the time limit")
+    if disagreements:
+        sys.exit("\n".join(disagreements))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Benchmark every stage of the pipeline for every psych sheet in PsychSheets/, offline.
+
+Schedules and base times come from a frozen fixture, so results only change when the code does. Create or refresh
+the fixture with `uv run benchmarks/bench_pipeline.py --freeze`, then e.g.
+`uv run benchmarks/bench_pipeline.py --output before.json` and, after a change,
+`uv run benchmarks/bench_pipeline.py --baseline before.json` to flag stages that got slower.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.resolve() / "src"))
+
+from data_parser import DataParser
+from meet import Meet
+from schedule_store import ScheduleStore
+from solvers.full_meet_solver import FullMeetSolver
+from solvers.single_day_solver import SingleDaySolver
+from utils.constants import SCHEDULE_URLS, SWITCHES
+
+BENCHMARKS_DIR = Path(__file__).parent.resolve()
+FIXTURE_PATH = BENCHMARKS_DIR / "fixtures" / "pipeline_fixture.json"
+RESULTS_FILE_PATH = BENCHMARKS_DIR.parent / "bench_pipeline_results.json"
+TEMPLATE_MEET = "2024 SCM Worlds" # Meet whose cached schedule the schedules of uncached meets are derived from
+TOP_K = 5 # Number of lineups to find for the top-K stage
+THRESHOLD = 1.25 # A stage is a regression if it takes this many times as long as in the baseline
+NOISE_FLOOR = 0.01 # Seconds a stage must slow down by to count as a regression, so tiny stages don't flag on noise
+
+
+def freeze_fixture(path: Path) -> None:
+    """
+    Save the schedule and base times of every meet to the fixture file.
+
+    Meets without a cached schedule get one derived from the template meet's schedule, keeping only the events in
+    their psych sheet, since the benchmark only needs a realistic schedule and shouldn't depend on the network.
+
+    Keyword Arguments:
+        path: the file to save the fixture to
+
+    """
+    store = ScheduleStore()
+    template = store.get(TEMPLATE_MEET)
+    if template is None:
+        sys.exit(f"The {TEMPLATE_MEET} schedule must be cached to derive the other schedules from.")
+
+    fixture = {}
+    for meet_name in SCHEDULE_URLS:
+        meet = Meet(meet_name, store)
+        with contextlib.redirect_stdout(io.StringIO()):
+            base_times = meet.base_times
+        schedule = store.get(meet_name)
+        source = "cached"
+        if schedule is None:
+            events = _get_psych_sheet_events(meet)
+            schedule = {day: [(event, event_round) for event, event_round in day_events if events is None or event in events] for day, day_events in template.items()}
+            source = f"derived from {TEMPLATE_MEET}"
+        fixture[meet_name] = {"schedule_source": source, "schedule": schedule, "base_times": base_times}
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(fixture, indent=4))
+    print(f"Froze the schedules and base times of {len(fixture)} meets to {path}")
+
+
+def benchmark_meet(meet_name: str, fixture: dict, *, windows: list[tuple[int, int]], repeat: int) -> dict:
+    """
+    Time each stage of the pipeline for one meet, keeping the best time of each stage over the repeats.
+
+    Keyword Arguments:
+        meet_name: the meet to benchmark
+        fixture: the frozen schedule and base times of the meet
+        windows: the (start day, end day) ranges to solve the full meet for, clamped to the meet's days
+        repeat: the number of times to run the pipeline
+
+    """
+    result = {"status": "ok", "timings": {}}
+    for _ in range(repeat):
+        timings = {}
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                _run_pipeline(meet_name, fixture, windows, timings)
+        except (Exception, SystemExit) as e:  # Older psych sheets use layouts the parser doesn't support yet
+            result["status"] = "unsupported"
+            result["error"] = f"{type(e).__name__}: {e}"
+        for stage, stage_time in timings.items():
+            result["timings"][stage] = min(stage_time, result["timings"].get(stage, stage_time))
+        if result["status"] != "ok":
+            break
+
+    return result
+
+
+def find_regressions(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Get a description of every stage that is slower than in the baseline by more than the threshold.
+
+    Keyword Arguments:
+        results: the results of this run
+        baseline: the results of an earlier run, e.g. from the previous commit
+        threshold: how many times as long as in the baseline a stage may take
+
+    """
+    regressions = []
+    for meet_name, meet_result in results["meets"].items():
+        baseline_timings = baseline["meets"].get(meet_name, {}).get("timings", {})
+        for stage, stage_time in meet_result["timings"].items():
+            baseline_time = baseline_timings.get(stage)
+            if baseline_time is None:
+                continue
+            if stage_time > baseline_time * threshold and stage_time - baseline_time > NOISE_FLOOR:
+                regressions.append(f"{meet_name} {stage}: {baseline_time:.3f} -> {stage_time:.3f} seconds ({stage_time / baseline_time:.2f}x)")
+
+    return regressions
+
+
+def print_results(results: dict) -> None:
+    """Print a table of the best time of each stage for each meet."""
+    stages = sorted({stage for meet_result in results["meets"].values() for stage in meet_result["timings"]}, key=_stage_order)
+    print(f"{'Meet':<18}" + "".join(f"{stage:>18}" for stage in stages))
+    for meet_name, meet_result in results["meets"].items():
+        timings = meet_result["timings"]
+        print(f"{meet_name:<18}" + "".join(f"{timings.get(stage, float('nan')):>18.3f}" for stage in stages))
+        if meet_result["status"] != "ok":
+            print(f"    Unsupported: {meet_result['error']}")
+
+
+def main() -> None:
+    """Run the benchmark suite, or freeze the fixture it runs against."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("meets", nargs="*", default=list(SCHEDULE_URLS), help="meets to benchmark (defaults to every meet)")
+    arg_parser.add_argument("--freeze", action="store_true", help="save the current schedules and base times as the fixture and exit")
+    arg_parser.add_argument("--fixture", type=Path, default=FIXTURE_PATH, help="the frozen schedules and base times")
+    arg_parser.add_argument("--repeat", type=int, default=1, help="number of times to run each meet, keeping the best time of each stage")
+    arg_parser.add_argument("--windows", default="1-3,1-6", help="comma separated day ranges to solve the full meet for")
+    arg_parser.add_argument("--output", type=Path, default=RESULTS_FILE_PATH, help="file to write the results to")
+    arg_parser.add_argument("--baseline", type=Path, default=None, help="results of an earlier run to check for regressions against")
+    arg_parser.add_argument("--threshold", type=float, default=THRESHOLD, help="how many times slower than the baseline a stage may get")
+    args = arg_parser.parse_args()
+
+    unknown = [meet_name for meet_name in args.meets if meet_name not in SCHEDULE_URLS]
+    if unknown:
+        arg_parser.error(f"Meets not recognized: {', '.join(unknown)}")
+
+    if args.freeze:
+        freeze_fixture(args.fixture)
+        return
+
+    if not args.fixture.exists():
+        sys.exit(f"No fixture found at {args.fixture}. Run with --freeze first.")
+    fixture = json.loads(args.fixture.read_text())
+    windows = [tuple(int(day) for day in window.split("-")) for window in args.windows.split(",") if window]
+
+    start = time.perf_counter()
+    results = {
+        "commit": _get_commit(),
+        "python": sys.version.split()[0],
+        "repeat": args.repeat,
+        "windows": windows,
+        "meets": {meet_name: benchmark_meet(meet_name, fixture[meet_name], windows=windows, repeat=args.repeat) for meet_name in args.meets},
+    }
+    results["wall_time"] = time.perf_counter() - start
+
+    args.output.write_text(json.dumps(results, indent=4))
+    print_results(results)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        regressions = find_regressions(results, json.loads(args.baseline.read_text()), args.threshold)
+        if regressions:
+            sys.exit("Regressions against " + str(args.baseline) + ":\n" + "\n".join(regressions))
+        print(f"No stage is more than {args.threshold}x slower than in {args.baseline}")
+
+
+def _run_pipeline(meet_name: str, fixture: dict, windows: list[tuple[int, int]], timings: dict[str, float]) -> None:
+    """Run every stage of the pipeline for a meet, recording how long each took."""
+    meet = Meet(meet_name)
+    meet.schedule = {int(day): [tuple(event) for event in events] for day, events in fixture["schedule"].items()}
+    meet.base_times = fixture["base_times"]
+    parser = DataParser(meet)
+    parser.get_all_data()
+
+    _time_stage(timings, "parse", parser.create_swimmers)
+    _time_stage(timings, "seeding", parser.update_seeds)
+    _time_stage(timings, "scoring", parser.update_projected_points)
+
+    # Solve without the solve cache, so every stage actually solves its MIPs
+    _time_stage(timings, "single_day", lambda: [SingleDaySolver(parser.data, day).solve() for day in range(1, meet.num_days + 1)])
+    _time_stage(timings, "top_k", lambda: _solve_top_k(parser, 1))
+    for start_day, window_end_day in windows:
+        end_day = min(window_end_day, meet.num_days)
+        _time_stage(timings, f"full_meet_{start_day}-{end_day}", FullMeetSolver(parser.data, SWITCHES, start_day, end_day).solve)
+
+
+def _solve_top_k(parser: DataParser, day: int) -> None:
+    """Find the top K lineups for a day, excluding each lineup after it is found."""
+    solver = SingleDaySolver(parser.data, day)
+    for _ in range(TOP_K):
+        lineup, captain, _ = solver.solve()
+        solver.exclude_lineup(lineup, captain)
+
+
+def _time_stage(timings: dict[str, float], stage: str, function: Callable[[], object]) -> None:
+    """Run a stage and record how long it took."""
+    start = time.perf_counter()
+    function()
+    timings[stage] = time.perf_counter() - start
+
+
+def _stage_order(stage: str) -> tuple[int, str]:
+    """Sort stages in the order the pipeline runs them."""
+    order = ["parse", "seeding", "scoring", "single_day", "top_k"]
+    return (order.index(stage), stage) if stage in order else (len(order), stage)
+
+
+def _get_psych_sheet_events(meet: Meet) -> set[str] | None:
+    """Get the events in a meet's psych sheet, or None if the parser doesn't support its layout."""
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            swimmers = DataParser(meet).create_swimmers()
+    except (Exception, SystemExit):
+        return None
+    return {event for swimmer in swimmers for event in swimmer.entries} or None
+
+
+def _get_commit() -> str | None:
+    """Get the current git commit, so results from different commits can be told apart."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, cwd=BENCHMARKS_DIR).stdout.strip()  # noqa: S607
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark applying a revised psych sheet as a revision against parsing, seeding and scoring it from scratch.
+
+A revision is made from a real psych sheet by scratching random entries and changing some entry times, then the
+original is applied back to it, so both removals and additions are measured. Each revision is checked against a full
+re-parse, and the benchmark fails if any seed or projected points differ. For example
+`uv run benchmarks/bench_psych_sheet_revision.py "2024 SCM Worlds" --scratches 30 --time-changes 5`
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent.resolve() / "src"))
+
+from data_parser import DataParser
+from meet import Meet
+from swimmer import parse_entry
+
+
+def make_revision(lines: list[str], num_scratches: int, num_time_changes: int, seed: int) -> list[str]:
+    """
+    Get the lines of a revised psych sheet with random entries scratched and random entry times changed.
+
+    Only entries on their own line are scratched, since the first entry of each swimmer shares their line.
+
+    Keyword Arguments:
+        lines: the lines of the original psych sheet
+        num_scratches: the number of entries to remove
+        num_time_changes: the number of entries to change the time of
+        seed: the random seed
+
+    """
+    rng = np.random.default_rng(seed)
+    entry_lines = [index for index, line in enumerate(lines) if line[:5] == "Women" or line[:3] == "Men"]
+    timed_lines = [index for index in entry_lines if parse_entry(lines[index])[1] is not None and lines[index][-1].isdigit()]
+    chosen = rng.choice(timed_lines, num_scratches + num_time_changes, replace=False).tolist()
+    scratches = set(chosen[:num_scratches])
+
+    revised = list(lines)
+    for index in chosen[num_scratches:]:
+        # Changing the last digit of the hundredths changes the time without changing its format
+        revised[index] = revised[index][:-1] + str((int(revised[index][-1]) + 1) % 10)
+    return [line for index, line in enumerate(revised) if index not in scratches]
+
+
+def load_parser(meet_name: str, lines: list[str]) -> DataParser:
+    """Get a parser with its swimmers created, seeded and scored from psych sheet lines."""
+    parser = DataParser(Meet(meet_name))
+    parser.get_all_data()
+    parser.create_swimmers(lines)
+    parser.update_seeds()
+    parser.update_projected_points()
+    return parser
+
+
+def apply_revision(parser: DataParser, lines: list[str]) -> dict[str, list]:
+    """Apply a revision to a loaded parser, then seed and score only what it touched."""
+    changes = parser.apply_psych_sheet_revision(lines)
+    parser.update_seeds(changes["events"])
+    parser.update_projected_points(changes["swimmers"])
+    return changes
+
+
+def find_differences(revised: DataParser, reparsed: DataParser) -> list[str]:
+    """Get every seed and projected points that differ between a parser a revision was applied to and a full re-parse."""
+    differences = []
+    for swimmer in reparsed.swimmers:
+        revised_swimmer = revised.swimmers[revised.data.swimmer_ids[swimmer.name]]
+        if revised_swimmer.projected_points != swimmer.projected_points:
+            differences.append(f"{swimmer.name}: points {revised_swimmer.projected_points} != {swimmer.projected_points}")
+        revised_seeds = {event: entry.seed for event, entry in revised_swimmer.entries.items()}
+        seeds = {event: entry.seed for event, entry in swimmer.entries.items()}
+        if revised_seeds != seeds:
+            differences.append(f"{swimmer.name}: seeds {revised_seeds} != {seeds}")
+
+    # Swimmers scratched from every event stay in the revised meet, but can't score
+    differences.extend(
+        f"{swimmer.name}: points {swimmer.projected_points} for a swimmer with no entries"
+        for swimmer in revised.swimmers
+        if swimmer.name not in reparsed.data.swimmer_ids and any(swimmer.projected_points)
+    )
+    return differences
+
+
+def benchmark_revision(meet_name: str, lines: list[str], revised_lines: list[str], repeat: int) -> tuple[dict, list[str]]:
+    """Time applying a revision and a full re-parse, best of repeat, and get the change counts and any differences."""
+    revision_seconds = reparse_seconds = float("inf")
+    for _ in range(repeat):
+        parser = load_parser(meet_name, lines)
+        start = time.perf_counter()
+        changes = apply_revision(parser, revised_lines)
+        revision_seconds = min(revision_seconds, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        reparsed = load_parser(meet_name, revised_lines)
+        reparse_seconds = min(reparse_seconds, time.perf_counter() - start)
+
+    result = {
+        "added": len(changes["added"]),
+        "removed": len(changes["removed"]),
+        "changed": len(changes["changed"]),
+        "revision": revision_seconds,
+        "reparse": reparse_seconds,
+    }
+    return result, find_differences(parser, reparsed)
+
+
+def main() -> None:
+    """Benchmark scratching entries and adding them back, and fail if a revision differs from a full re-parse."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("meet", nargs="?", default="2024 SCM Worlds", help="the meet whose psych sheet to revise")
+    arg_parser.add_argument("--scratches", type=int, default=30, help="number of entries the revision scratches")
+    arg_parser.add_argument("--time-changes", type=int, default=5, help="number of entry times the revision changes")
+    arg_parser.add_argument("--seed", type=int, default=0, help="random seed for choosing the entries to revise")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="number of times to time each revision")
+    args = arg_parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        lines = DataParser(Meet(args.meet)).read_psych_sheet()
+        revised_lines = make_revision(lines, args.scratches, args.time_changes, args.seed)
+        results = {
+            "scratch": benchmark_revision(args.meet, lines, revised_lines, args.repeat),
+            "restore": benchmark_revision(args.meet, revised_lines, lines, args.repeat),
+        }
+
+    differences = []
+    print(f"{'Revision':<10}{'Added':>7}{'Removed':>9}{'Changed':>9}{'Revision ms':>13}{'Re-parse ms':>13}")
+    for name, (result, revision_differences) in results.items():
+        print(f"{name:<10}{result['added']:>7}{result['removed']:>9}{result['changed']:>9}"
+              f"{result['revision'] * 1000:>13.2f}{result['reparse'] * 1000:>13.2f}")
+        differences.extend(f"{name}: {difference}" for difference in revision_differences)
+
+    if differences:
+        sys.exit("Revisions differ from a full re-parse:\n" + "\n".join(differences))
+
+if __name__ == "__main__":
+    main()
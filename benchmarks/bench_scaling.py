@@ -0,0 +1,120 @@
+"""
+Benchmark how building and solving scale with the size of the meet, using synthetic meets.
+
+For example `uv run benchmarks/bench_scaling.py --sizes 250,500,1000,2000 --days 6,9`
+saves the timings to bench_scaling_results.json and plots them to charts/solver-scaling.png.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.resolve() / "src"))
+
+from solvers.full_meet_solver import FullMeetSolver
+from solvers.single_day_solver import SingleDaySolver
+from synthetic_meet import COST_DISTRIBUTIONS, generate_meet
+from utils.constants import SWITCHES
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+RESULTS_FILE_PATH = ROOT_DIR / "bench_scaling_results.json"
+CHART_PATH = ROOT_DIR / "charts" / "solver-scaling.png"
+
+
+def benchmark_size(num_swimmers: int, num_days: int, *, cost_distribution: str, full_meet_days: int, seed: int) -> dict:
+    """
+    Time building and solving one synthetic meet.
+
+    Keyword Arguments:
+        num_swimmers: the number of swimmers in the meet
+        num_days: the number of days in the meet
+        cost_distribution: how swimmer costs are drawn
+        full_meet_days: the number of days to solve the full meet for (0 to skip the full meet solve)
+        seed: the random seed for generating the meet
+
+    """
+    timings = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        parser = generate_meet(num_swimmers, num_days, cost_distribution=cost_distribution, seed=seed)
+        parser.update_seeds()
+        parser.update_projected_points()
+        timings["build"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        SingleDaySolver(parser.data, 1).solve()
+        timings["single_day_solve"] = time.perf_counter() - start
+
+        if full_meet_days:
+            start = time.perf_counter()
+            FullMeetSolver(parser.data, SWITCHES, 1, min(full_meet_days, num_days)).solve()
+            timings["full_meet_solve"] = time.perf_counter() - start
+
+    return {"num_swimmers": num_swimmers, "num_days": num_days, "num_entries": parser.data.num_entries, "timings": timings}
+
+
+def plot_results(results: list[dict], path: Path) -> None:
+    """
+    Plot build and solve time against the number of swimmers, one line per stage and number of days.
+
+    Keyword Arguments:
+        results: the timings of each meet size
+        path: the file to save the chart to
+
+    """
+    import matplotlib as mpl
+    mpl.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots()
+    stages = sorted({stage for result in results for stage in result["timings"]})
+    for num_days in sorted({result["num_days"] for result in results}):
+        day_results = [result for result in results if result["num_days"] == num_days]
+        for stage in stages:
+            points = [(result["num_swimmers"], result["timings"][stage]) for result in day_results if stage in result["timings"]]
+            ax.plot(*zip(*points, strict=True), marker="o", label=f"{stage} ({num_days} days)")
+
+    ax.set_xscale("log")
+    ax.set_yscale("log")
+    ax.set_xlabel("Swimmers")
+    ax.set_ylabel("Seconds")
+    ax.set_title("Build and Solve Time by Meet Size")
+    ax.legend(fontsize="small")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def main() -> None:
+    """Benchmark every combination of meet size and number of days."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--sizes", default="250,500,1000,2000", help="comma separated numbers of swimmers")
+    arg_parser.add_argument("--days", default="6,9", help="comma separated numbers of days")
+    arg_parser.add_argument("--costs", choices=COST_DISTRIBUTIONS, default="skill", help="how swimmer costs are drawn")
+    arg_parser.add_argument("--full-meet-days", type=int, default=3, help="number of days to solve the full meet for (0 to skip)")
+    arg_parser.add_argument("--seed", type=int, default=0, help="random seed for generating meets")
+    arg_parser.add_argument("--output", type=Path, default=RESULTS_FILE_PATH, help="file to write the results to")
+    arg_parser.add_argument("--chart", type=Path, default=CHART_PATH, help="file to save the chart to")
+    args = arg_parser.parse_args()
+
+    results = []
+    print(f"{'Swimmers':>10}{'Days':>6}{'Entries':>9}{'Build':>10}{'Single day':>12}{'Full meet':>11}")
+    for num_days in (int(days) for days in args.days.split(",")):
+        for num_swimmers in (int(size) for size in args.sizes.split(",")):
+            result = benchmark_size(num_swimmers, num_days, cost_distribution=args.costs, full_meet_days=args.full_meet_days, seed=args.seed)
+            results.append(result)
+            timings = result["timings"]
+            print(f"{num_swimmers:>10}{num_days:>6}{result['num_entries']:>9}{timings['build']:>10.3f}"
+                  f"{timings['single_day_solve']:>12.3f}{timings.get('full_meet_solve', float('nan')):>11.3f}")
+
+    args.output.write_text(json.dumps(results, indent=4))
+    plot_results(results, args.chart)
+    print(f"\nResults written to {args.output} and plotted to {args.chart}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark how long the lineup optimizer takes to start, and fail if heavy libraries are imported when they aren't needed.
+
+Each measurement runs in a fresh interpreter, so nothing is already imported. For example
+`uv run benchmarks/bench_startup.py --repeat 5 --max-import-time 0.5`
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent.resolve() / "src"
+
+# Libraries that should only be imported on the code paths that scrape, plot, read PDFs or solve a MIP
+SCRAPING_MODULES = ["requests", "bs4", "selenium", "webdriver_manager"]
+PLOTTING_MODULES = ["matplotlib"]
+PDF_MODULES = ["pypdf"]
+SOLVER_MODULES = ["ortools"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import lineup_optimizer
+print(json.dumps({"seconds": time.perf_counter() - start, "modules": sorted(sys.modules)}))
+"""
+
+# Solves day 1 twice with the same cache, so the second solve is answered from the cache as it would be on a warm run
+WARM_SOLVE_SCRIPT = """
+import contextlib, io, json, sys, time
+start = time.perf_counter()
+from data_parser import DataParser
+from meet import Meet
+from solvers.result_cache import SolveCache
+from solvers.single_day_solver import SingleDaySolver
+import_seconds = time.perf_counter() - start
+
+with contextlib.redirect_stdout(io.StringIO()):
+    parser = DataParser(Meet(sys.argv[1]))
+    parser.load_concurrently()
+    parser.update_seeds()
+    parser.update_projected_points()
+    load_seconds = time.perf_counter() - start
+
+    cache = SolveCache()
+    SingleDaySolver(parser.data, 1, cache).solve()
+    solve_start = time.perf_counter()
+    SingleDaySolver(parser.data, 1, cache).solve()
+    solve_seconds = time.perf_counter() - solve_start
+
+print(json.dumps({"import": import_seconds, "load": load_seconds, "warm_solve": solve_seconds}))
+"""
+
+
+def run_script(script: str, *args: str) -> dict:
+    """
+    Run a script in a fresh interpreter from the src directory and get the JSON it prints.
+
+    Keyword Arguments:
+        script: the Python code to run
+        args: command line arguments for the script
+
+    """
+    result = subprocess.run([sys.executable, "-c", script, *args], cwd=SRC_DIR, capture_output=True, text=True, check=True)  # noqa: S603
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main() -> None:
+    """Time the import and a warm-cache solve, and exit with an error if startup regressed."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--meet", default="2024 SCM Worlds", help="meet to load for the warm-cache solve")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="number of times to time each measurement")
+    arg_parser.add_argument("--max-import-time", type=float, default=None, help="fail if importing takes longer than this many seconds")
+    args = arg_parser.parse_args()
+
+    import_results = [run_script(IMPORT_SCRIPT) for _ in range(args.repeat)]
+    import_time = min(result["seconds"] for result in import_results)
+    imported = set(import_results[0]["modules"])
+
+    solve_results = [run_script(WARM_SOLVE_SCRIPT, args.meet) for _ in range(args.repeat)]
+
+    print(f"Import lineup_optimizer: {import_time:.3f} seconds (best of {args.repeat})")
+    print(f"Load {args.meet}:  {min(result['load'] for result in solve_results):.3f} seconds (best of {args.repeat})")
+    print(f"Warm-cache solve:        {min(result['warm_solve'] for result in solve_results) * 1000:.2f} ms (best of {args.repeat})")
+
+    failures = [
+        f"{module} is imported on startup but should only load when it's used"
+        for module in SCRAPING_MODULES + PLOTTING_MODULES + PDF_MODULES + SOLVER_MODULES
+        if module in imported
+    ]
+    if args.max_import_time is not None and import_time > args.max_import_time:
+        failures.append(f"Import took {import_time:.3f} seconds, more than the limit of {args.max_import_time:.3f} seconds")
+
+    if failures:
+        sys.exit("\n".join(failures))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Benchmark the shared time and date parsing against the ad hoc parsing it replaced, and check they agree.
+
+Times and dates are generated, so the benchmark needs no psych sheets or network. For example
+`uv run benchmarks/bench_time_parsing.py --count 100000 --repeat 5`. Add `--real-data` to also check that every
+psych sheet in PsychSheets/ and every world record in swimming.db parse the same as with the legacy parsing.
+"""
+
+import argparse
+import contextlib
+import io
+import math
+import re
+import sqlite3
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent.resolve() / "src"))
+
+from data_parser import DataParser, PsychSheetError
+from meet import PSYCH_SHEETS_DIR, Meet
+from swimmer import parse_entries, parse_entry
+from time_parsing import parse_date, parse_times
+from utils.constants import SCHEDULE_URLS
+from wr_database import DB_PATH
+
+MONTHS = ("January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December")
+EVENTS = ("Women's 100m Freestyle", "Men's 200m Butterfly", "Women's 1500m Freestyle", "Men's 50m Breaststroke")
+HUNDREDTHS_PER_MINUTE = 6000
+LEGACY_MONTH_TO_NUM = {month: f"{number:02}" for number, month in enumerate(MONTHS, 1)} | {month[:3]: f"{number:02}" for number, month in enumerate(MONTHS, 1)}
+
+
+def generate_times(count: int, rng: np.random.Generator) -> list[str]:
+    """Generate psych sheet style times, from sprints under a minute to distance events of several minutes."""
+    hundredths = rng.integers(2000, 100_000, count)
+    return [f"{value // HUNDREDTHS_PER_MINUTE}:{value // 100 % 60:02}.{value % 100:02}" if value >= HUNDREDTHS_PER_MINUTE else f"{value // 100}.{value % 100:02}" for value in hundredths.tolist()]
+
+
+def generate_entries(times: list[str]) -> list[str]:
+    """Generate psych sheet entries for the times, with every tenth entry having no time."""
+    return [f"{EVENTS[index % len(EVENTS)]} {'NT' if index % 10 == 0 else time}" for index, time in enumerate(times)]
+
+
+def generate_dates(count: int, rng: np.random.Generator) -> list[str]:
+    """Generate world record style dates, half written day first and half written month first."""
+    days = rng.integers(1, 29, count).tolist()
+    months = rng.integers(0, 12, count).tolist()
+    years = rng.integers(1900, 2025, count).tolist()
+    return [
+        f"{day} {MONTHS[month]} {year}" if index % 2 else f"{MONTHS[month]} {day}, {year}"
+        for index, (day, month, year) in enumerate(zip(days, months, years, strict=True))
+    ]
+
+
+def legacy_psych_sheet_time(time_text: str) -> float | None:
+    """Parse a time the way Swimmer.add_event used to."""
+    if time_text[-1] not in [str(x) for x in range(10)]:
+        return None
+    time = int(time_text[-5:-3]) + int(time_text[-2:]) / 100
+    if len(time_text) > 5:  # noqa: PLR2004
+        time += 60 * int(time_text[:-6])
+    return round(time, 2)
+
+
+def legacy_psych_sheet_entry(entry: str) -> tuple[str, float | None]:
+    """Parse an entry the way Swimmer.add_event used to."""
+    time = legacy_psych_sheet_time(entry.split()[-1])
+    event = " ".join(entry.split()[:-1])
+    return event, time
+
+
+def legacy_wr_time(time: str) -> float:
+    """Parse a time the way wr_scraper.get_wrs used to."""
+    accurate_time = (time + "0" if time[-2] == "." else time).rstrip("= ")
+    if len(accurate_time) == 5:  # noqa: PLR2004
+        seconds, hundreths = accurate_time.split(".")
+        return int(seconds) + int(hundreths) / 100
+    minutes, seconds, hundreths = re.split("[:.]", accurate_time)
+    return int(minutes) * 60 + int(seconds) + int(hundreths) / 100
+
+
+def legacy_wr_date(date: str) -> tuple[int, str]:
+    """Parse a date the way wr_scraper.get_wrs used to."""
+    if "," in date:
+        month, day, year = date.replace(",", "").split(" ")
+        date = f"{day} {month} {year}"
+    else:
+        day, month, year = date.split(" ")
+    return int(year) * 10000 + int(LEGACY_MONTH_TO_NUM[month]) * 100 + int(day), date
+
+
+def shared_psych_sheet_entries(entries: list[str]) -> list[tuple[str, float | None]]:
+    """Parse entries the way DataParser.create_swimmers does, as one column, with None for no time."""
+    events, times = parse_entries(entries)
+    return [(event, None if math.isnan(time) else time) for event, time in zip(events, times.tolist(), strict=True)]
+
+
+def check_agreement(entries: list[str], times: list[str], dates: list[str]) -> None:
+    """Exit with an error if the shared parsing disagrees with the legacy parsing on any entry, time or date."""
+    legacy_entries = [legacy_psych_sheet_entry(entry) for entry in entries]
+    if shared_psych_sheet_entries(entries) != legacy_entries or [parse_entry(entry) for entry in entries] != legacy_entries:
+        sys.exit("Shared entry parsing disagrees with the legacy psych sheet parsing.")
+    if any(not math.isclose(time, legacy_wr_time(text), abs_tol=1e-9) for time, text in zip(parse_times(times).tolist(), times, strict=True)):
+        sys.exit("Shared time parsing disagrees with the legacy world record parsing.")
+    if [parse_date(date) for date in dates] != [legacy_wr_date(date) for date in dates]:
+        sys.exit("Shared date parsing disagrees with the legacy world record parsing.")
+
+
+def check_real_data() -> list[str]:
+    """
+    Get every disagreement between the shared and legacy parsing on the psych sheets in PsychSheets/ and the world records in swimming.db.
+
+    Each psych sheet the parser supports is turned into swimmers the way the pipeline does, and the entry times are
+    compared with the legacy parsing of the time at the end of every swimmer and entry line.
+    """
+    meet_names = {Meet(meet_name).psych_sheet_path.name: meet_name for meet_name in SCHEDULE_URLS}
+    disagreements = []
+    for path in sorted(PSYCH_SHEETS_DIR.glob("*.pdf")):
+        parser = DataParser(Meet(meet_names[path.name]))
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                lines = parser.read_psych_sheet()
+                parser.create_swimmers(lines)
+        except (PsychSheetError, ValueError, IndexError) as e:
+            print(f"{path.name:<36}skipped ({type(e).__name__}: {e})")
+            continue
+
+        times = parser.data.entry_time.tolist()
+        if not times:
+            print(f"{path.name:<36}skipped (no entries found)")
+            continue
+
+        # Every line that doesn't name a country ends with one entry
+        legacy_times = [legacy_psych_sheet_time(line.split()[-1]) for line in lines if line[3:6] != " - "]
+        legacy_times = [time for time in legacy_times if time is not None]
+        print(f"{path.name:<36}{len(times):>6} entries {'agree' if times == legacy_times else 'DISAGREE'}")
+        if times != legacy_times:
+            disagreements.append(f"{path.name}: entry times differ from the legacy parsing")
+
+    conn = sqlite3.connect(DB_PATH)
+    records = conn.execute("SELECT time, date FROM world_records").fetchall()
+    conn.close()
+    record_times = [time for time, _ in records if time]
+    time_disagreements = sum(
+        not math.isclose(time, legacy_wr_time(text), abs_tol=1e-9)
+        for time, text in zip(parse_times(record_times).tolist(), record_times, strict=True)
+    )
+    date_disagreements = sum(parse_date(date) != legacy_wr_date(date) for _, date in records)
+    print(f"{DB_PATH.name:<36}{len(records):>6} records, {time_disagreements} times and {date_disagreements} dates disagree")
+    if time_disagreements or date_disagreements:
+        disagreements.append(f"{DB_PATH.name}: {time_disagreements} times and {date_disagreements} dates differ from the legacy parsing")
+
+    return disagreements
+
+
+def main() -> None:
+    """Time every way of parsing the same generated entries, times and dates, and fail if either ingest path got slower."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--count", type=int, default=100_000, help="number of entries, times and dates to parse")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="number of times to time each parser")
+    arg_parser.add_argument("--seed", type=int, default=0, help="random seed for generating times and dates")
+    arg_parser.add_argument("--real-data", action="store_true", help="also check agreement on every psych sheet and stored world record")
+    args = arg_parser.parse_args()
+
+    if args.real_data:
+        disagreements = check_real_data()
+        if disagreements:
+            sys.exit("\n".join(disagreements))
+        print()
+
+    rng = np.random.default_rng(args.seed)
+    times = generate_times(args.count, rng)
+    entries = generate_entries(times)
+    dates = generate_dates(args.count, rng)
+    check_agreement(entries, times, dates)
+
+    # The psych sheet and world record ingest paths are timed with the functions they call
+    parsers = {
+        "legacy psych sheet entries": lambda: [legacy_psych_sheet_entry(entry) for entry in entries],
+        "parse_entries": lambda: parse_entries(entries),
+        "parse_entry": lambda: [parse_entry(entry) for entry in entries],
+        "legacy world record times": lambda: [legacy_wr_time(time) for time in times],
+        "parse_times": lambda: parse_times(times),
+        "legacy world record dates": lambda: [legacy_wr_date(date) for date in dates],
+        "parse_date": lambda: [parse_date(date) for date in dates],
+        "legacy world record rows": lambda: [(legacy_wr_time(time), legacy_wr_date(date)) for time, date in zip(times, dates, strict=True)],
+        "shared world record rows": lambda: (parse_times(times), [parse_date(date) for date in dates]),
+    }
+    results = {name: min(timeit.repeat(parser, number=1, repeat=args.repeat)) for name, parser in parsers.items()}
+
+    print(f"Parsing {args.count} entries, times and dates (best of {args.repeat})\n")
+    for name, seconds in results.items():
+        print(f"{name:<28}{seconds * 1000:>10.1f} ms{seconds / args.count * 1e9:>10.0f} ns each")
+
+    failures = [
+        f"{new} is slower than {legacy}"
+        for new, legacy in [("parse_entries", "legacy psych sheet entries"), ("shared world record rows", "legacy world record rows")]
+        if results[new] >= results[legacy]
+    ]
+    if failures:
+        sys.exit("\n".join(failures))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark parsing cached world record pages, without touching the network.
+
+Run `uv run src/wr_scraper.py` once to fill wr_page_cache/, then e.g.
+`uv run benchmarks/bench_wr_parse.py --repeat 3`
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.resolve() / "src"))
+
+from wr_fetcher import PAGE_CACHE_DIR
+from wr_scraper import HTML_PARSER, get_wrs, parse_wr_pages
+
+
+def load_cached_pages(cache_dir: Path) -> dict[str, str]:
+    """
+    Load every cached world record progression page, by URL.
+
+    Keyword Arguments:
+        cache_dir: the directory the page fetcher cached pages in
+
+    """
+    pages = {}
+    for meta_path in sorted(cache_dir.glob("*.json")):
+        url = json.loads(meta_path.read_text())["url"]
+        if "World_record_progression" in url:
+            pages[url] = meta_path.with_suffix(".html").read_text(encoding="utf-8")
+
+    return pages
+
+
+def main() -> None:
+    """Time parsing every cached page in one process and across a process pool."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--cache-dir", type=Path, default=PAGE_CACHE_DIR, help="directory of cached pages")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="number of times to time each mode")
+    arg_parser.add_argument("--workers", type=int, default=None, help="number of processes (defaults to the number of CPUs)")
+    args = arg_parser.parse_args()
+
+    pages = load_cached_pages(args.cache_dir)
+    if not pages:
+        sys.exit(f"No cached world record pages found in {args.cache_dir}. Run wr_scraper.py first.")
+
+    print(f"Parsing {len(pages)} pages with the {HTML_PARSER} parser\n")
+
+    sequential_times = []
+    pool_times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        sequential_rows = [row for url, html in pages.items() for row in get_wrs(url, html)]
+        sequential_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        pool_rows = parse_wr_pages(pages, args.workers)
+        pool_times.append(time.perf_counter() - start)
+
+    if sequential_rows != pool_rows:
+        sys.exit("Process pool parsing returned different rows than sequential parsing.")
+
+    print(f"Rows parsed:   {len(pool_rows)}")
+    print(f"Sequential:    {min(sequential_times):.3f} seconds (best of {args.repeat})")
+    print(f"Process pool:  {min(pool_times):.3f} seconds (best of {args.repeat})")
+
+if __name__ == "__main__":
+    main()
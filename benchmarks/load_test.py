@@ -0,0 +1,65 @@
+"""
+Load test for the optimization server.
+
+Start the server first with `uv run src/server.py`, then run e.g.
+`uv run benchmarks/load_test.py --meet 2024-scm-worlds --requests 200 --concurrency 8`
+"""
+
+import argparse
+import json
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+PERCENTILES = 100 # Number of quantiles to split the latencies into
+
+
+def timed_get(url: str) -> float:
+    """
+    Send a GET request and return how long it took in seconds.
+
+    Keyword Arguments:
+        url: the URL to request
+
+    """
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=600) as response:  # noqa: S310 (URL is always http)
+        json.load(response)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Run the load test and report latency percentiles."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--base-url", default="http://127.0.0.1:5000", help="URL the server is running on")
+    arg_parser.add_argument("--meet", default="2024-scm-worlds", help="meet slug to request lineups for")
+    arg_parser.add_argument("--endpoint", choices=["lineup", "lineups", "full-meet"], default="lineup", help="endpoint to load test")
+    arg_parser.add_argument("--days", type=int, default=6, help="number of days in the meet")
+    arg_parser.add_argument("--requests", type=int, default=100, help="total number of requests to send")
+    arg_parser.add_argument("--concurrency", type=int, default=8, help="number of requests in flight at once")
+    args = arg_parser.parse_args()
+
+    meet_url = f"{args.base_url}/meets/{args.meet}"
+    if args.endpoint == "full-meet":
+        urls = [f"{meet_url}/full-meet?start_day=1&end_day=2"] * args.requests
+    else:
+        suffix = "lineup" if args.endpoint == "lineup" else "lineups?k=3"
+        urls = [f"{meet_url}/days/{i % args.days + 1}/{suffix}" for i in range(args.requests)]
+
+    # The first request loads the meet into memory, so time it separately from the warm requests
+    print(f"Cold request (loads meet): {timed_get(urls[0]):.3f} seconds")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = list(pool.map(timed_get, urls))
+    wall_time = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=PERCENTILES)
+    print(f"Sent {len(latencies)} requests with concurrency {args.concurrency} in {wall_time:.2f} seconds ({len(latencies) / wall_time:.1f} requests/second)")
+    print(f"p50: {quantiles[49] * 1000:.1f} ms")
+    print(f"p99: {quantiles[98] * 1000:.1f} ms")
+    print(f"max: {max(latencies) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Run the whole lineup optimizer pipeline for every meet in parallel and save the results to one file."""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from data_parser import DataParser
+from meet import Meet
+from solvers.full_meet_solver import FullMeetSolver
+from solvers.result_cache import SolveCache
+from solvers.single_day_solver import SingleDaySolver
+from utils.constants import SCHEDULE_URLS, SWITCHES
+from wr_database import get_base_times_from_db
+
+RESULTS_FILE_PATH = Path(__file__).parent.parent.resolve() / "backtest_results.json"
+
+
+@contextlib.contextmanager
+def timed(timings: dict[str, float], stage: str) -> Iterator[None]:
+    """
+    Record how long the body of the with statement takes.
+
+    Keyword Arguments:
+        timings: the dictionary to record the time in
+        stage: the name to record the time under
+
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = round(time.perf_counter() - start, 4)
+
+
+def run_meet(meet_name: str, *, full_meet: bool = False, use_cache: bool = True) -> dict:
+    """
+    Run the whole pipeline for one meet, timing each stage.
+
+    Keyword Arguments:
+        meet_name: the meet to run, e.g. "2024 SCM Worlds"
+        full_meet: also solve the full meet with switches, not just each day on its own
+        use_cache: reuse results of identical solves from the solve cache
+
+    """
+    timings = {}
+    result = {"meet": meet_name, "timings": timings}
+    cache = SolveCache() if use_cache else None
+
+    # Each meet runs in its own process, so keep the solvers' progress output out of the consolidated report
+    output = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output):
+            meet = Meet(meet_name)
+            parser = DataParser(meet)
+
+            with timed(timings, "schedule"):
+                parser.get_all_data()
+            with timed(timings, "psych_sheet"):
+                parser.create_swimmers()
+            with timed(timings, "seeds"):
+                parser.update_seeds()
+            with timed(timings, "base_times"):
+                _ = meet.base_times
+            with timed(timings, "scoring"):
+                parser.update_projected_points()
+
+            result["num_swimmers"] = len(parser.swimmers)
+            result["days"] = {}
+            with timed(timings, "single_day_solve"):
+                for day in range(1, meet.num_days + 1):
+                    lineup, captain, total_score = SingleDaySolver(parser.data, day, cache).solve()
+                    result["days"][day] = {
+                        "lineup": [swimmer.name for swimmer in lineup],
+                        "captain": captain.name,
+                        "total_points": total_score,
+                    }
+
+            if full_meet:
+                with timed(timings, "full_meet_solve"):
+                    solution = FullMeetSolver(parser.data, SWITCHES, cache=cache).solve()
+                result["full_meet"] = solution["Grand Total"]
+    except (Exception, SystemExit) as e:  # One failed meet shouldn't stop the rest of the backtest
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    timings["total"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def run_backtest(meet_names: list[str], *, full_meet: bool = False, use_cache: bool = True, max_workers: int | None = None) -> dict:
+    """
+    Run the whole pipeline for every meet on a process pool.
+
+    Keyword Arguments:
+        meet_names: the meets to run
+        full_meet: also solve the full meet with switches, not just each day on its own
+        use_cache: reuse results of identical solves from the solve cache
+        max_workers: the maximum number of meets to run at once (defaults to one process per meet)
+
+    """
+    start = time.perf_counter()
+
+    # Make sure the base times are precomputed before the workers start, so every worker only ever reads the database
+    for meet_name in meet_names:
+        meet = Meet(meet_name)
+        with contextlib.suppress(ValueError):
+            get_base_times_from_db(meet.year, meet.course, meet.db_path)
+
+    with ProcessPoolExecutor(max_workers=max_workers or len(meet_names)) as pool:
+        futures = [pool.submit(run_meet, meet_name, full_meet=full_meet, use_cache=use_cache) for meet_name in meet_names]
+        meets = [future.result() for future in futures]
+
+    return {
+        "wall_time": round(time.perf_counter() - start, 4),
+        "meets": meets,
+    }
+
+
+def print_summary(results: dict) -> None:
+    """Print a table of per-stage timings for each meet."""
+    stages = ["schedule", "psych_sheet", "seeds", "base_times", "scoring", "single_day_solve", "full_meet_solve", "total"]
+    print(f"{'Meet':<18}" + "".join(f"{stage:>18}" for stage in stages))
+    for meet_result in results["meets"]:
+        timings = meet_result["timings"]
+        print(f"{meet_result['meet']:<18}" + "".join(f"{timings.get(stage, float('nan')):>18.3f}" for stage in stages))
+        if "error" in meet_result:
+            print(f"    Failed: {meet_result['error']}")
+
+    slowest = max(meet_result["timings"]["total"] for meet_result in results["meets"])
+    print(f"\nBacktest of {len(results['meets'])} meets took {results['wall_time']:.2f} seconds (slowest meet took {slowest:.2f} seconds).")
+
+
+def main() -> None:
+    """Run the backtest from the command line."""
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("meets", nargs="*", default=list(SCHEDULE_URLS), help="meets to run (defaults to every meet)")
+    arg_parser.add_argument("--full-meet", action="store_true", help="also solve the full meet with switches")
+    arg_parser.add_argument("--no-cache", action="store_true", help="solve every MIP instead of reusing cached results")
+    arg_parser.add_argument("--workers", type=int, default=None, help="maximum number of meets to run at once")
+    arg_parser.add_argument("--output", type=Path, default=RESULTS_FILE_PATH, help="file to write the results to")
+    args = arg_parser.parse_args()
+
+    unknown = [meet_name for meet_name in args.meets if meet_name not in SCHEDULE_URLS]
+    if unknown:
+        arg_parser.error(f"Meets not recognized: {', '.join(unknown)}")
+
+    results = run_backtest(args.meets, full_meet=args.full_meet, use_cache=not args.no_cache, max_workers=args.workers)
+    with args.output.open("w") as file:
+        json.dump(results, file, indent=4)
+
+    print_summary(results)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,68 +1,78 @@
 """DataParser class for parsing psych sheets and schedules from PDF files and web pages."""
 
-import json
+import math
 import re
-import sys
 import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from pypdf import PdfReader
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
+from meet import Meet
+from meet_data import MeetData
+from swimmer import Swimmer, parse_entries
+from tracing import tracer
 
-from swimmer import Swimmer
-from utils.constants import SCHEDULE_URLS
 
-CACHE_FILE_PATH = Path(__file__).parent.parent.resolve() / "cached_data.json"
+class PsychSheetError(Exception):
+    """Raised when a psych sheet can't be read or parsed, e.g. because it is missing or only partly written."""
+
 
 class DataParser:
     """DataParser class for parsing psych sheets and schedules from PDF files and web pages."""
 
-    def __init__(self) -> None:
-        """Initialize the DataParser with no schedule, base times, or swimmers."""
+    def __init__(self, meet: Meet) -> None:
+        """
+        Initialize the DataParser with no schedule, base times, or swimmers.
+
+        Keyword Arguments:
+            meet: the meet to parse data for
+
+        """
+        self.meet = meet
         self.schedule = None
         self.base_times = None
+        self.data: MeetData | None = None
         self.swimmers = None
+        self._entry_lines: dict[tuple, None] | None = None # The lines of each entry the swimmers were created from, to diff revisions against
 
 
     def get_all_data(self) -> None:
         """Get all data needed for the lineup optimizer."""
-        try:
-            with CACHE_FILE_PATH.open("r") as file:
-                data = json.load(file)
-        except FileNotFoundError:
-            print("Cache file not found. Creating a new cache file.")
-            data = {}
-
-        # ------------------------- Get schedule -------------------------
-        # If the schedule URL matches the cached one, use the cached schedule, otherwise, fetch a new schedule
-        if data.get("schedule_data", {}).get("schedule_url", "") == SCHEDULE_URLS[sys.argv[1]]:
-            print("Using cached schedule.")
-            # Get cached schedule
-            string_keys_schedule = data.get("schedule_data", {}).get("schedule", {})
-            # Convert string keys to integers for the schedule
-            self.schedule = {int(k): v for k, v in string_keys_schedule.items()}
-        else:
-            if data.get("schedule_data", {}).get("schedule_url", ""):
-                print("Schedule URL has changed. Fetching new schedule.")
-            else:
-                print("No cached schedule found. Fetching new schedule.")
+        self.schedule = self.meet.schedule
 
-            self.get_schedule(SCHEDULE_URLS[sys.argv[1]])
 
+    def load_concurrently(self) -> dict[str, float]:
+        """
+        Get the schedule, parse the psych sheet and read the base times at the same time.
 
-        # -------------------------------- Update cache file --------------------------------
-        with CACHE_FILE_PATH.open("w") as json_file:
-            schedule_data = {
-                "schedule_data": {
-                    "schedule": self.schedule,
-                    "schedule_url": SCHEDULE_URLS[sys.argv[1]],
-                },
-            }
-            json.dump(schedule_data, json_file, indent=4)
+        The three stages don't depend on each other until scoring, so the schedule fetch, PDF extraction and
+        database query overlap instead of running one after another, unless the tracer is profiling or measuring the memory of the stages.
+
+        Returns how long each stage took, and how long they took together under "total".
+
+        """
+        stages = {
+            "schedule": self.get_all_data,
+            "psych_sheet": self.create_swimmers,
+            "base_times": lambda: self.meet.base_times,
+        }
+        timings = {}
+
+        def run_stage(stage: str) -> None:
+            stage_start = time.perf_counter()
+            stages[stage]()
+            timings[stage] = time.perf_counter() - stage_start
+
+        start = time.perf_counter()
+        # Stages on other threads would show up in each other's profiles and memory, so they take turns while being measured
+        max_workers = 1 if tracer.isolates_stages else len(stages)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="loader") as pool:
+            futures = [pool.submit(run_stage, stage) for stage in stages]
+            for future in futures:
+                future.result()
+        timings["total"] = time.perf_counter() - start
+
+        return timings
 
 
     def get_schedule(self, schedule_url: str) -> dict:
@@ -73,62 +83,197 @@ class DataParser:
             schedule_url: the URL of the schedule to get
 
         """
-        chunks = self._get_schedule_chunks(schedule_url)
-        lines = []
-        schedule = {}
-        for chunk_index, chunk in enumerate(chunks):
-            lines = chunk.split("\n")
-            day = chunk_index + 1
-            schedule[day] = []
-            for line_index, line in enumerate(lines):
-                if line.split()[0][-2:] == "en" and "Relay" not in line and lines[line_index + 1] != "Heats":
-                    schedule[day].append((self._format_event_name(line), lines[line_index + 1]))
+        from schedule_fetcher import fetch_schedule
+        self.schedule = fetch_schedule(schedule_url)
+        return self.schedule
+
+
+    def read_psych_sheet(self) -> list[str]:
+        """
+        Get the lines of the psych sheet that name a country, a swimmer or an entry.
+
+        Raises PsychSheetError if the psych sheet is missing, isn't a readable PDF or has no entry list.
+        """
+        return self._get_entries(self.meet.psych_sheet_path)
 
-        self.schedule = schedule
-        return schedule
 
+    def create_swimmers(self, lines: list[str] | None = None) -> list[Swimmer]:
+        """
+        Get a list of swimmers and their events.
 
-    def create_swimmers(self) -> list[Swimmer]:
-        """Get a list of swimmers and their events."""
-        psych_sheet_filename = "PsychSheets/" + sys.argv[1].lower().replace(" ", "-") + "-psych-sheet.pdf"
+        Keyword Arguments:
+            lines: the psych sheet lines from read_psych_sheet, which is called if they aren't given
 
-        num_days = len(self.schedule)
-        lines = self._get_entries(psych_sheet_filename)
-        swimmers = []
+        """
+        if lines is None:
+            lines = self.read_psych_sheet()
+        with tracer.span("swimmer_creation") as span:
+            data = MeetData(self.meet)
+            swimmers = data.swimmers
+            entry_lines = list(self._get_entry_lines(lines))
+            # Swimmer lines are parsed one at a time, but the times of every entry are parsed as one column
+            parsed = [
+                self._parse_entry_lines(country, swimmer_line, entry_line) if entry_line is None else (None, entry_line)
+                for country, swimmer_line, entry_line in entry_lines
+            ]
+            events, times = parse_entries([entry for _, entry in parsed])
+            swimmer = None
+            for (details, _), event, time in zip(parsed, events, times.tolist(), strict=True):
+                if details is not None:
+                    swimmer = data.add_swimmer(*details)
+                if not math.isnan(time):
+                    swimmer.add_entry(event, time)
+            span["swimmers"] = data.num_swimmers
+            span["entries"] = data.num_entries
+
+        self.data = data
+        self.swimmers = swimmers
+        self._entry_lines = dict.fromkeys(entry_lines)
+        return swimmers
+
+
+    def apply_psych_sheet_revision(self, lines: list[str]) -> dict[str, list]:
+        """
+        Change only the entries that differ between a revised psych sheet and the one the swimmers were created from.
+
+        Only the lines that differ between the two psych sheets are parsed, and their entries are matched by swimmer
+        name and event. Entries missing from the revision are removed, new ones are added along with any new swimmers,
+        and entries with a new time keep whether they're excluded. Swimmers scratched from every event stay in the meet
+        with no points. Seeds and projected points aren't updated, so pass the events and swimmers in the returned report
+        to update_seeds and update_projected_points.
+
+        Keyword Arguments:
+            lines: the lines of the revised psych sheet, from read_psych_sheet
+
+        Returns the change report: the "added" and "removed" entries as (name, event, time), the "changed" entries as
+        (name, event, old time, new time), and the "events" and "swimmers" they touched.
+
+        """
+        if self._entry_lines is None:
+            msg = "Only swimmers created from a psych sheet with create_swimmers can be revised."
+            raise ValueError(msg)
+
+        data = self.data
+        with tracer.span("psych_sheet_revision", entries=data.num_entries) as span:
+            previous = self._entry_lines
+            revised = dict.fromkeys(self._get_entry_lines(lines))
+            removed = self._parse_entry_times(key for key in previous if key not in revised)
+            added = self._parse_entry_times(key for key in revised if key not in previous)
+
+            # An entry on a changed line is both removed and added, so it's only a change if its time is different
+            changes = {"added": [], "removed": [], "changed": []}
+            for key, (_, _, time) in added.items():
+                if key in removed and removed[key][2] != time:
+                    data.entry_time[self._get_entry_id(*key)] = time
+                    changes["changed"].append((*key, removed[key][2], time))
+
+            removed_ids = [self._get_entry_id(*key) for key in removed if key not in added]
+            changes["removed"] = [(*key, time) for key, (_, _, time) in removed.items() if key not in added]
+            data.remove_entries(removed_ids)
+
+            for (name, event), (details, _, time) in added.items():
+                if (name, event) not in removed:
+                    swimmer_id = data.swimmer_ids.get(name)
+                    swimmer = data.add_swimmer(*details) if swimmer_id is None else data.swimmers[swimmer_id]
+                    swimmer.add_entry(event, time)
+                    changes["added"].append((name, event, time))
+
+            touched = changes["changed"] + changes["removed"] + changes["added"]
+            changes["events"] = list(dict.fromkeys(change[1] for change in touched))
+            changes["swimmers"] = list(dict.fromkeys(change[0] for change in touched))
+            span["changes"] = len(touched)
+
+        self.swimmers = data.swimmers
+        self._entry_lines = revised
+        return changes
+
+
+    def update_seeds(self, events: list[str] | None = None) -> None:
+        """
+        Update the seeds for all swimmers.
+
+        Keyword Arguments:
+            events: if given, only the entries in these events are seeded again
+
+        """
+        event_ids = None if events is None else [self.data.event_ids[event] for event in events]
+        with tracer.span("seeding", entries=self.data.num_entries):
+            self.data.update_seeds(event_ids)
+
+
+    def update_projected_points(self, swimmers: list[str] | None = None) -> None:
+        """
+        Update the projected points for all swimmers.
+
+        Keyword Arguments:
+            swimmers: if given, only these swimmers' projected points are updated
+
+        """
+        self.base_times = self.meet.base_times
+        swimmer_ids = None if swimmers is None else [self.data.swimmer_ids[name] for name in swimmers]
+        with tracer.span("scoring", swimmers=self.data.num_swimmers if swimmers is None else len(swimmers)):
+            self.data.update_projected_points(swimmer_ids)
+
+
+    def _get_entry_lines(self, lines: list[str]) -> Iterator[tuple[str | None, str, str | None]]:
+        """
+        Get the lines each entry on the psych sheet is on, as (country, swimmer line, entry line).
+
+        A swimmer's first entry is on the swimmer line itself, so its entry line is None. The same entry line under two
+        different swimmer lines is two different entries.
+
+        Keyword Arguments:
+            lines: the lines of the psych sheet, from read_psych_sheet
+
+        """
         country = None
+        swimmer_line = None
         for line in lines:
             if line[3:6] == " - ":
                 country = line[6:]
             elif line[:5] == "Women" or line[:3] == "Men":
-                if len(swimmers) == 0:
-                    msg = "No swimmers to add the event to. Exiting program"
-                    sys.exit(msg)
-                swimmers[-1].add_event(line)
+                if swimmer_line is None:
+                    msg = "No swimmers to add the event to."
+                    raise PsychSheetError(msg)
+                yield country, swimmer_line, line
             else:
-                event, rest = self._get_event(line)
-                height, rest = self._get_height(rest)
-                birthday, name = self._get_birthday(rest)
-                new_swimmer = Swimmer(name, country, birthday, height, num_days)
-                new_swimmer.add_event(event)
-                swimmers.append(new_swimmer)
+                swimmer_line = line
+                yield country, line, None
 
-        self.swimmers = swimmers
-        return swimmers
+
+    def _parse_entry_lines(self, country: str | None, swimmer_line: str, entry_line: str | None) -> tuple[tuple, str]:
+        """
+        Get the details of an entry's swimmer, (name, country, birthday, height), and the entry from the lines it is on.
+
+        Keyword Arguments:
+            country: the swimmer's country
+            swimmer_line: the line naming the swimmer, which also has their first entry
+            entry_line: the line of the entry, or None for the swimmer's first entry
+
+        """
+        event, rest = self._get_event(swimmer_line)
+        height, rest = self._get_height(rest)
+        birthday, name = self._get_birthday(rest)
+        return (name, country, birthday, height), event if entry_line is None else entry_line
 
 
-    def update_seeds(self) -> None:
-        """Update the seeds for all swimmers."""
-        for swimmer in self.swimmers:
-            swimmer.update_seeds(self.swimmers)
+    def _parse_entry_times(self, entry_lines: Iterable[tuple[str | None, str, str | None]]) -> dict[tuple[str, str], tuple]:
+        """Get the swimmer details, entry and time of entries from their lines by swimmer name and event, skipping entries with no time."""
+        parsed = [self._parse_entry_lines(*lines) for lines in entry_lines]
+        events, times = parse_entries([entry for _, entry in parsed])
+        return {
+            (details[0], event): (details, entry, time)
+            for (details, entry), event, time in zip(parsed, events, times.tolist(), strict=True)
+            if not math.isnan(time)
+        }
 
 
-    def update_projected_points(self) -> None:
-        """Update the projected points for all swimmers."""
-        for swimmer in self.swimmers:
-            swimmer.update_projected_points()
+    def _get_entry_id(self, name: str, event: str) -> int:
+        """Get the ID of a swimmer's entry in an event by their exact name."""
+        return self.data.swimmer_entries[self.data.swimmer_ids[name]][self.data.event_ids[event]]
 
 
-    def _get_text(self, filename: str) -> str:
+    def _get_text(self, filename: Path) -> str:
         """
         Get all of the text from the pdf.
 
@@ -136,15 +281,23 @@ class DataParser:
             filename: the pdf to extract text from
 
         """
+        # pypdf is slow to import, so it's only loaded when a psych sheet is actually read
+        from pypdf import PdfReader
+        from pypdf.errors import PyPdfError
         try:
             reader = PdfReader(filename)
-        except FileNotFoundError:
-            msg = f"Psych sheet file '{filename}' not found. It may have been deleted. Exiting program."
-            sys.exit(msg)
-
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text()
+            with tracer.span("pdf_extraction", file=filename.name) as span:
+                text = ""
+                for page in reader.pages:
+                    text += page.extract_text()
+                span["pages"] = len(reader.pages)
+                span["characters"] = len(text)
+        except FileNotFoundError as e:
+            msg = f"Psych sheet file '{filename}' not found. It may have been deleted."
+            raise PsychSheetError(msg) from e
+        except PyPdfError as e:
+            msg = f"Psych sheet file '{filename}' couldn't be read. It may still be being written. ({e})"
+            raise PsychSheetError(msg) from e
 
         return text
 
@@ -179,12 +332,16 @@ class DataParser:
         return [line.strip() for line in filtered_lines]
 
 
-    def _get_entries(self, filename: str) -> list[str]:
+    def _get_entries(self, filename: Path) -> list[str]:
         """Get the entries from the psych sheet."""
         pdf_text = self._get_text(filename)
 
         lines = pdf_text.split("\n")
-        cutoff = lines.index("Entry List by NAT")
+        try:
+            cutoff = lines.index("Entry List by NAT")
+        except ValueError as e:
+            msg = f"No entry list found in psych sheet file '{filename}'."
+            raise PsychSheetError(msg) from e
         entry_lines = lines[cutoff:]
 
         return self._delete_overhead(entry_lines)
@@ -237,41 +394,3 @@ class DataParser:
         birthday = " ".join(text.split()[-3:])
         name = " ".join(text.split()[:-3])
         return birthday, name
-
-
-    def _get_schedule_chunks(self, schedule_url: str) -> list[str]:
-        """
-        Return one chunk of the schedule for each day in the meet.
-
-        Keyword Arguments:
-            schedule_url: the URL of the schedule to get
-
-        """
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-
-        driver.get(schedule_url)
-
-        print("\n1/2 - Fetching schedule from the web page...")
-        time.sleep(5)  # Adjust this time if the page is taking longer to load
-        lines = driver.find_elements(By.CLASS_NAME, "schedule__day")
-        print("2/2 - Parsing schedule...\n")
-
-        lines_text = [line.text for line in lines]
-        driver.quit()
-
-        return lines_text
-
-
-    def _format_event_name(self, event: str) -> str:
-        """
-        Convert event text into same event name as on psych sheet.
-
-        Keyword Arguments:
-            event: the event name to format
-
-        """
-        partially_corrected = re.sub("m Medley", "m Individual Medley", event)
-        return re.sub("en ", "en's ", partially_corrected)
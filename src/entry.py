@@ -2,17 +2,27 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from meet_data import MeetData
+
+NO_SEED = 0
+
 
 class Entry:
-    """Holds all information for an entry in an event."""
+    """
+    Holds all information for an entry in an event.
 
-    def __init__(self, event: str, time: float) -> None:
-        """Initialize an Entry object with the event name and time."""
-        self.event = event
-        self.time = time
-        self.seed = None
-        self.projected_points = None
-        self.excluded = False
+    An entry is a view onto one row of a MeetData's entry arrays.
+    """
+
+    __slots__ = ("data", "id")
+
+    def __init__(self, data: MeetData, entry_id: int) -> None:
+        """Initialize a view of the entry with the given ID in the meet data."""
+        self.data = data
+        self.id = entry_id
 
     def __repr__(self) -> str:
         """Return a string representation of the Entry object."""
@@ -27,3 +37,33 @@ class Entry:
 
         """
         return self.time < other.time
+
+    @property
+    def event(self) -> str:
+        """The name of the event."""
+        return self.data.events[self.data.entry_event[self.id]]
+
+    @property
+    def time(self) -> float:
+        """The entry time in seconds."""
+        return float(self.data.entry_time[self.id])
+
+    @property
+    def seed(self) -> int | None:
+        """The seed in the event, or None if seeds haven't been updated."""
+        seed = int(self.data.entry_seed[self.id])
+        return None if seed == NO_SEED else seed
+
+    @property
+    def projected_points(self) -> int:
+        """The projected points for the entry."""
+        return int(self.data.entry_points[self.id])
+
+    @property
+    def excluded(self) -> bool:
+        """Whether the entry is excluded from the swimmer's projected points."""
+        return bool(self.data.entry_excluded[self.id])
+
+    @excluded.setter
+    def excluded(self, excluded: bool) -> None:
+        self.data.entry_excluded[self.id] = excluded
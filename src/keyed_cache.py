@@ -0,0 +1,189 @@
+"""A cache of JSON results keyed by a fingerprint of what produced them, kept in memory and in an SQLite database."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+MAX_ENTRIES = 10000 # Maximum number of results kept on disk before the least recently used are evicted
+MAX_MEMORY_ENTRIES = 1000 # Maximum number of results also kept in memory
+USE_FLUSH_BATCH = 100 # Number of results used from memory before their uses are written to disk
+
+
+def fingerprint(**parts: object) -> str:
+    """
+    Hash everything that determines a result into a key, e.g. a solver's problem or a pipeline stage's inputs.
+
+    Keyword Arguments:
+        parts: JSON serializable parts of what determines the result (points, costs, day range, input hashes...)
+
+    """
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class KeyedCache:
+    """
+    Caches JSON serializable results by key in memory and in an SQLite database so they survive process restarts.
+
+    Each kind of result has its own subclass, which names the table its results are stored in. Without a database
+    path, results are only kept in memory, so using the cache never touches the disk. Once there are more than
+    max_entries results, the least recently used ones are evicted. Results used from memory are only marked as used
+    on disk in batches, and always before anything is evicted, so the results used most stay cached. Every get
+    returns a new copy of the result, so callers can change it without changing the cache.
+    """
+
+    table = "results" # The table the results are stored in, which subclasses name after what they store
+
+    def __init__(self, path: Path | None, max_entries: int = MAX_ENTRIES, max_memory_entries: int = MAX_MEMORY_ENTRIES) -> None:
+        """
+        Initialize the cache, creating the database table if it doesn't exist.
+
+        Keyword Arguments:
+            path: the SQLite database file to store results in, or None to only keep them in memory
+            max_entries: the maximum number of results to keep on disk
+            max_memory_entries: the maximum number of results to also keep in memory
+
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_memory_entries = max_memory_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._memory: OrderedDict[str, str] = OrderedDict() # Results as JSON, so every hit decodes a new copy
+        self._pending_uses: dict[str, int] = {} # When each result used from memory was last used, until written to disk
+        self._num_pending_uses = 0
+        self._lock = threading.Lock()
+        self._clock = 0
+
+        if path is None:
+            return
+        with self._connect() as conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    key TEXT PRIMARY KEY,
+                    result TEXT,
+                    last_used INTEGER
+                )
+            """)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_last_used ON {self.table} (last_used)")
+        self._clock = self._get_max_last_used()
+
+
+    def __repr__(self) -> str:
+        """Return a string representation of the cache."""
+        return f"{type(self).__name__}(path={self.path}, hits={self.hits}, misses={self.misses})"
+
+
+    def get(self, key: str) -> dict | None:
+        """
+        Get a cached result, or None if there isn't one.
+
+        Keyword Arguments:
+            key: the fingerprint of what produced the result
+
+        """
+        with self._lock:
+            encoded = self._memory.get(key)
+            if encoded is not None:
+                self._memory.move_to_end(key)
+                if self.path is not None:
+                    self._clock += 1
+                    self._pending_uses[key] = self._clock
+                    self._num_pending_uses += 1
+                    if self._num_pending_uses >= USE_FLUSH_BATCH:
+                        with self._connect() as conn:
+                            self._flush_uses(conn)
+            elif self.path is None:
+                self.misses += 1
+                return None
+            else:
+                with self._connect() as conn:
+                    row = conn.execute(f"SELECT result FROM {self.table} WHERE key = ?", (key,)).fetchone()
+                    if row is None:
+                        self.misses += 1
+                        return None
+
+                    self._clock += 1
+                    conn.execute(f"UPDATE {self.table} SET last_used = ? WHERE key = ?", (self._clock, key))
+
+                encoded = row[0]
+                self._remember(key, encoded)
+            self.hits += 1
+
+        return json.loads(encoded)
+
+
+    def put(self, key: str, result: dict) -> None:
+        """
+        Store a result, evicting the least recently used results if the cache is full.
+
+        Keyword Arguments:
+            key: the fingerprint of what produced the result
+            result: the JSON serializable result to store
+
+        """
+        encoded = json.dumps(result)
+        with self._lock:
+            self._remember(key, encoded)
+            if self.path is None:
+                return
+            self._clock += 1
+            self._pending_uses.pop(key, None)
+            with self._connect() as conn:
+                conn.execute(f"INSERT OR REPLACE INTO {self.table} (key, result, last_used) VALUES (?, ?, ?)", (key, encoded, self._clock))
+                # Results used from memory since the last flush must count as used before choosing what to evict
+                self._flush_uses(conn)
+                conn.execute(f"""
+                    DELETE FROM {self.table}
+                    WHERE key NOT IN (SELECT key FROM {self.table} ORDER BY last_used DESC LIMIT ?)
+                """, (self.max_entries,))
+
+
+    def clear(self) -> None:
+        """Remove all cached results."""
+        with self._lock:
+            self._memory.clear()
+            self._pending_uses.clear()
+            self._num_pending_uses = 0
+            if self.path is None:
+                return
+            with self._connect() as conn:
+                conn.execute(f"DELETE FROM {self.table}")
+
+
+    def _remember(self, key: str, encoded: str) -> None:
+        """Keep a result, encoded as JSON, in memory, evicting the least recently used one if memory is full."""
+        self._memory[key] = encoded
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+
+    def _flush_uses(self, conn: sqlite3.Connection) -> None:
+        """Write when each result used from memory was last used to disk."""
+        conn.executemany(f"UPDATE {self.table} SET last_used = ? WHERE key = ?", [(last_used, key) for key, last_used in self._pending_uses.items()])
+        self._pending_uses.clear()
+        self._num_pending_uses = 0
+
+
+    def _get_max_last_used(self) -> int:
+        """Get the most recent use counter so new uses are ordered after ones from previous processes."""
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COALESCE(MAX(last_used), 0) FROM {self.table}").fetchone()[0]
+
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the cache database, committing and closing it when done."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
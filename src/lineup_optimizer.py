@@ -1,36 +1,52 @@
 """The main script to run the lineup optimizer for the World Aquatics Swimming Championships Fantasy Game."""
 
+import argparse
 import sys
+from pathlib import Path
 
-from data_parser import DataParser
+from data_parser import DataParser, PsychSheetError
+from meet import Meet
+from pipeline import INPUT_STAGES, WATCH_INTERVAL, Pipeline, StageCache
+from solvers.errors import SolveError
 from solvers.full_meet_solver import FullMeetSolver
+from solvers.result_cache import SolveCache
 from solvers.single_day_solver import SingleDaySolver
+from tracing import tracer
+from utils import seconds_to_time_str
 from utils.constants import (
     NUM_DAYS,
-    NUM_EXPECTED_ARGS,
     NUM_LINEUPS,
     SCHEDULE_URLS,
     SWITCHES,
 )
 
 
-def check_valid_input() -> None:
-    """Check valid command line input to run the program."""
-    if len(sys.argv) != NUM_EXPECTED_ARGS:
-        sys.exit(f'This program takes two additional arguments.\nExample input: uv run .\\src\\{__file__} "2024 SCM Worlds"')
+def check_valid_input() -> argparse.Namespace:
+    """Check valid command line input to run the program, and get the meet and tracing options."""
+    arg_parser = argparse.ArgumentParser(description="Find the optimal fantasy lineups for a meet.", epilog=f'Example input: uv run .\\src\\{Path(__file__).name} "2024 SCM Worlds"')
+    arg_parser.add_argument("meet", help='the meet to optimize, e.g. "2024 SCM Worlds"')
+    arg_parser.add_argument("--trace", type=Path, default=None, help="write a Chrome trace of every stage to this file")
+    arg_parser.add_argument("--profile-dir", type=Path, default=None, help="write a cProfile dump of every stage to this directory")
+    arg_parser.add_argument("--memory-report", type=Path, default=None, help="measure the memory of every stage and write a table of it to this file")
+    arg_parser.add_argument("--no-cache", action="store_true", help="read the psych sheet and solve every problem instead of reusing previous results")
+    arg_parser.add_argument("--watch", action="store_true", help="keep watching the psych sheet, schedule store and database, and re-optimize when they change")
+    arg_parser.add_argument("--interval", type=float, default=WATCH_INTERVAL, help="seconds between checks for changes when watching")
+    args = arg_parser.parse_args()
 
-    if sys.argv[1] not in SCHEDULE_URLS:
+    if args.meet not in SCHEDULE_URLS:
         print("Meet not recognized. Please use one of the following:")
         for url in SCHEDULE_URLS:
             print(url)
         sys.exit()
 
+    return args
 
-def test_single_day_solver(parser: DataParser) -> None:
+
+def test_single_day_solver(parser: DataParser, cache: SolveCache | None) -> None:
     """Test the single day solver."""
     print(len(parser.schedule))
     for day in range(len(parser.schedule)):
-        solver = SingleDaySolver(parser.swimmers, day + 1)
+        solver = SingleDaySolver(parser.data, day + 1, cache)
 
         # number larger than any possible score
         prev_score = 99999
@@ -45,31 +61,98 @@ def test_single_day_solver(parser: DataParser) -> None:
             prev_score = curr_score
 
 
-def test_full_meet_solver(parser: DataParser) -> None:
+def test_full_meet_solver(parser: DataParser, cache: SolveCache | None) -> None:
     """Test the full meet solver."""
     for num_days in range(1, NUM_DAYS + 1):
         for day in range(NUM_DAYS - num_days + 1):
-            solver = FullMeetSolver(parser.swimmers, SWITCHES, day + 1, day + num_days)
+            solver = FullMeetSolver(parser.data, SWITCHES, day + 1, day + num_days, cache)
             solver.solve()
 
 
-def main() -> None:
-    """Run the lineup optimizer."""
-    check_valid_input()
+def optimize(parser: DataParser, cache: SolveCache | None) -> None:
+    """Find the optimal lineups for the loaded meet, exiting if a solve fails."""
+    # test_full_meet_solver(parser, cache)
+    try:
+        with tracer.span("single_day_solver", profile=False):
+            test_single_day_solver(parser, cache)
+    except SolveError as e:
+        sys.exit(str(e))
+
+
+def print_stage_timings(timings: dict[str, float]) -> None:
+    """Print which pipeline stages ran, how long they took, and how much time running the input stages at the same time saved."""
+    stages = ", ".join(f"{stage} ({seconds:.2f}s)" for stage, seconds in timings.items() if stage != "total")
+    message = f"Ran {stages} in {timings['total']:.2f} seconds"
+
+    overlapped = [stage for stage in INPUT_STAGES if stage in timings]
+    if len(overlapped) > 1:
+        # The other stages run one after another, so they count the same in the sum and the total
+        sequential_time = sum(stage_time for stage, stage_time in timings.items() if stage != "total")
+        message += f" ({max(sequential_time - timings['total'], 0):.2f} seconds saved by overlapping {', '.join(overlapped)})"
 
-    # parse data from schedule, psych sheet, and base times
-    parser = DataParser()
-    parser.get_all_data()
+    print(message)
 
-    # Takes about 2 seconds
-    parser.create_swimmers()
 
-    parser.update_seeds()
-    parser.update_projected_points()
+def print_revision(changes: dict[str, list]) -> None:
+    """Print the entries a revised psych sheet added, removed and changed the time of."""
+    print(f"\nPsych sheet revised: {len(changes['added'])} added, {len(changes['removed'])} removed and {len(changes['changed'])} changed "
+          f"entries in {len(changes['events'])} events")
+    for name, event, time in changes["added"]:
+        print(f"  + {name}, {event} ({seconds_to_time_str(time)})")
+    for name, event, time in changes["removed"]:
+        print(f"  - {name}, {event} ({seconds_to_time_str(time)})")
+    for name, event, old_time, new_time in changes["changed"]:
+        print(f"  ~ {name}, {event} ({seconds_to_time_str(old_time)} -> {seconds_to_time_str(new_time)})")
 
-    # Takes majority of time
-    # test_full_meet_solver(parser)
-    test_single_day_solver(parser)
+
+def print_trace_summary() -> None:
+    """Print how many times each traced stage ran and how long it took in total, slowest first."""
+    print("\nStage                     Count     Seconds")
+    for name, total in sorted(tracer.summary().items(), key=lambda item: -item[1]["seconds"]):
+        print(f"{name:<24}{total['count']:>7}{total['seconds']:>12.3f}")
+
+
+def main() -> None:
+    """Run the lineup optimizer."""
+    args = check_valid_input()
+    if args.trace or args.profile_dir or args.memory_report:
+        tracer.enable(args.profile_dir, memory=bool(args.memory_report))
+
+    # parse data from schedule, psych sheet, and base times, all at the same time, reusing the stages whose inputs haven't changed
+    pipeline = Pipeline(Meet(args.meet), None if args.no_cache else StageCache())
+    try:
+        with tracer.span("load", profile=False):
+            timings = pipeline.run()
+    except PsychSheetError as e:
+        sys.exit(str(e))
+    print_stage_timings(timings)
+
+    # Takes majority of time, unless the same problems have been solved before
+    cache = None if args.no_cache else SolveCache()
+    optimize(pipeline.parser, cache)
+
+    if args.watch:
+        def on_change(timings: dict[str, float]) -> None:
+            if "psych_sheet" in timings and pipeline.revision is not None:
+                print_revision(pipeline.revision)
+            print_stage_timings(timings)
+            optimize(pipeline.parser, cache)
+
+        print(f"\nWatching {', '.join(str(path) for path in pipeline.watched_paths)} for changes (^C to stop)")
+        try:
+            pipeline.watch(on_change, args.interval)
+        except KeyboardInterrupt:
+            print("Stopped watching.")
+
+    if tracer.enabled:
+        print_trace_summary()
+        if args.trace:
+            tracer.export_chrome_trace(args.trace)
+            print(f"Trace written to {args.trace}")
+        if args.memory_report:
+            report = tracer.format_memory_report()
+            args.memory_report.write_text(report)
+            print(f"\n{report}Memory report written to {args.memory_report}")
 
 if __name__ == "__main__":
     main()
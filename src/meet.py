@@ -0,0 +1,149 @@
+"""Meet class for holding everything the pipeline needs to know about one meet."""
+
+import threading
+from pathlib import Path
+
+from schedule_store import ScheduleStore
+from tracing import tracer
+from utils.constants import SCHEDULE_URLS
+from wr_database import DB_PATH, get_base_times_from_db
+
+PSYCH_SHEETS_DIR = Path(__file__).parent.parent.resolve() / "PsychSheets"
+
+
+class Meet:
+    """
+    Holds the name, file paths, schedule and base times of a meet.
+
+    The schedule and base times are loaded the first time they are used and then kept, so a Meet can be passed
+    through the whole pipeline (and shared between threads) without reading them again.
+    """
+
+    def __init__(self, name: str, schedule_store: ScheduleStore | None = None, db_path: Path = DB_PATH, psych_sheets_dir: Path = PSYCH_SHEETS_DIR) -> None:
+        """
+        Initialize the meet.
+
+        Keyword Arguments:
+            name: the name of the meet, e.g. "2024 SCM Worlds"
+            schedule_store: the store to get the cached schedule from (a new store for the default cache file if not given)
+            db_path: the database to get the base times from
+            psych_sheets_dir: the directory the meet's psych sheet is in
+
+        """
+        if name not in SCHEDULE_URLS:
+            msg = f"Meet not recognized: {name}"
+            raise ValueError(msg)
+
+        year, course, *_ = name.split()
+        self.name = name
+        self.year = int(year)
+        self.course = course
+        self.schedule_url = SCHEDULE_URLS[name]
+        self.psych_sheet_path = psych_sheets_dir / f"{self.slug}-psych-sheet.pdf"
+        self.schedule_store = schedule_store or ScheduleStore()
+        self.db_path = db_path
+
+        self._schedule: dict[int, list] | None = None
+        self._event_days: dict[str, list[int]] | None = None
+        self._base_times: dict[str, float] | None = None
+        # Separate locks, so the schedule can be fetched while the base times are read from the database
+        self._schedule_lock = threading.Lock()
+        self._base_times_lock = threading.Lock()
+
+
+    def __repr__(self) -> str:
+        """Return a string representation of the Meet."""
+        return f"Meet({self.name})"
+
+
+    @property
+    def slug(self) -> str:
+        """The meet name in the form used in file names and URLs, e.g. "2024-scm-worlds"."""
+        return self.name.lower().replace(" ", "-")
+
+
+    @property
+    def schedule(self) -> dict[int, list]:
+        """The events and their round for each day, from the schedule store if cached, otherwise fetched and cached."""
+        with self._schedule_lock:
+            if self._schedule is None:
+                self._schedule = self._load_schedule()
+            return self._schedule
+
+
+    @schedule.setter
+    def schedule(self, schedule: dict[int, list]) -> None:
+        with self._schedule_lock:
+            self._schedule = schedule
+            self._event_days = None
+
+
+    @property
+    def num_days(self) -> int:
+        """The number of days in the meet."""
+        return len(self.schedule)
+
+
+    @property
+    def event_days(self) -> dict[str, list[int]]:
+        """The days each event is held on."""
+        schedule = self.schedule
+        with self._schedule_lock:
+            if self._event_days is None:
+                event_days = {}
+                for day, day_events in schedule.items():
+                    for event, _ in day_events:
+                        # An event counts once per day, even if more than one of its rounds is on that day
+                        days = event_days.setdefault(event, [])
+                        if day not in days:
+                            days.append(day)
+                self._event_days = event_days
+            return self._event_days
+
+
+    @property
+    def base_times(self) -> dict[str, float]:
+        """The base time for each event, which projected points are scored against."""
+        with self._base_times_lock:
+            if self._base_times is None:
+                with tracer.span("base_times_query", year=self.year, course=self.course):
+                    self._base_times = get_base_times_from_db(self.year, self.course, self.db_path)
+            return self._base_times
+
+
+    @base_times.setter
+    def base_times(self, base_times: dict[str, float]) -> None:
+        with self._base_times_lock:
+            self._base_times = base_times
+
+
+    def reload_base_times(self) -> dict[str, float]:
+        """Read the base times from the database again, e.g. after new world records were added to it."""
+        with self._base_times_lock:
+            self._base_times = None
+            # Base times are also cached for the whole process by their arguments, which don't change with the database
+            get_base_times_from_db.cache_clear()
+        return self.base_times
+
+
+    def _load_schedule(self) -> dict[int, list]:
+        """Get the schedule from the schedule store, or fetch it and add it to the store if it isn't cached."""
+        # If the schedule for this meet is cached, use the cached schedule, otherwise, fetch a new schedule
+        with tracer.span("schedule_fetch", meet=self.name) as span:
+            cached_schedule = self.schedule_store.get(self.name)
+            if cached_schedule is not None:
+                print("Using cached schedule.")
+                span["source"] = "cache"
+                return cached_schedule
+
+            if self.schedule_store.get_url(self.name):
+                print("Schedule URL has changed. Fetching new schedule.")
+            else:
+                print("No cached schedule found. Fetching new schedule.")
+
+            # The scraping libraries are only needed when the schedule isn't cached
+            from schedule_fetcher import fetch_schedule
+            schedule = fetch_schedule(self.schedule_url)
+            self.schedule_store.put(self.name, schedule)
+            span["source"] = "web"
+            return schedule
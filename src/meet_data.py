@@ -0,0 +1,394 @@
+"""MeetData class for holding every swimmer and entry in a meet as columns of arrays."""
+
+from __future__ import annotations
+
+import difflib
+import re
+import unicodedata
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from entry import NO_SEED, Entry
+from swimmer import NO_SEX, Swimmer
+
+if TYPE_CHECKING:
+    from meet import Meet
+
+INITIAL_CAPACITY = 256 # Number of swimmers and entries to allocate space for before growing the arrays
+DEFAULT_COST = 25 # Just a placeholder for the cost, which will figure out how to scrape later once the website is up
+NAME_MATCH_CUTOFF = 0.85 # How similar a misspelled name must be to a swimmer's name to match it, from 0 to 1
+
+
+class MeetData:
+    """
+    Holds every swimmer and entry in a meet as columns of NumPy arrays, indexed by integer IDs.
+
+    Swimmers, events and entries are numbered in the order they are added. Swimmer and Entry objects are thin
+    views onto a row of these columns, so the solvers can read points, costs and sexes for every swimmer at once
+    instead of through each object's attributes.
+    """
+
+    def __init__(self, meet: Meet) -> None:
+        """
+        Initialize empty columns for a meet.
+
+        Keyword Arguments:
+            meet: the meet the swimmers are entered in
+
+        """
+        self.meet = meet
+        self.num_swimmers = 0
+        self.num_entries = 0
+
+        # Swimmer columns
+        self.swimmers: list[Swimmer] = []
+        self.names: list[str] = []
+        self.countries: list[str | None] = []
+        self.birthdays: list[str | None] = []
+        self.heights: list[float | None] = []
+        self.swimmer_ids: dict[str, int] = {}
+        self.normalized_swimmer_ids: dict[str, int] = {} # Swimmer ID for each name with case, accents and word order ignored
+        self._sex = np.zeros(INITIAL_CAPACITY, dtype=np.int8)
+        self._cost = np.zeros(INITIAL_CAPACITY, dtype=np.int32)
+        self._excluded = np.zeros(INITIAL_CAPACITY, dtype=bool)
+        self._points: np.ndarray | None = None # Not allocated until needed, so swimmers can be added before the schedule is known
+
+        # Event columns
+        self.events: list[str] = []
+        self.event_ids: dict[str, int] = {}
+
+        # Entry columns
+        self.entries: list[Entry] = []
+        self.swimmer_entries: list[dict[int, int]] = [] # Entry ID for each event ID, for each swimmer
+        self._entry_swimmer = np.zeros(INITIAL_CAPACITY, dtype=np.int32)
+        self._entry_event = np.zeros(INITIAL_CAPACITY, dtype=np.int32)
+        self._entry_time = np.zeros(INITIAL_CAPACITY, dtype=np.float64)
+        self._entry_seed = np.zeros(INITIAL_CAPACITY, dtype=np.int32)
+        self._entry_points = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+        self._entry_excluded = np.zeros(INITIAL_CAPACITY, dtype=bool)
+
+
+    def __repr__(self) -> str:
+        """Return a string representation of the MeetData."""
+        return f"MeetData(meet={self.meet.name}, num_swimmers={self.num_swimmers}, num_events={len(self.events)}, num_entries={self.num_entries})"
+
+
+    @property
+    def sex(self) -> np.ndarray:
+        """The sex code of each swimmer (NO_SEX, FEMALE or MALE, from swimmer.py)."""
+        return self._sex[:self.num_swimmers]
+
+
+    @property
+    def cost(self) -> np.ndarray:
+        """The cost of each swimmer."""
+        return self._cost[:self.num_swimmers]
+
+
+    @property
+    def excluded(self) -> np.ndarray:
+        """Whether each swimmer is excluded from lineups."""
+        return self._excluded[:self.num_swimmers]
+
+
+    @property
+    def num_days(self) -> int:
+        """The number of days in the meet."""
+        return self.meet.num_days
+
+
+    @property
+    def points(self) -> np.ndarray:
+        """The projected points of each swimmer (rows) on each day (columns)."""
+        if self._points is None or len(self._points) != self.num_swimmers:
+            # Swimmers added since projected points were last updated have no points yet
+            points = np.zeros((self.num_swimmers, self.num_days), dtype=np.int64)
+            if self._points is not None:
+                points[:len(self._points)] = self._points
+            self._points = points
+        return self._points
+
+
+    @property
+    def entry_swimmer(self) -> np.ndarray:
+        """The swimmer ID of each entry."""
+        return self._entry_swimmer[:self.num_entries]
+
+
+    @property
+    def entry_event(self) -> np.ndarray:
+        """The event ID of each entry."""
+        return self._entry_event[:self.num_entries]
+
+
+    @property
+    def entry_time(self) -> np.ndarray:
+        """The entry time of each entry, in seconds."""
+        return self._entry_time[:self.num_entries]
+
+
+    @property
+    def entry_seed(self) -> np.ndarray:
+        """The seed of each entry in its event (NO_SEED until seeds are updated)."""
+        return self._entry_seed[:self.num_entries]
+
+
+    @property
+    def entry_points(self) -> np.ndarray:
+        """The projected points of each entry."""
+        return self._entry_points[:self.num_entries]
+
+
+    @property
+    def entry_excluded(self) -> np.ndarray:
+        """Whether each entry is excluded from its swimmer's projected points."""
+        return self._entry_excluded[:self.num_entries]
+
+
+    def add_swimmer(self, name: str, country: str | None, birthday: str | None, height: float | None) -> Swimmer:
+        """
+        Add a swimmer with no entries.
+
+        Keyword Arguments:
+            name: the swimmer's name
+            country: the swimmer's country
+            birthday: the swimmer's birthday
+            height: the swimmer's height
+
+        Returns a view of the new swimmer.
+
+        """
+        if self.num_swimmers == len(self._sex):
+            self._sex, self._cost, self._excluded = (_grow(column) for column in (self._sex, self._cost, self._excluded))
+
+        swimmer_id = self.num_swimmers
+        self.num_swimmers += 1
+        self.names.append(name)
+        self.countries.append(country)
+        self.birthdays.append(birthday)
+        self.heights.append(height)
+        self.swimmer_ids.setdefault(name, swimmer_id)
+        self.normalized_swimmer_ids.setdefault(_normalize_name(name), swimmer_id)
+        self.swimmer_entries.append({})
+        self._sex[swimmer_id] = NO_SEX
+        self._cost[swimmer_id] = DEFAULT_COST
+        self._excluded[swimmer_id] = False
+
+        swimmer = Swimmer(self, swimmer_id)
+        self.swimmers.append(swimmer)
+        return swimmer
+
+
+    def add_entry(self, swimmer_id: int, event: str, time: float) -> Entry:
+        """
+        Add an entry for a swimmer, replacing their entry in the event if they already have one.
+
+        Keyword Arguments:
+            swimmer_id: the ID of the swimmer entered in the event
+            event: the name of the event, e.g. "Women's 100m Freestyle"
+            time: the entry time in seconds
+
+        Returns a view of the entry.
+
+        """
+        if event not in self.event_ids:
+            self.event_ids[event] = len(self.events)
+            self.events.append(event)
+        event_id = self.event_ids[event]
+
+        entry_id = self.swimmer_entries[swimmer_id].get(event_id)
+        if entry_id is None:
+            if self.num_entries == len(self._entry_swimmer):
+                columns = (self._entry_swimmer, self._entry_event, self._entry_time, self._entry_seed, self._entry_points, self._entry_excluded)
+                (self._entry_swimmer, self._entry_event, self._entry_time,
+                 self._entry_seed, self._entry_points, self._entry_excluded) = (_grow(column) for column in columns)
+
+            entry_id = self.num_entries
+            self.num_entries += 1
+            self.swimmer_entries[swimmer_id][event_id] = entry_id
+            self.entries.append(Entry(self, entry_id))
+
+        self._entry_swimmer[entry_id] = swimmer_id
+        self._entry_event[entry_id] = event_id
+        self._entry_time[entry_id] = time
+        self._entry_seed[entry_id] = NO_SEED
+        self._entry_points[entry_id] = 0
+        self._entry_excluded[entry_id] = False
+        return self.entries[entry_id]
+
+
+    def remove_entries(self, entry_ids: list[int]) -> None:
+        """
+        Remove entries, e.g. the scratches in a revised psych sheet.
+
+        Each removed entry is replaced by the current last entry, so the columns stay packed without shifting every
+        entry after it. Only the moved entries' IDs change, and views of removed or moved entries are no longer valid.
+
+        Keyword Arguments:
+            entry_ids: the IDs of the entries to remove
+
+        """
+        columns = (self._entry_swimmer, self._entry_event, self._entry_time, self._entry_seed, self._entry_points, self._entry_excluded)
+        # Removing the highest IDs first means the last entry is never one that is still waiting to be removed
+        for entry_id in sorted(entry_ids, reverse=True):
+            del self.swimmer_entries[int(self._entry_swimmer[entry_id])][int(self._entry_event[entry_id])]
+            last_id = self.num_entries - 1
+            if entry_id != last_id:
+                for column in columns:
+                    column[entry_id] = column[last_id]
+                self.swimmer_entries[int(self._entry_swimmer[entry_id])][int(self._entry_event[entry_id])] = entry_id
+            self.entries.pop()
+            self.num_entries -= 1
+
+
+    def find_swimmer(self, name: str) -> Swimmer | None:
+        """
+        Get a swimmer by name, ignoring case, accents and word order, and allowing small misspellings.
+
+        Keyword Arguments:
+            name: the name to look up, e.g. "Summer McIntosh" for "MCINTOSH Summer"
+
+        Returns None if no swimmer's name is close enough.
+
+        """
+        swimmer_id = self.swimmer_ids.get(name)
+        if swimmer_id is None:
+            normalized_name = _normalize_name(name)
+            swimmer_id = self.normalized_swimmer_ids.get(normalized_name)
+            if swimmer_id is None:
+                # Only misspelled names fall back to comparing against every name
+                matches = difflib.get_close_matches(normalized_name, self.normalized_swimmer_ids, n=1, cutoff=NAME_MATCH_CUTOFF)
+                if not matches:
+                    return None
+                swimmer_id = self.normalized_swimmer_ids[matches[0]]
+
+        return self.swimmers[swimmer_id]
+
+
+    def find_entry(self, name: str, event: str) -> Entry | None:
+        """
+        Get a swimmer's entry in an event, looking the swimmer up like find_swimmer.
+
+        Keyword Arguments:
+            name: the name of the swimmer
+            event: the name of the event, e.g. "Women's 100m Freestyle"
+
+        Returns None if there is no such swimmer or they aren't entered in the event.
+
+        """
+        swimmer = self.find_swimmer(name)
+        if swimmer is None or event not in self.event_ids:
+            return None
+
+        entry_id = self.swimmer_entries[swimmer.id].get(self.event_ids[event])
+        return None if entry_id is None else self.entries[entry_id]
+
+
+    def set_swimmers_excluded(self, names: list[str], *, excluded: bool) -> list[str]:
+        """
+        Exclude swimmers from (or include them back in) lineups.
+
+        Keyword Arguments:
+            names: the names of the swimmers, matched like find_swimmer
+            excluded: whether to exclude the swimmers
+
+        Returns the names that didn't match any swimmer.
+
+        """
+        swimmer_ids = []
+        not_found = []
+        for name in names:
+            swimmer = self.find_swimmer(name)
+            if swimmer is None:
+                not_found.append(name)
+            else:
+                swimmer_ids.append(swimmer.id)
+
+        self.excluded[swimmer_ids] = excluded
+        return not_found
+
+
+    def set_entries_excluded(self, entries: list[tuple[str, str]], *, excluded: bool) -> list[tuple[str, str]]:
+        """
+        Exclude entries from (or include them back in) their swimmers' projected points, then update projected points once.
+
+        Keyword Arguments:
+            entries: the (swimmer name, event) of each entry, with names matched like find_swimmer
+            excluded: whether to exclude the entries
+
+        Returns the entries that didn't match any swimmer's entry.
+
+        """
+        entry_ids = []
+        not_found = []
+        for name, event in entries:
+            entry = self.find_entry(name, event)
+            if entry is None:
+                not_found.append((name, event))
+            else:
+                entry_ids.append(entry.id)
+
+        self.entry_excluded[entry_ids] = excluded
+        if entry_ids:
+            self.update_projected_points()
+        return not_found
+
+
+    def update_seeds(self, event_ids: list[int] | None = None) -> None:
+        """
+        Update the seed of every entry, where the seed is one more than the number of faster entries in the event.
+
+        Keyword Arguments:
+            event_ids: if given, only the entries in these events are seeded again, e.g. the events a revision touched
+
+        """
+        for event_id in range(len(self.events)) if event_ids is None else event_ids:
+            in_event = self.entry_event == event_id
+            times = self.entry_time[in_event]
+            self.entry_seed[in_event] = np.searchsorted(np.sort(times), times, side="left") + 1
+
+
+    def update_projected_points(self, swimmer_ids: list[int] | None = None) -> None:
+        """
+        Update the projected points of every entry, and of every swimmer on each day from their entries that aren't excluded.
+
+        Keyword Arguments:
+            swimmer_ids: if given, only these swimmers and their entries are scored again, e.g. the swimmers a revision touched
+
+        """
+        if swimmer_ids is None:
+            entry_ids = np.arange(self.num_entries)
+            points = np.zeros((self.num_swimmers, self.num_days), dtype=np.int64)
+        else:
+            entry_ids = np.flatnonzero(np.isin(self.entry_swimmer, swimmer_ids))
+            points = self.points
+            points[swimmer_ids] = 0
+
+        base_times = self.meet.base_times
+        event_base_times = np.array([base_times[event] for event in self.events], dtype=np.float64)
+        entry_event = self.entry_event[entry_ids]
+        self.entry_points[entry_ids] = np.floor((event_base_times[entry_event] / self.entry_time[entry_ids]) ** 3 * 1000)
+
+        # Which days each event is held on, so an entry's points can be added to all of its days at once
+        event_on_day = np.zeros((len(self.events), self.num_days), dtype=np.int64)
+        for event, days in self.meet.event_days.items():
+            if event in self.event_ids:
+                event_on_day[self.event_ids[event], np.array(days) - 1] = 1
+
+        counted_points = np.where(self.entry_excluded[entry_ids], 0, self.entry_points[entry_ids])
+        np.add.at(points, self.entry_swimmer[entry_ids], counted_points[:, None] * event_on_day[entry_event])
+        self._points = points
+
+
+def _normalize_name(name: str) -> str:
+    """Get a form of a name that ignores case, accents, punctuation and word order."""
+    without_accents = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return " ".join(sorted(re.findall(r"[a-z0-9]+", without_accents.casefold())))
+
+
+def _grow(column: np.ndarray) -> np.ndarray:
+    """Get a copy of a column with twice as many rows, keeping the existing rows."""
+    grown = np.zeros((len(column) * 2, *column.shape[1:]), dtype=column.dtype)
+    grown[:len(column)] = column
+    return grown
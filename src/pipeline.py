@@ -0,0 +1,215 @@
+"""Pipeline class for running the stages that get a meet ready to solve, rerunning only the stages whose inputs changed."""
+
+import hashlib
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from data_parser import DataParser, PsychSheetError
+from keyed_cache import MAX_ENTRIES, MAX_MEMORY_ENTRIES, KeyedCache, fingerprint
+from meet import Meet
+from tracing import tracer
+
+INPUT_STAGES = ("psych_sheet", "schedule", "base_times") # The stages that read the inputs, which run at the same time
+STAGE_CACHE_DB_PATH = Path(__file__).parent.parent.resolve() / "stage_cache.db"
+WATCH_INTERVAL = 2 # Seconds between checks for changed inputs in watch mode
+
+
+class StageCache(KeyedCache):
+    """Caches the results of pipeline stages that are slow to rerun, keyed by a fingerprint of the stage's inputs."""
+
+    table = "stage_results"
+
+    def __init__(self, path: Path | None = STAGE_CACHE_DB_PATH, max_entries: int = MAX_ENTRIES, max_memory_entries: int = MAX_MEMORY_ENTRIES) -> None:
+        """
+        Initialize the cache, creating the database table if it doesn't exist.
+
+        Keyword Arguments:
+            path: the SQLite database file to store results in, or None to only keep them in memory
+            max_entries: the maximum number of results to keep on disk
+            max_memory_entries: the maximum number of results to also keep in memory
+
+        """
+        super().__init__(path, max_entries, max_memory_entries)
+
+
+class Pipeline:
+    """
+    Runs the stages that turn a meet's psych sheet, schedule and world records into projected points.
+
+    Each stage is keyed by a hash of the content of its inputs, and a stage's key includes the keys of the stages it
+    depends on, so when an input changes only the stages downstream of it rerun:
+        psych_sheet: the psych sheet PDF -> swimmers and entries
+        schedule: the meet's schedule in the schedule store -> schedule
+        base_times: swimming.db -> base times
+        seeding: psych_sheet -> seeds
+        scoring: psych_sheet, schedule and base_times -> projected points
+    Extracting the text of the psych sheet is most of the work, so its lines are also kept in a StageCache by the hash
+    of the PDF, and a new process only extracts a psych sheet it hasn't seen.
+    Solves are already keyed by their problem in the SolveCache, so only the days whose points changed are solved again.
+    Once swimmers have been created, a changed psych sheet is applied as a revision, changing only the entries that
+    differ, and only the events and swimmers it touched are seeded and scored again.
+    """
+
+    def __init__(self, meet: Meet, stage_cache: StageCache | None = None) -> None:
+        """
+        Initialize the pipeline for a meet with no stages run.
+
+        Keyword Arguments:
+            meet: the meet to run the pipeline for
+            stage_cache: the cache to keep psych sheet lines in across processes, if any
+
+        """
+        self.meet = meet
+        self.stage_cache = stage_cache
+        self.parser = DataParser(meet)
+        self.keys: dict[str, str] = {} # The key each stage last ran with
+        self.revision: dict[str, list] | None = None # The change report of the last psych sheet applied as a revision
+
+
+    def __repr__(self) -> str:
+        """Return a string representation of the Pipeline."""
+        return f"Pipeline(meet={self.meet.name}, stages_run={sorted(self.keys)})"
+
+
+    @property
+    def watched_paths(self) -> list[Path]:
+        """The files the inputs of the pipeline are read from."""
+        return [self.meet.psych_sheet_path, self.meet.schedule_store.path, self.meet.db_path]
+
+
+    def run(self) -> dict[str, float]:
+        """
+        Run every stage whose key changed since the last run, returning how long each stage that ran took and how long they took together under "total".
+
+        The psych sheet, schedule and base times don't depend on each other, so the ones that changed run at the same
+        time, unless the tracer is profiling or measuring the memory of the stages. An input that can't be read, e.g. a psych sheet that is missing or only partly written while it is being
+        replaced, keeps its last key and what its stage last produced, and is read again on the next run. Before the
+        psych sheet has been read once there is nothing to keep, so its PsychSheetError is raised instead.
+        """
+        start = time.perf_counter()
+        input_keys = {
+            "psych_sheet": _hash_files(self.meet.psych_sheet_path),
+            "schedule": self._get_schedule_key(),
+            "base_times": _hash_files(self.meet.db_path, self.meet.db_path.with_name(self.meet.db_path.name + "-wal")),
+        }
+        input_stages = {"psych_sheet": self._run_psych_sheet, "schedule": self._run_schedule, "base_times": self._run_base_times}
+        changed = [stage for stage, key in input_keys.items() if stage not in self.keys or (key is not None and key != self.keys[stage])]
+
+        timings = {}
+        failed = set()
+
+        def run_stage(stage: str) -> None:
+            stage_start = time.perf_counter()
+            try:
+                input_stages[stage](input_keys[stage])
+            except PsychSheetError as e:
+                if stage not in self.keys:
+                    raise
+                print(f"{e} Keeping the previous psych sheet until it can be read.")
+                failed.add(stage)
+                return
+            timings[stage] = time.perf_counter() - stage_start
+
+        # Stages on other threads would show up in each other's profiles and memory, so they take turns while being measured
+        max_workers = 1 if tracer.isolates_stages else len(input_stages)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline") as pool:
+            futures = [pool.submit(run_stage, stage) for stage in changed]
+            for future in futures:
+                future.result()
+        changed = [stage for stage in changed if stage not in failed]
+        # In the order the stages are listed rather than the order they finished in
+        timings = {stage: timings[stage] for stage in changed}
+        for stage in changed:
+            self.keys[stage] = input_keys[stage]
+        if self.keys["schedule"] is None:
+            # A schedule that wasn't in the store is only keyed once it has been fetched into it
+            self.keys["schedule"] = self._get_schedule_key()
+
+        # A revision only touches some events and swimmers, but new base times or a new schedule change everyone's points
+        revision = self.revision if "psych_sheet" in changed else None
+        events = revision["events"] if revision else None
+        swimmers = revision["swimmers"] if revision and not {"schedule", "base_times"} & set(changed) else None
+        derived_stages = {
+            "seeding": (partial(self.parser.update_seeds, events), ["psych_sheet"]),
+            "scoring": (partial(self.parser.update_projected_points, swimmers), ["psych_sheet", "schedule", "base_times"]),
+        }
+        for stage, (run_derived_stage, dependencies) in derived_stages.items():
+            key = fingerprint(stage=stage, **{dependency: self.keys[dependency] for dependency in dependencies})
+            if self.keys.get(stage) != key:
+                stage_start = time.perf_counter()
+                run_derived_stage()
+                timings[stage] = time.perf_counter() - stage_start
+                self.keys[stage] = key
+
+        if timings:
+            timings["total"] = time.perf_counter() - start
+        return timings
+
+
+    def watch(self, on_change: Callable[[dict[str, float]], None], interval: float = WATCH_INTERVAL) -> None:
+        """
+        Check the inputs for changes until interrupted, rerunning the stages downstream of any that changed.
+
+        Keyword Arguments:
+            on_change: called with the stage timings after each rerun that changed the projected points
+            interval: the seconds between checks
+
+        """
+        while True:
+            time.sleep(interval)
+            timings = self.run()
+            if "scoring" in timings:
+                on_change(timings)
+
+
+    def _get_schedule_key(self) -> str | None:
+        """Get the key of the meet's schedule in the schedule store, or None if it isn't stored."""
+        schedule = self.meet.schedule_store.get(self.meet.name)
+        return fingerprint(stage="schedule", schedule=schedule) if schedule is not None else None
+
+
+    def _run_psych_sheet(self, key: str | None) -> None:
+        """Create the swimmers from the psych sheet, or apply it as a revision if they exist, reading its lines from the stage cache if it has been read before."""
+        cache_key = fingerprint(stage="psych_sheet_lines", pdf=key) if key and self.stage_cache else None
+        cached = self.stage_cache.get(cache_key) if cache_key else None
+        if cached:
+            lines = cached["lines"]
+        else:
+            lines = self.parser.read_psych_sheet()
+            if cache_key:
+                self.stage_cache.put(cache_key, {"lines": lines})
+
+        if self.parser.data is None:
+            self.parser.create_swimmers(lines)
+            self.revision = None
+        else:
+            self.revision = self.parser.apply_psych_sheet_revision(lines)
+
+
+    def _run_schedule(self, key: str | None) -> None:
+        """Get the schedule from the schedule store, or fetch it if it isn't stored."""
+        if key is not None:
+            self.meet.schedule = self.meet.schedule_store.get(self.meet.name)
+        self.parser.get_all_data()
+
+
+    def _run_base_times(self, _key: str | None) -> None:
+        """Read the base times from the database."""
+        self.meet.reload_base_times()
+
+
+def _hash_files(*paths: Path) -> str | None:
+    """Get a hash of the contents of the files that exist, or None if none of them do."""
+    digest = hashlib.sha256()
+    found = False
+    for path in paths:
+        try:
+            digest.update(path.read_bytes())
+            found = True
+        except FileNotFoundError:
+            continue
+
+    return digest.hexdigest() if found else None
@@ -0,0 +1,164 @@
+"""Fetch meet schedules from the World Aquatics website."""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from bs4 import BeautifulSoup
+
+from schedule_store import ScheduleStore
+from utils.constants import SCHEDULE_URLS
+
+SCHEDULE_DAY_CLASS = "schedule__day"
+REQUEST_TIMEOUT = 10 # Seconds to wait for the schedule page to respond
+BROWSER_TIMEOUT = 30 # Seconds to wait for the schedule to render in the browser fallback
+MAX_WORKERS = 4 # Maximum number of schedules fetched at once when prefetching
+
+
+def fetch_schedule(schedule_url: str, session: requests.Session | None = None) -> dict[int, list[tuple[str, str]]]:
+    """
+    Get the schedule from the schedule URL, as the events and their round for each day.
+
+    Keyword Arguments:
+        schedule_url: the URL of the schedule to get
+        session: the HTTP session to fetch the page with (a new request is made if not given)
+
+    """
+    return parse_schedule(get_schedule_chunks(schedule_url, session))
+
+
+def get_schedule_chunks(schedule_url: str, session: requests.Session | None = None) -> list[str]:
+    """
+    Return one chunk of the schedule for each day in the meet.
+
+    The page is fetched directly over HTTP first, and only rendered in a headless browser if the schedule isn't in the HTML.
+
+    Keyword Arguments:
+        schedule_url: the URL of the schedule to get
+        session: the HTTP session to fetch the page with (a new request is made if not given)
+
+    """
+    print(f"Fetching schedule from {schedule_url}...")
+    response = (session or requests).get(schedule_url, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+
+    chunks = parse_schedule_chunks(response.text)
+    if chunks:
+        return chunks
+
+    print("Schedule not found in the page HTML. Rendering it in a browser instead...")
+    return _get_rendered_schedule_chunks(schedule_url)
+
+
+def parse_schedule_chunks(html: str) -> list[str]:
+    """
+    Get the text of each day of the schedule from the schedule page HTML, one line per element.
+
+    Keyword Arguments:
+        html: the HTML of the schedule page
+
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    days = soup.find_all(class_=SCHEDULE_DAY_CLASS)
+    return [day.get_text("\n", strip=True) for day in days]
+
+
+def parse_schedule(chunks: list[str]) -> dict[int, list[tuple[str, str]]]:
+    """
+    Convert the text of each day of the schedule into the individual events and their round for each day.
+
+    Keyword Arguments:
+        chunks: the text of each day of the schedule
+
+    """
+    schedule = {}
+    for chunk_index, chunk in enumerate(chunks):
+        lines = chunk.split("\n")
+        day = chunk_index + 1
+        schedule[day] = []
+        for line_index, line in enumerate(lines[:-1]):
+            if line.split()[0][-2:] == "en" and "Relay" not in line and lines[line_index + 1] != "Heats":
+                schedule[day].append((format_event_name(line), lines[line_index + 1]))
+
+    return schedule
+
+
+def format_event_name(event: str) -> str:
+    """
+    Convert event text into same event name as on psych sheet.
+
+    Keyword Arguments:
+        event: the event name to format
+
+    """
+    partially_corrected = re.sub("m Medley", "m Individual Medley", event)
+    return re.sub("en ", "en's ", partially_corrected)
+
+
+def prefetch_schedules(meet_names: list[str] | None = None, store: ScheduleStore | None = None, max_workers: int = MAX_WORKERS) -> list[str]:
+    """
+    Fetch the schedules for every meet that isn't already cached, concurrently, and add them to the schedule store.
+
+    Keyword Arguments:
+        meet_names: the meets to fetch schedules for (defaults to every meet in SCHEDULE_URLS)
+        store: the schedule store to add the schedules to
+        max_workers: the maximum number of schedules to fetch at once
+
+    Returns the names of the meets that were fetched.
+
+    """
+    store = store or ScheduleStore()
+    missing = [meet_name for meet_name in (meet_names or SCHEDULE_URLS) if store.get(meet_name) is None]
+    if not missing:
+        return []
+
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        schedules = pool.map(lambda meet_name: fetch_schedule(SCHEDULE_URLS[meet_name], session), missing)
+        for meet_name, schedule in zip(missing, schedules, strict=True):
+            store.put(meet_name, schedule)
+            print(f"Cached schedule for {meet_name} ({len(schedule)} days)")
+
+    return missing
+
+
+def _get_rendered_schedule_chunks(schedule_url: str) -> list[str]:
+    """
+    Render the schedule page in headless Chrome and return one chunk of the schedule for each day in the meet.
+
+    Keyword Arguments:
+        schedule_url: the URL of the schedule to get
+
+    """
+    # Selenium is only needed when the schedule isn't in the page HTML, so only import it then
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+
+    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+    try:
+        driver.get(schedule_url)
+
+        # Wait until every day of the schedule has rendered its text, instead of sleeping for a fixed time
+        def days_rendered(driver: webdriver.Chrome) -> list[str] | bool:
+            days = driver.find_elements(By.CLASS_NAME, SCHEDULE_DAY_CLASS)
+            days_text = [day.text for day in days]
+            return bool(days_text) and all(days_text) and days_text
+
+        return WebDriverWait(driver, BROWSER_TIMEOUT).until(days_rendered)
+    finally:
+        driver.quit()
+
+
+def main() -> None:
+    """Prefetch the schedules for every meet."""
+    fetched = prefetch_schedules()
+    print(f"Fetched {len(fetched)} schedules.")
+
+if __name__ == "__main__":
+    main()
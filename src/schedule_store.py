@@ -0,0 +1,177 @@
+"""ScheduleStore class for caching the schedules of every meet in one file."""
+
+import contextlib
+import json
+import stat
+import tempfile
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError: # Windows
+    import msvcrt
+    fcntl = None
+
+from tracing import tracer
+from utils.constants import SCHEDULE_URLS
+
+CACHE_FILE_PATH = Path(__file__).parent.parent.resolve() / "cached_data.json"
+NEW_FILE_MODE = 0o644 # Permissions of a new cache file, the ones open() gives a file under the usual umask
+
+
+class ScheduleStore:
+    """
+    Caches meet schedules in a JSON file, keyed by meet name.
+
+    The file is only written when a schedule changes, and it is replaced atomically so concurrent readers
+    always see either the old or the new file, never a partially written one. Writers in other processes, e.g. the
+    backtest's workers, take turns through a lock file next to it, so none of them overwrites a schedule another
+    one just stored.
+    """
+
+    def __init__(self, path: Path = CACHE_FILE_PATH) -> None:
+        """
+        Initialize the store for the given cache file.
+
+        Keyword Arguments:
+            path: the JSON file to store schedules in
+
+        """
+        self.path = path
+        self._schedules: dict[str, dict] = {}
+        self._loaded_mtime: int | None = None
+        self._lock = threading.Lock()
+
+
+    def __repr__(self) -> str:
+        """Return a string representation of the ScheduleStore."""
+        return f"ScheduleStore(path={self.path}, meets={sorted(self._schedules)})"
+
+
+    def get(self, meet_name: str) -> dict[int, list] | None:
+        """
+        Get the cached schedule for a meet, or None if it isn't cached or its schedule URL has changed.
+
+        Keyword Arguments:
+            meet_name: the meet to get the schedule for, e.g. "2024 SCM Worlds"
+
+        """
+        with self._lock:
+            self._reload_if_changed()
+            cached = self._schedules.get(meet_name)
+
+        if not cached or cached.get("schedule_url") != SCHEDULE_URLS.get(meet_name):
+            return None
+
+        # JSON object keys are always strings, but days are integers everywhere else
+        return {int(day): events for day, events in cached["schedule"].items()}
+
+
+    def put(self, meet_name: str, schedule: dict[int, list]) -> None:
+        """
+        Store the schedule for a meet, writing the cache file only if something changed.
+
+        Keyword Arguments:
+            meet_name: the meet the schedule is for, e.g. "2024 SCM Worlds"
+            schedule: the schedule to store
+
+        """
+        # Round trip through JSON so tuples and integer keys compare equal to what was loaded from the file
+        new_entry = json.loads(json.dumps({"schedule": schedule, "schedule_url": SCHEDULE_URLS[meet_name]}))
+
+        with self._lock, self._lock_file():
+            # Reload first so schedules written by other processes since the last read aren't lost
+            self._reload_if_changed()
+            if self._schedules.get(meet_name) == new_entry:
+                return
+
+            self._schedules[meet_name] = new_entry
+            self._write()
+
+
+    def meets(self) -> list[str]:
+        """Get the names of all meets with a cached schedule."""
+        with self._lock:
+            self._reload_if_changed()
+            return [meet_name for meet_name in self._schedules if self.get_url(meet_name) == SCHEDULE_URLS.get(meet_name)]
+
+
+    def get_url(self, meet_name: str) -> str | None:
+        """
+        Get the URL the cached schedule for a meet was fetched from.
+
+        Keyword Arguments:
+            meet_name: the meet to get the schedule URL for
+
+        """
+        return self._schedules.get(meet_name, {}).get("schedule_url")
+
+
+    @contextlib.contextmanager
+    def _lock_file(self) -> Iterator[None]:
+        """Hold an exclusive lock shared with other processes, so only one of them reads, changes and replaces the cache file at a time."""
+        # The cache file itself is replaced on every write, so the lock is taken on a file that stays put
+        lock_path = self.path.with_name(self.path.name + ".lock")
+        with lock_path.open("a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+    def _reload_if_changed(self) -> None:
+        """Read the cache file again if it has been modified since it was last read."""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._schedules = {}
+            self._loaded_mtime = None
+            return
+
+        if mtime == self._loaded_mtime:
+            return
+
+        with tracer.span("schedule_cache_load") as span, self.path.open("r") as file:
+            data = json.load(file)
+            span["meets"] = len(data.get("schedules", {}))
+
+        self._schedules = data.get("schedules", {})
+
+        # Older cache files held a single schedule, so file it under the meet its URL belongs to
+        legacy_schedule = data.get("schedule_data")
+        if legacy_schedule:
+            for meet_name, schedule_url in SCHEDULE_URLS.items():
+                if schedule_url == legacy_schedule.get("schedule_url") and meet_name not in self._schedules:
+                    self._schedules[meet_name] = legacy_schedule
+
+        self._loaded_mtime = mtime
+
+
+    def _write(self) -> None:
+        """Atomically replace the cache file with the current schedules, keeping the file's permissions."""
+        try:
+            mode = stat.S_IMODE(self.path.stat().st_mode)
+        except FileNotFoundError:
+            mode = NEW_FILE_MODE
+
+        file = tempfile.NamedTemporaryFile("w", dir=self.path.parent, prefix=self.path.name, suffix=".tmp", delete=False) # noqa: SIM115 (the file outlives the with statement when it replaces the cache file)
+        temp_path = Path(file.name)
+        try:
+            with file:
+                json.dump({"schedules": self._schedules}, file, indent=4)
+            # Temporary files are only readable by their owner, which would lock other users out of the shared cache
+            temp_path.chmod(mode)
+            temp_path.replace(self.path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        self._loaded_mtime = self.path.stat().st_mtime_ns
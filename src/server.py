@@ -0,0 +1,235 @@
+"""Flask server that keeps meet data warm in memory and serves lineup optimizations."""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from flask import Flask, abort, jsonify, request
+
+from data_parser import DataParser
+from meet import Meet
+from meet_data import MeetData
+from schedule_store import ScheduleStore
+from solvers.errors import SolveError
+from solvers.full_meet_solver import FullMeetSolver
+from solvers.result_cache import SolveCache
+from solvers.single_day_solver import SingleDaySolver
+from swimmer import Swimmer
+from utils.constants import SCHEDULE_URLS, SWITCHES
+
+MAX_WORKERS = 4 # Maximum number of solves running at once
+MAX_LINEUPS = 20 # Maximum number of lineups a top-K request can ask for
+HTTP_BAD_REQUEST = 400
+HTTP_NOT_FOUND = 404
+HTTP_INTERNAL_SERVER_ERROR = 500
+
+app = Flask(__name__)
+
+# Solves run on a bounded pool so a burst of requests can't start an unbounded number of MIPs
+solve_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="solver")
+
+# Identical problems are answered from the cache instead of solving the MIP again, kept only in memory so requests
+# never wait on the disk
+solve_cache = SolveCache(None)
+
+# Meets are parsed once and then only read, so every request after the first is served from memory
+schedule_store = ScheduleStore()
+loaded_meets: dict[str, DataParser] = {}
+# Meets being parsed right now, so only requests for the same meet wait on its cold load
+loading_meets: dict[str, Future] = {}
+loading_meets_lock = threading.Lock()
+
+
+def meet_slug(meet_name: str) -> str:
+    """
+    Convert a meet name into the form used in URLs, e.g. "2024 SCM Worlds" -> "2024-scm-worlds".
+
+    Keyword Arguments:
+        meet_name: the meet name to convert
+
+    """
+    return meet_name.lower().replace(" ", "-")
+
+
+MEET_NAMES_BY_SLUG = {meet_slug(meet_name): meet_name for meet_name in SCHEDULE_URLS}
+
+
+def load_meet(meet_name: str) -> DataParser:
+    """
+    Get the parsed data for a meet, parsing it the first time it is requested.
+
+    Only requests for the same meet wait while it is being parsed, and requests for a loaded meet never wait.
+
+    Keyword Arguments:
+        meet_name: the meet to load, e.g. "2024 SCM Worlds"
+
+    """
+    # A meet that is already loaded is only read, so it is served without taking any lock
+    parser = loaded_meets.get(meet_name)
+    if parser is not None:
+        return parser
+
+    with loading_meets_lock:
+        # The meet may have finished loading between the lookup above and taking the lock
+        parser = loaded_meets.get(meet_name)
+        if parser is not None:
+            return parser
+
+        future = loading_meets.get(meet_name)
+        is_loader = future is None
+        if is_loader:
+            future = Future()
+            loading_meets[meet_name] = future
+
+    if not is_loader:
+        return future.result()
+
+    try:
+        parser = _parse_meet(meet_name)
+    except BaseException as e:
+        # Requests waiting on this load get the same error, and the next request tries to load the meet again
+        with loading_meets_lock:
+            del loading_meets[meet_name]
+        future.set_exception(e)
+        raise
+
+    loaded_meets[meet_name] = parser
+    with loading_meets_lock:
+        del loading_meets[meet_name]
+    future.set_result(parser)
+    return parser
+
+
+def _parse_meet(meet_name: str) -> DataParser:
+    """Get the schedule, psych sheet and base times of a meet, and seed and score its swimmers."""
+    parser = DataParser(Meet(meet_name, schedule_store))
+    parser.load_concurrently()
+    parser.update_seeds()
+    parser.update_projected_points()
+    return parser
+
+
+def _get_meet_or_404(slug: str) -> DataParser:
+    """Get the loaded meet for a URL slug, or abort with a 404 if the meet is not recognized."""
+    if slug not in MEET_NAMES_BY_SLUG:
+        abort(HTTP_NOT_FOUND, description=f"Meet not recognized: {slug}")
+
+    return load_meet(MEET_NAMES_BY_SLUG[slug])
+
+
+def _check_valid_day(parser: DataParser, day: int) -> None:
+    """Abort with a 400 if the day is not in the meet."""
+    if day < 1 or day > len(parser.schedule):
+        abort(HTTP_BAD_REQUEST, description=f"Day must be between 1 and the number of days ({len(parser.schedule)}), inclusive.")
+
+
+def _run_solve(func: callable, *args: object) -> object:
+    """Run a solve on the worker pool and wait for the result."""
+    try:
+        return solve_pool.submit(func, *args).result()
+    except SolveError as e:
+        abort(HTTP_INTERNAL_SERVER_ERROR, description=str(e))
+
+
+def _swimmer_to_dict(swimmer: Swimmer, day: int, captain: Swimmer | None = None) -> dict:
+    """Convert a swimmer in a lineup to a JSON serializable dictionary."""
+    multiplier = 2 if swimmer is captain else 1
+    return {
+        "name": swimmer.name,
+        "country": swimmer.country,
+        "sex": swimmer.sex,
+        "cost": swimmer.cost,
+        "captain": swimmer is captain,
+        "projected_points": swimmer.projected_points[day - 1] * multiplier,
+    }
+
+
+def _solve_top_lineups(data: MeetData, day: int, num_lineups: int) -> list[dict]:
+    """Solve for the top lineups of a day, excluding each lineup after it is found."""
+    solver = SingleDaySolver(data, day, solve_cache)
+    lineups = []
+    for _ in range(num_lineups):
+        lineup, captain, total_score = solver.solve()
+        lineups.append({
+            "lineup": [_swimmer_to_dict(swimmer, day, captain) for swimmer in lineup],
+            "total_points": total_score,
+        })
+        solver.exclude_lineup(lineup, captain)
+
+    return lineups
+
+
+def _solve_full_meet(data: MeetData, switches: int, start_day: int, end_day: int) -> dict:
+    """Solve the full meet and convert the solution to a JSON serializable dictionary."""
+    solver = FullMeetSolver(data, switches, start_day, end_day, solve_cache)
+    solution = solver.solve()
+
+    formatted = {}
+    for key, value in solution.items():
+        if key == "Grand Total":
+            formatted[key] = value
+            continue
+
+        day = int(key.split()[-1])
+        captain = value.get("Captain")
+        formatted[key] = {
+            "lineup": [_swimmer_to_dict(swimmer, day, captain) for swimmer in value["female_swimmers"] + value["male_swimmers"]],
+            "total_points": value["total_points"],
+            "total_switches": value["total_switches"],
+        }
+
+    return formatted
+
+
+@app.get("/meets")
+def list_meets() -> object:
+    """List the meets that can be optimized and whether they are already loaded."""
+    return jsonify([
+        {"meet": meet_name, "slug": slug, "loaded": meet_name in loaded_meets}
+        for slug, meet_name in MEET_NAMES_BY_SLUG.items()
+    ])
+
+
+@app.get("/meets/<slug>/days/<int:day>/lineup")
+def single_day_lineup(slug: str, day: int) -> object:
+    """Get the optimal lineup for a single day of a meet."""
+    parser = _get_meet_or_404(slug)
+    _check_valid_day(parser, day)
+
+    return jsonify(_run_solve(_solve_top_lineups, parser.data, day, 1)[0])
+
+
+@app.get("/meets/<slug>/days/<int:day>/lineups")
+def top_lineups(slug: str, day: int) -> object:
+    """Get the top K lineups for a single day of a meet, with K given by the "k" query parameter."""
+    parser = _get_meet_or_404(slug)
+    _check_valid_day(parser, day)
+
+    num_lineups = request.args.get("k", default=5, type=int)
+    if num_lineups < 1 or num_lineups > MAX_LINEUPS:
+        abort(HTTP_BAD_REQUEST, description=f"k must be between 1 and {MAX_LINEUPS}, inclusive.")
+
+    return jsonify(_run_solve(_solve_top_lineups, parser.data, day, num_lineups))
+
+
+@app.get("/meets/<slug>/full-meet")
+def full_meet(slug: str) -> object:
+    """Get the optimal lineups for a range of days, given by the "start_day", "end_day" and "switches" query parameters."""
+    parser = _get_meet_or_404(slug)
+
+    start_day = request.args.get("start_day", default=1, type=int)
+    end_day = request.args.get("end_day", default=len(parser.schedule), type=int)
+    switches = request.args.get("switches", default=SWITCHES, type=int)
+    _check_valid_day(parser, start_day)
+    _check_valid_day(parser, end_day)
+    if end_day < start_day:
+        abort(HTTP_BAD_REQUEST, description="end_day must not be before start_day.")
+
+    return jsonify(_run_solve(_solve_full_meet, parser.data, switches, start_day, end_day))
+
+
+def main() -> None:
+    """Run the optimization server."""
+    app.run(threaded=True)
+
+if __name__ == "__main__":
+    main()
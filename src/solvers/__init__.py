@@ -1,6 +1,10 @@
 """Solvers for optimizing swim lineups."""
 
+from .errors import SolveError
 from .full_meet_solver import FullMeetSolver
+from .result_cache import SolveCache
+from .single_day_session import SingleDaySession
 from .single_day_solver import SingleDaySolver
+from .solve_job import SolveJob
 
-__all__ = ["FullMeetSolver", "SingleDaySolver"]
+__all__ = ["FullMeetSolver", "SingleDaySession", "SingleDaySolver", "SolveCache", "SolveError", "SolveJob"]
@@ -0,0 +1,5 @@
+"""Errors raised by the solvers."""
+
+
+class SolveError(Exception):
+    """Raised when a solver can't find an optimal lineup, e.g. because no lineup fits the budget."""
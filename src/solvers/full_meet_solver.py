@@ -1,11 +1,18 @@
 """A class to solve the mixed integer program for a single day of a swim meet."""
 
-import sys
 import time
+from itertools import islice
+from pathlib import Path
 
-from ortools.linear_solver import pywraplp
+import numpy as np
 
-from swimmer import Swimmer
+from keyed_cache import fingerprint
+from meet_data import MeetData
+from solvers import model_files
+from solvers.errors import SolveError
+from solvers.result_cache import SolveCache
+from swimmer import FEMALE, MALE, Swimmer
+from tracing import tracer
 
 BUDGET = 200
 ROSTER_SIZE = 8
@@ -13,11 +20,13 @@ ROSTER_SIZE = 8
 class FullMeetSolver:
     """A class to solve the mixed integer program for the full swim meet."""
 
-    def __init__(self, swimmers: list[Swimmer], switches: int, start_day: int = 1, end_day: int | None = None) -> None:
-        """Initialize the FullMeetSolver with a list of swimmers."""
-        self.all_swimmers: list[Swimmer] = swimmers
+    def __init__(self, data: MeetData, switches: int, start_day: int = 1, end_day: int | None = None, cache: SolveCache | None = None) -> None:
+        """Initialize the FullMeetSolver with the meet data, and optionally a cache of previous results."""
+        self.data = data
+        self.all_swimmers: list[Swimmer] = data.swimmers
         self.switches = switches
-        self.num_days: int = len(swimmers[0].projected_points)
+        self.cache = cache
+        self.num_days: int = data.num_days
 
         self.start_day, self.end_day = self._check_valid_day_range(start_day, end_day)
 
@@ -32,7 +41,9 @@ class FullMeetSolver:
 
         self.num_females: int = 0
         self.num_males: int = 0
-        self.solution_values: list[float] = []
+        self.solution_values: dict[str, list] = {}
+        self.objective_value: float = 0
+        self.cache_key: str | None = None # The key load_cached_solution looked the problem up by
 
 
     def __repr__(self) -> str:
@@ -40,12 +51,61 @@ class FullMeetSolver:
         return f"FullMeetSolver(num_females={self.num_females}, num_males={self.num_males}) from day {self.start_day} to day {self.end_day}"
 
 
-    def solve(self) -> None:
+    def solve(self) -> dict[str, dict]:
         """Solve the mixed integer program to find the optimal lineups for the whole meet."""
-        self.solver = pywraplp.Solver.CreateSolver("SAT")
+        self.get_data()
+        if not self.load_cached_solution():
+            self.build_model()
+            self._solve_model()
+            self.cache_solution()
+
+        with tracer.span("lineup_extraction", start_day=self.start_day, end_day=self.end_day):
+            return self.get_solution()
+
+
+    def export_model(self, path: Path) -> None:
+        """
+        Build the model for the day range and write it to a file, with the swimmer and day of each variable next to it.
+
+        Keyword Arguments:
+            path: the file to write, ending in .mps, .lp, .pb or .pbtxt
+
+        """
+        self.get_data()
+        self.build_model()
+        model_files.export_model(
+            self.solver,
+            path,
+            self._get_variable_mapping(),
+            {
+                "solver": "FullMeetSolver",
+                "meet": self.data.meet.name,
+                "start_day": self.start_day,
+                "end_day": self.end_day,
+                "switches": self.switches,
+                "fingerprint": self._get_fingerprint(),
+            },
+        )
+
+
+    def solve_model_file(self, path: Path, backend: str = "SAT") -> dict[str, dict]:
+        """
+        Solve a model file exported by export_model instead of building the model, to find the optimal lineups for the day range.
+
+        Keyword Arguments:
+            path: the model file, ending in .mps, .pb or .pbtxt
+            backend: the pywraplp solver to solve it with, e.g. "SAT", "CBC", "SCIP" or "HIGHS"
+
+        """
+        self.get_data()
+        self.solver, mapping = model_files.load_model(path, backend)
+        if mapping["metadata"].get("fingerprint") != self._get_fingerprint():
+            msg = f"The model file {path} wasn't exported for days {self.start_day} to {self.end_day} of this meet with these swimmers and switches."
+            raise ValueError(msg)
+        self._solve_model()
 
-        self._get_data()
-        self._get_solution()
+        with tracer.span("lineup_extraction", start_day=self.start_day, end_day=self.end_day):
+            return self.get_solution()
 
 
     def _check_valid_day_range(self, start_day: int, end_day: int) -> tuple[int, int]:
@@ -62,142 +122,205 @@ class FullMeetSolver:
         return start_day, self.num_days
 
 
-    def _get_data(self) -> None:
-        self.male_swimmers = self._get_male_swimmers()
-        self.female_swimmers = self._get_female_swimmers()
+    def get_data(self) -> None:
         """Get the data needed to solve the mixed integer program."""
+        female_ids = self._get_swimmer_ids(FEMALE)
+        male_ids = self._get_swimmer_ids(MALE)
+        self.num_females = len(female_ids)
+        self.num_males = len(male_ids)
+        self.female_swimmers = [self.all_swimmers[swimmer_id] for swimmer_id in female_ids]
+        self.male_swimmers = [self.all_swimmers[swimmer_id] for swimmer_id in male_ids]
+
+        # projected points for each day in the range, in the same swimmer order as the swimmer lists
+        range_points = self.data.points[:, self.start_day - 1:self.end_day]
+        self.female_points[:self.end_day - self.start_day + 1] = range_points[female_ids].T.tolist()
+        self.male_points[:self.end_day - self.start_day + 1] = range_points[male_ids].T.tolist()
+
+        # costs in same swimmer order as projected points
+        self.female_costs = self.data.cost[female_ids].tolist()
+        self.male_costs = self.data.cost[male_ids].tolist()
+
+
+    def _get_fingerprint(self) -> str:
+        """Get a key that identifies the problem, so identical problems can share a cached result."""
+        return fingerprint(
+            solver="FullMeetSolver",
+            start_day=self.start_day,
+            end_day=self.end_day,
+            switches=self.switches,
+            female_points=self.female_points[:self.end_day - self.start_day + 1],
+            male_points=self.male_points[:self.end_day - self.start_day + 1],
+            female_costs=self.female_costs,
+            male_costs=self.male_costs,
+            budget=BUDGET,
+            roster_size=ROSTER_SIZE,
+        )
+
+
+    def load_cached_solution(self) -> bool:
+        """Take the solution from the cache if the problem got by get_data was solved before, returning whether it was."""
+        with tracer.span("solve_cache_lookup", start_day=self.start_day, end_day=self.end_day) as span:
+            self.cache_key = self._get_fingerprint() if self.cache else None
+            cached_result = self.cache.get(self.cache_key) if self.cache else None
+            span["hit"] = bool(cached_result)
+        if cached_result:
+            self.solution_values = cached_result["solution_values"]
+            self.objective_value = cached_result["objective_value"]
+        return bool(cached_result)
+
+
+    def cache_solution(self) -> None:
+        """Store the optimal solution in the cache, under the problem load_cached_solution looked up."""
+        if self.cache:
+            self.cache.put(self.cache_key, {"solution_values": self.solution_values, "objective_value": self.objective_value})
+
+
+    def build_model(self) -> None:
+        """Build the mixed integer program for the day range in a new solver."""
+        # OR-Tools is slow to import, so it's only loaded when a model is built
+        from ortools.linear_solver import pywraplp
+        self.solver = pywraplp.Solver.CreateSolver("SAT")
 
-        for day in range(self.start_day, self.end_day + 1):
-            # female projected points from greatest to least
-            self.female_points[day - self.start_day] = [x.projected_points[day - 1] for x in self.female_swimmers]
-            # male projected points from greatest to least
-            self.male_points[day - self.start_day] = [x.projected_points[day - 1] for x in self.male_swimmers]
-
-        # female costs in same swimmer order as projected points
-        self.female_costs = [x.cost for x in self.female_swimmers]
-        # male costs in same swimmer order as projected points
-        self.male_costs = [x.cost for x in self.male_swimmers]
-
-
-    def _get_solution(self) -> None:
-        # Declare decision variables for female swimmers
-        female_vars = []
-        for day in range(self.start_day, self.end_day + 1):
-            day_vars = []
-            for index in range(self.num_females):
-                var = self.solver.BoolVar(f"day_{day}_female_{index + 1}")
-                day_vars.append(var)
-            female_vars.append(day_vars)
-
-        # Declare decision variables for male swimmers
-        male_vars = []
-        for day in range(self.start_day, self.end_day + 1):
-            day_vars = []
-            for index in range(self.num_males):
-                var = self.solver.BoolVar(f"day_{day}_male_{index + 1}")
-                day_vars.append(var)
-            male_vars.append(day_vars)
-
-        # Declare decision variables for female captains
-        female_captain_vars = []
-        for day in range(self.start_day, self.end_day + 1):
-            day_vars = []
-            for index in range(self.num_females):
-                var = self.solver.BoolVar(f"day_{day}_female_captain_{index + 1}")
-                day_vars.append(var)
-            female_captain_vars.append(day_vars)
-
-        # Declare decision variables for male captains
-        male_captain_vars = []
-        for day in range(self.start_day, self.end_day + 1):
-            day_vars = []
-            for index in range(self.num_males):
-                var = self.solver.BoolVar(f"day_{day}_male_captain_{index + 1}")
-                day_vars.append(var)
-            male_captain_vars.append(day_vars)
-
-        # Declare decision variables for switches
-        switch_vars = []
-        for day in range(self.start_day + 1, self.end_day + 1):
-            day_vars = []
-            for index in range(self.num_females):
-                var = self.solver.BoolVar(f"day_{day}_switch_female_{index + 1}")
-                day_vars.append(var)
-            for index in range(self.num_males):
-                var = self.solver.BoolVar(f"day_{day}_switch_male_{index + 1}")
-                day_vars.append(var)
-            switch_vars.append(day_vars)
-
-        # Declare fake decision variables for number of switches per day to make constraints easier
-        # Can be up to ROSTER_SIZE * 2 switches per day because switches are double counted
-        day_switch_counts = []
-        for day in range(self.start_day + 1, self.end_day + 1):
-            var = self.solver.IntVar(0, ROSTER_SIZE * 2, f"day_{day}_num_switches")
-            day_switch_counts.append(var)
-
-        # Create objective function - only need to change this now (will have to add more variables too)
-        objective_terms = []
-        for day in range(self.start_day, self.end_day + 1):
-            for index, swimmer in enumerate(self.female_swimmers):
-                objective_terms.append(swimmer.projected_points[day - 1] * (female_vars[day - self.start_day][index] + female_captain_vars[day - self.start_day][index]))
-            for index, swimmer in enumerate(self.male_swimmers):
-                objective_terms.append(swimmer.projected_points[day - 1] * (male_vars[day - self.start_day][index] + male_captain_vars[day - self.start_day][index]))
-
-        self.solver.Maximize(sum(objective_terms))
-
-        # Budget constraints
-        for day in range(self.start_day, self.end_day + 1):
-            budget_terms = []
-            for index, swimmer in enumerate(self.female_swimmers):
-                budget_terms.append(swimmer.cost * female_vars[day - self.start_day][index])
-            for index, swimmer in enumerate(self.male_swimmers):
-                budget_terms.append(swimmer.cost * male_vars[day - self.start_day][index])
-
-            self.solver.Add(sum(budget_terms) <= BUDGET)
-
-        # Number of females constraints
-        for day in range(self.start_day, self.end_day + 1):
-            self.solver.Add(sum(female_vars[day - self.start_day]) == ROSTER_SIZE // 2)
-
-        # Number of males constraints
-        for day in range(self.start_day, self.end_day + 1):
-            self.solver.Add(sum(male_vars[day - self.start_day]) == ROSTER_SIZE // 2)
-
-        # Captain constraints (can't be captain if not in lineup, exactly one captain per day)
-        for day in range(self.start_day, self.end_day + 1):
-            for swimmer_var, captain_var in zip(female_vars[day - self.start_day] + male_vars[day - self.start_day], female_captain_vars[day - self.start_day] + male_captain_vars[day - self.start_day], strict=True):
-                self.solver.Add(captain_var <= swimmer_var)
-            self.solver.Add(sum(male_captain_vars[day - self.start_day] + female_captain_vars[day - self.start_day]) == 1)
-
-        # Total switches constraint (switches are double counted)
-        self.solver.Add(sum(day_switch_counts) / 2 <= self.switches)
-
-        # Day switch count constraints
-        for day in range(self.start_day + 1, self.end_day + 1):
-            self.solver.Add(day_switch_counts[day - self.start_day - 1] == sum(switch_vars[day - self.start_day - 1]))
-
-        # Switch constraints
-        for day in range(self.start_day + 1, self.end_day + 1):
-            for index in range(self.num_females):
-                x = female_vars[day - self.start_day][index]
-                y = female_vars[day - self.start_day - 1][index]
-                z = switch_vars[day - self.start_day - 1][index]
-                self.solver.Add(z >= x - y)
-                self.solver.Add(z >= y - x)
-                self.solver.Add(z <= x + y)
-                self.solver.Add(z <= 2 - (x + y))
-            for index in range(self.num_males):
-                x = male_vars[day - self.start_day][index]
-                y = male_vars[day - self.start_day - 1][index]
-                z = switch_vars[day - self.start_day - 1][index + self.num_females]
-                self.solver.Add(z >= x - y)
-                self.solver.Add(z >= y - x)
-                self.solver.Add(z <= x + y)
-                self.solver.Add(z <= 2 - (x + y))
-
+        with tracer.span("model_build", start_day=self.start_day, end_day=self.end_day, solver=repr(self)) as span:
+            # Declare decision variables for female swimmers
+            female_vars = []
+            for day in range(self.start_day, self.end_day + 1):
+                day_vars = []
+                for index in range(self.num_females):
+                    var = self.solver.BoolVar(f"day_{day}_female_{index + 1}")
+                    day_vars.append(var)
+                female_vars.append(day_vars)
+
+            # Declare decision variables for male swimmers
+            male_vars = []
+            for day in range(self.start_day, self.end_day + 1):
+                day_vars = []
+                for index in range(self.num_males):
+                    var = self.solver.BoolVar(f"day_{day}_male_{index + 1}")
+                    day_vars.append(var)
+                male_vars.append(day_vars)
+
+            # Declare decision variables for female captains
+            female_captain_vars = []
+            for day in range(self.start_day, self.end_day + 1):
+                day_vars = []
+                for index in range(self.num_females):
+                    var = self.solver.BoolVar(f"day_{day}_female_captain_{index + 1}")
+                    day_vars.append(var)
+                female_captain_vars.append(day_vars)
+
+            # Declare decision variables for male captains
+            male_captain_vars = []
+            for day in range(self.start_day, self.end_day + 1):
+                day_vars = []
+                for index in range(self.num_males):
+                    var = self.solver.BoolVar(f"day_{day}_male_captain_{index + 1}")
+                    day_vars.append(var)
+                male_captain_vars.append(day_vars)
+
+            # Declare decision variables for switches
+            switch_vars = []
+            for day in range(self.start_day + 1, self.end_day + 1):
+                day_vars = []
+                for index in range(self.num_females):
+                    var = self.solver.BoolVar(f"day_{day}_switch_female_{index + 1}")
+                    day_vars.append(var)
+                for index in range(self.num_males):
+                    var = self.solver.BoolVar(f"day_{day}_switch_male_{index + 1}")
+                    day_vars.append(var)
+                switch_vars.append(day_vars)
+
+            # Declare fake decision variables for number of switches per day to make constraints easier
+            # Can be up to ROSTER_SIZE * 2 switches per day because switches are double counted
+            day_switch_counts = []
+            for day in range(self.start_day + 1, self.end_day + 1):
+                var = self.solver.IntVar(0, ROSTER_SIZE * 2, f"day_{day}_num_switches")
+                day_switch_counts.append(var)
+
+            # Create objective function - only need to change this now (will have to add more variables too)
+            objective_terms = []
+            for day in range(self.start_day, self.end_day + 1):
+                for index, points in enumerate(self.female_points[day - self.start_day]):
+                    objective_terms.append(points * (female_vars[day - self.start_day][index] + female_captain_vars[day - self.start_day][index]))
+                for index, points in enumerate(self.male_points[day - self.start_day]):
+                    objective_terms.append(points * (male_vars[day - self.start_day][index] + male_captain_vars[day - self.start_day][index]))
+
+            self.solver.Maximize(sum(objective_terms))
+
+            # Budget constraints
+            for day in range(self.start_day, self.end_day + 1):
+                budget_terms = []
+                for index, cost in enumerate(self.female_costs):
+                    budget_terms.append(cost * female_vars[day - self.start_day][index])
+                for index, cost in enumerate(self.male_costs):
+                    budget_terms.append(cost * male_vars[day - self.start_day][index])
+
+                self.solver.Add(sum(budget_terms) <= BUDGET)
+
+            # Number of females constraints
+            for day in range(self.start_day, self.end_day + 1):
+                self.solver.Add(sum(female_vars[day - self.start_day]) == ROSTER_SIZE // 2)
+
+            # Number of males constraints
+            for day in range(self.start_day, self.end_day + 1):
+                self.solver.Add(sum(male_vars[day - self.start_day]) == ROSTER_SIZE // 2)
+
+            # Captain constraints (can't be captain if not in lineup, exactly one captain per day)
+            for day in range(self.start_day, self.end_day + 1):
+                for swimmer_var, captain_var in zip(female_vars[day - self.start_day] + male_vars[day - self.start_day], female_captain_vars[day - self.start_day] + male_captain_vars[day - self.start_day], strict=True):
+                    self.solver.Add(captain_var <= swimmer_var)
+                self.solver.Add(sum(male_captain_vars[day - self.start_day] + female_captain_vars[day - self.start_day]) == 1)
+
+            # Total switches constraint (switches are double counted)
+            self.solver.Add(sum(day_switch_counts) / 2 <= self.switches)
+
+            # Day switch count constraints
+            for day in range(self.start_day + 1, self.end_day + 1):
+                self.solver.Add(day_switch_counts[day - self.start_day - 1] == sum(switch_vars[day - self.start_day - 1]))
+
+            # Switch constraints
+            for day in range(self.start_day + 1, self.end_day + 1):
+                for index in range(self.num_females):
+                    x = female_vars[day - self.start_day][index]
+                    y = female_vars[day - self.start_day - 1][index]
+                    z = switch_vars[day - self.start_day - 1][index]
+                    self.solver.Add(z >= x - y)
+                    self.solver.Add(z >= y - x)
+                    self.solver.Add(z <= x + y)
+                    self.solver.Add(z <= 2 - (x + y))
+                for index in range(self.num_males):
+                    x = male_vars[day - self.start_day][index]
+                    y = male_vars[day - self.start_day - 1][index]
+                    z = switch_vars[day - self.start_day - 1][index + self.num_females]
+                    self.solver.Add(z >= x - y)
+                    self.solver.Add(z >= y - x)
+                    self.solver.Add(z <= x + y)
+                    self.solver.Add(z <= 2 - (x + y))
+            span["variables"] = self.solver.NumVariables()
+            span["constraints"] = self.solver.NumConstraints()
+
+
+    def _get_variable_mapping(self) -> list[dict]:
+        """Get the kind, swimmer and day of each variable of the built model, in the model's variable order."""
+        swimmers = self.female_swimmers + self.male_swimmers
+        days = range(self.start_day, self.end_day + 1)
+        variables = [(kind, swimmer.name, day) for kind, sex_swimmers in (("lineup", self.female_swimmers), ("lineup", self.male_swimmers),
+                     ("captain", self.female_swimmers), ("captain", self.male_swimmers)) for day in days for swimmer in sex_swimmers]
+        variables += [("switch", swimmer.name, day) for day in days[1:] for swimmer in swimmers]
+        variables += [("switch_count", None, day) for day in days[1:]]
+
+        return [
+            {"name": var.name(), "kind": kind, "swimmer": swimmer_name, "day": day}
+            for var, (kind, swimmer_name, day) in zip(self.solver.variables(), variables, strict=True)
+        ]
+
+
+    def _solve_model(self) -> None:
+        """Solve the model in the solver and store its solution values, split up by the kind of variable."""
         time1 = time.time()
         # Solve
-        status = self.solver.Solve()
+        with tracer.span("solve", start_day=self.start_day, end_day=self.end_day, solver=repr(self)):
+            status = self.solver.Solve()
         time2 = time.time()
         if self.start_day != self.end_day:
             print(f"MIP for day {self.start_day} to day {self.end_day} solved in {time2 - time1:.4f} seconds")
@@ -205,34 +328,34 @@ class FullMeetSolver:
             print(f"MIP for day {self.start_day} solved in {time2 - time1:.4f} seconds")
 
         # Check that solver worked
-        if status != pywraplp.Solver.OPTIMAL:
-            msg = f"Solver failed with status {status}. Exiting program."
-            sys.exit(msg)
+        if status != self.solver.OPTIMAL:
+            msg = f"Solver failed with status {status} for day {self.start_day} to day {self.end_day}."
+            raise SolveError(msg)
 
-        # Get solution values
+        with tracer.span("solution_extraction", start_day=self.start_day, end_day=self.end_day):
+            self.set_solution_values([var.solution_value() for var in self.solver.variables()], self.solver.Objective().Value())
 
-        self.solution_values = {}
-        self.solution_values["swimmer_decision_vars"] = []
-        for day_vars in [x + y for x, y in zip(female_vars, male_vars, strict=True)]:
-            new_values = [var.solution_value() for var in day_vars]
-            self.solution_values["swimmer_decision_vars"].append(new_values)
-
-        self.solution_values["captain_decision_vars"] = []
-        for day_vars in [x + y for x, y in zip(female_captain_vars, male_captain_vars, strict=True)]:
-            new_values = [var.solution_value() for var in day_vars]
-            self.solution_values["captain_decision_vars"].append(new_values)
 
-        self.solution_values["switch_decision_vars"] = []
-        for day_vars in switch_vars:
-            new_values = [var.solution_value() for var in day_vars]
-            self.solution_values["switch_decision_vars"].append(new_values)
+    def set_solution_values(self, values: list[float], objective_value: float) -> None:
+        """Split the values of the model's variables, in the order they were declared, by the kind of variable and store them with the objective value."""
+        remaining = iter(values)
+        num_days = self.end_day - self.start_day + 1
+        num_swimmers = self.num_females + self.num_males
 
-        self.solution_values["day_switch_counts"] = [int(var.solution_value() / 2) for var in day_switch_counts]
+        female_values = [list(islice(remaining, self.num_females)) for _ in range(num_days)]
+        male_values = [list(islice(remaining, self.num_males)) for _ in range(num_days)]
+        female_captain_values = [list(islice(remaining, self.num_females)) for _ in range(num_days)]
+        male_captain_values = [list(islice(remaining, self.num_males)) for _ in range(num_days)]
 
-        return self._format_solution()
+        self.solution_values = {}
+        self.solution_values["swimmer_decision_vars"] = [x + y for x, y in zip(female_values, male_values, strict=True)]
+        self.solution_values["captain_decision_vars"] = [x + y for x, y in zip(female_captain_values, male_captain_values, strict=True)]
+        self.solution_values["switch_decision_vars"] = [list(islice(remaining, num_swimmers)) for _ in range(num_days - 1)]
+        self.solution_values["day_switch_counts"] = [int(value / 2) for value in remaining]
+        self.objective_value = objective_value
 
 
-    def _format_solution(self) -> dict[str, list]:
+    def get_solution(self) -> dict[str, list]:
         """Format the solution values into a dictionary."""
         solution = {}
         total_points = 0
@@ -247,19 +370,17 @@ class FullMeetSolver:
                 "male_swimmers": male_swimmers,
             }
 
-            total_points = 0
-            for swimmer in female_swimmers:
-                if self.solution_values["captain_decision_vars"][day - self.start_day][self.female_swimmers.index(swimmer)]:
-                    captain = swimmer
-                    solution[f"Day {day}"]["Captain"] = swimmer
-            for swimmer in male_swimmers:
-                if self.solution_values["captain_decision_vars"][day - self.start_day][self.male_swimmers.index(swimmer) + self.num_females]:
-                    captain = swimmer
-                    solution[f"Day {day}"]["Captain"] = swimmer
-
-            day_points_total = sum([swimmer.projected_points[day - 1] * (2 if swimmer == captain else 1) for swimmer in female_swimmers + male_swimmers])
+            # Captain variables are in the same order as the swimmer variables, so the indices line up
+            day_captain_values = self.solution_values["captain_decision_vars"][day - self.start_day]
+            for index in female_indices + male_indices:
+                if day_captain_values[index]:
+                    solution[f"Day {day}"]["Captain"] = self._get_swimmer(index)
+
+            day_points = self.female_points[day - self.start_day] + self.male_points[day - self.start_day]
+            day_points_total = sum(day_points[index] * (2 if day_captain_values[index] else 1) for index in female_indices + male_indices)
             total_points += day_points_total
-            day_switches_used = sum(self.solution_values["day_switch_counts"])
+            # There are no switches on the first day of the range
+            day_switches_used = self.solution_values["day_switch_counts"][day - self.start_day - 1] if day > self.start_day else 0
             total_switches += day_switches_used
             solution[f"Day {day}"]["total_points"] = day_points_total
             solution[f"Day {day}"]["total_switches"] = day_switches_used
@@ -269,6 +390,7 @@ class FullMeetSolver:
             "total_switches": total_switches,
         }
 
+        return solution
 
 
     def print_solution(self) -> None:
@@ -277,40 +399,34 @@ class FullMeetSolver:
         for day, day_solution_values in zip(range(self.start_day, self.end_day + 1), self.solution_values["swimmer_decision_vars"], strict=True):
             print(f"Day {day} lineup:")
             female_indices = list(filter(lambda x: day_solution_values[x], range(self.num_females)))
-            female_swimmers = [self.female_swimmers[x] for x in female_indices]
             male_indices = list(filter(lambda x: day_solution_values[x], range(self.num_females, self.num_females + self.num_males)))
-            male_swimmers = [self.male_swimmers[x - self.num_females] for x in male_indices]
 
             total_points = 0
-            for swimmer in female_swimmers:
-                if self.solution_values["captain_decision_vars"][day - self.start_day][self.female_swimmers.index(swimmer)]:
-                    print(f"{swimmer.name} ({swimmer.projected_points[day - 1] * 2}) (---------- Captain ----------)")
-                    total_points += swimmer.projected_points[day - 1] * 2
-                else:
-                    print(f"{swimmer.name} ({swimmer.projected_points[day - 1]})")
-                    total_points += swimmer.projected_points[day - 1]
-            for swimmer in male_swimmers:
-                if self.solution_values["captain_decision_vars"][day - self.start_day][self.male_swimmers.index(swimmer) + self.num_females]:
-                    print(f"{swimmer.name} ({swimmer.projected_points[day - 1] * 2}) (---------- Captain ----------)")
-                    total_points += swimmer.projected_points[day - 1] * 2
+            day_captain_values = self.solution_values["captain_decision_vars"][day - self.start_day]
+            day_points = self.female_points[day - self.start_day] + self.male_points[day - self.start_day]
+            for index in female_indices + male_indices:
+                swimmer = self._get_swimmer(index)
+                if day_captain_values[index]:
+                    print(f"{swimmer.name} ({day_points[index] * 2}) (---------- Captain ----------)")
+                    total_points += day_points[index] * 2
                 else:
-                    print(f"{swimmer.name} ({swimmer.projected_points[day - 1]})")
-                    total_points += swimmer.projected_points[day - 1]
+                    print(f"{swimmer.name} ({day_points[index]})")
+                    total_points += day_points[index]
             print(f"Day {day} total: {total_points}\n")
 
-        print(f"Grand total: {int(self.solver.Objective().Value())} points")
+        print(f"Grand total: {int(self.objective_value)} points")
         print(f"Switches used: {sum(self.solution_values['day_switch_counts'])} / {self.switches}\n")
 
-    def _get_male_swimmers(self) -> list[Swimmer]:
-        male_swimmers = [swimmer for swimmer in self.all_swimmers if swimmer.sex == "Male"]
-        self.num_males = len(male_swimmers)
-
-        # Order by total projected points over the whole meet to make checking easier when switches is 0
-        return sorted(male_swimmers, key=lambda x: sum(x.projected_points), reverse=True)
+    def _get_swimmer(self, index: int) -> Swimmer:
+        """Get the swimmer for an index into the decision variables, where females come before males."""
+        if index < self.num_females:
+            return self.female_swimmers[index]
+        return self.male_swimmers[index - self.num_females]
 
 
-    def _get_female_swimmers(self) -> list[Swimmer]:
-        female_swimmers = [swimmer for swimmer in self.all_swimmers if swimmer.sex == "Female"]
-        self.num_females = len(female_swimmers)
-
-        return sorted(female_swimmers, key=lambda x: sum(x.projected_points), reverse=True)
+    def _get_swimmer_ids(self, sex: int) -> np.ndarray:
+        """Get the IDs of the swimmers of a sex, from most to fewest projected points over the whole meet."""
+        swimmer_ids = np.flatnonzero(self.data.sex == sex)
+        # Order by total projected points over the whole meet to make checking easier when switches is 0
+        total_points = self.data.points[swimmer_ids].sum(axis=1)
+        return swimmer_ids[np.argsort(-total_points, kind="stable")]
@@ -0,0 +1,104 @@
+"""Export built solver models to MPS, LP or proto files with a mapping of their variables, and load them back to solve."""
+
+import json
+from pathlib import Path
+
+# .lp can only be exported, since OR-Tools can't read back the LP files it writes
+EXPORT_FORMATS = (".mps", ".lp", ".pb", ".pbtxt")
+LOAD_FORMATS = (".mps", ".pb", ".pbtxt")
+
+
+def get_mapping_path(path: Path) -> Path:
+    """
+    Get the path of the file holding the variable mapping of a model file, e.g. day-1.mps.json for day-1.mps.
+
+    Keyword Arguments:
+        path: the model file
+
+    """
+    return path.with_name(path.name + ".json")
+
+
+def export_model(solver: object, path: Path, variables: list[dict], metadata: dict) -> None:
+    """
+    Write a built model to a file in the format given by its suffix, and its variable mapping next to it.
+
+    Keyword Arguments:
+        solver: the pywraplp solver holding the built model
+        path: the file to write, ending in .mps, .lp, .pb (binary proto) or .pbtxt (text proto)
+        variables: what each variable of the model stands for, in the model's variable order, e.g.
+            {"name": "x1", "kind": "lineup", "swimmer": "MCINTOSH Summer", "day": 1}
+        metadata: anything else that identifies the model, e.g. the solver, meet and fingerprint
+
+    """
+    if path.suffix not in EXPORT_FORMATS:
+        msg = f"Model files must end in one of {', '.join(EXPORT_FORMATS)}, not {path.suffix or 'no suffix'}."
+        raise ValueError(msg)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".mps":
+        path.write_text(solver.ExportModelAsMpsFormat(fixed_format=False, obfuscate=False))
+    elif path.suffix == ".lp":
+        path.write_text(solver.ExportModelAsLpFormat(obfuscate=False))
+    else:
+        from google.protobuf import text_format
+        from ortools.linear_solver import linear_solver_pb2
+
+        model_proto = linear_solver_pb2.MPModelProto()
+        solver.ExportModelToProto(model_proto)
+        if path.suffix == ".pb":
+            path.write_bytes(model_proto.SerializeToString())
+        else:
+            path.write_text(text_format.MessageToString(model_proto))
+
+    mapping = {"metadata": metadata, "variables": variables}
+    get_mapping_path(path).write_text(json.dumps(mapping))
+
+
+def load_model(path: Path, backend: str = "SAT") -> tuple[object, dict]:
+    """
+    Load a model file into a new solver, checking it against its variable mapping, and get the solver and the mapping.
+
+    Keyword Arguments:
+        path: the model file, ending in .mps, .pb or .pbtxt
+        backend: the pywraplp solver to load the model into, e.g. "SAT", "CBC", "SCIP" or "HIGHS"
+
+    """
+    if path.suffix not in LOAD_FORMATS:
+        msg = f"Model files can only be loaded from {', '.join(LOAD_FORMATS)}, not {path.suffix or 'no suffix'}."
+        raise ValueError(msg)
+
+    # OR-Tools is slow to import, so it's only loaded when a model file is used
+    from google.protobuf import text_format
+    from ortools.linear_solver import linear_solver_pb2, pywraplp
+
+    model_proto = linear_solver_pb2.MPModelProto()
+    if path.suffix == ".mps":
+        from ortools.linear_solver.python import model_builder
+
+        builder = model_builder.ModelBuilder()
+        if not builder.import_from_mps_file(str(path)):
+            msg = f"Could not read the MPS model file {path}."
+            raise ValueError(msg)
+        model_proto.ParseFromString(builder.export_to_proto().SerializeToString())
+    elif path.suffix == ".pb":
+        model_proto.ParseFromString(path.read_bytes())
+    else:
+        text_format.Parse(path.read_text(), model_proto)
+
+    solver = pywraplp.Solver.CreateSolver(backend)
+    if solver is None:
+        msg = f"The {backend} solver isn't available in this build of OR-Tools."
+        raise ValueError(msg)
+    error = solver.LoadModelFromProtoKeepNames(model_proto)
+    if error:
+        msg = f"Could not load the model file {path}: {error}"
+        raise ValueError(msg)
+
+    mapping = json.loads(get_mapping_path(path).read_text())
+    names = [var.name() for var in solver.variables()]
+    if names != [variable["name"] for variable in mapping["variables"]]:
+        msg = f"The variables of {path} don't match its mapping in {get_mapping_path(path)}."
+        raise ValueError(msg)
+
+    return solver, mapping
@@ -0,0 +1,25 @@
+"""A persistent cache of solver results keyed by a fingerprint of the problem."""
+
+from pathlib import Path
+
+from keyed_cache import MAX_ENTRIES, MAX_MEMORY_ENTRIES, KeyedCache
+
+CACHE_DB_PATH = Path(__file__).parent.parent.parent.resolve() / "solve_cache.db"
+
+
+class SolveCache(KeyedCache):
+    """Caches the solution values and objective value of each solved problem, keyed by a fingerprint of the problem."""
+
+    table = "solve_results"
+
+    def __init__(self, path: Path | None = CACHE_DB_PATH, max_entries: int = MAX_ENTRIES, max_memory_entries: int = MAX_MEMORY_ENTRIES) -> None:
+        """
+        Initialize the cache, creating the database table if it doesn't exist.
+
+        Keyword Arguments:
+            path: the SQLite database file to store results in, or None to only keep them in memory
+            max_entries: the maximum number of results to keep on disk
+            max_memory_entries: the maximum number of results to also keep in memory
+
+        """
+        super().__init__(path, max_entries, max_memory_entries)
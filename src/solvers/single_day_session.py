@@ -0,0 +1,299 @@
+"""A class to explore what-ifs for a single day of a swim meet without rebuilding the mixed integer program."""
+
+import heapq
+
+import numpy as np
+
+from meet_data import MeetData
+from solvers.errors import SolveError
+from solvers.single_day_solver import BUDGET, ROSTER_SIZE
+from swimmer import FEMALE, MALE, Swimmer
+from tracing import tracer
+
+
+class SingleDaySession:
+    """
+    Keeps the mixed integer program for a single day alive between solves, for exploring what-ifs.
+
+    The model is built once for every swimmer of the day. Excluding swimmers, entries and lineups only changes the
+    session, never the meet data, so sessions can't affect each other or the server's other requests. Before each
+    solve, the session compares what the bounds and coefficients should be with what the model has and changes only
+    those that differ, e.g. fixing an excluded swimmer's variables to 0 or lowering the points of a swimmer whose entry
+    was excluded. Swimmers who can never be needed are fixed to 0 the same way, which is what makes re-solving fast,
+    and each solve starts from the previous lineup as a hint.
+    """
+
+    def __init__(self, data: MeetData, day: int) -> None:
+        """Initialize the session with the meet data and the day of the meet, building the model for the day."""
+        self.data = data
+        self.day = day
+
+        self.excluded_swimmer_ids: set[int] = set()
+        self.excluded_entry_ids: set[int] = set()
+        self.num_solves = 0
+
+        self.solver = None
+        self.swimmer_ids = np.empty(0, dtype=np.int64)
+        self.num_females = 0
+        self.objective_value: float = 0
+
+        self._swimmer_vars = []
+        self._captain_vars = []
+        self._budget = None
+        self._forbidden_lineups = {} # Constraint forbidding each lineup, by its swimmer IDs and captain ID
+        self._points = np.empty(0, dtype=np.int64) # Objective coefficient of each swimmer in the model
+        self._costs = np.empty(0, dtype=np.int64) # Budget coefficient of each swimmer in the model
+        self._fixed = np.empty(0, dtype=bool) # Whether each swimmer's variables are fixed to 0 in the model
+        self._build_model()
+
+
+    def __repr__(self) -> str:
+        """Return a string representation of the SingleDaySession."""
+        return (f"SingleDaySession(day={self.day}, num_swimmers={len(self.swimmer_ids)}, num_excluded_swimmers={len(self.excluded_swimmer_ids)}, "
+                f"num_excluded_entries={len(self.excluded_entry_ids)}, num_solves={self.num_solves})")
+
+
+    def solve(self) -> tuple[list[Swimmer], Swimmer, int]:
+        """Solve for the optimal lineup of the day with the session's exclusions, returning the lineup, captain and total score."""
+        if len(self.swimmer_ids) != np.count_nonzero(np.isin(self.data.sex, (FEMALE, MALE))):
+            # Swimmers were added to the meet since the model was built
+            self._build_model()
+        self._update_model()
+
+        with tracer.span("solve", day=self.day, solver=repr(self)):
+            status = self.solver.Solve()
+
+        if status != self.solver.OPTIMAL:
+            msg = f"Solver failed with status {status} for day {self.day}."
+            raise SolveError(msg)
+
+        with tracer.span("solution_extraction", day=self.day):
+            swimmer_values = [var.solution_value() for var in self._swimmer_vars]
+            captain_values = [var.solution_value() for var in self._captain_vars]
+            self.objective_value = self.solver.Objective().Value()
+            # Hinting only the variables that are set is much faster than hinting every variable
+            hint = [var for var, value in zip(self._swimmer_vars + self._captain_vars, swimmer_values + captain_values, strict=True) if value]
+            self.solver.SetHint(hint, [1.0] * len(hint))
+            self.num_solves += 1
+
+        swimmers = self.data.swimmers
+        lineup = [swimmers[swimmer_id] for swimmer_id, value in zip(self.swimmer_ids.tolist(), swimmer_values, strict=True) if value]
+        captain = swimmers[int(self.swimmer_ids[int(np.argmax(captain_values))])]
+        return lineup, captain, round(self.objective_value)
+
+
+    def exclude_swimmers(self, swimmer_names: list[str]) -> list[str]:
+        """Exclude swimmers from the session's lineups, returning the names that didn't match any swimmer."""
+        return self._set_swimmers_excluded(swimmer_names, excluded=True)
+
+
+    def include_swimmers(self, swimmer_names: list[str]) -> list[str]:
+        """Include swimmers excluded by the session back in its lineups, returning the names that didn't match any swimmer."""
+        return self._set_swimmers_excluded(swimmer_names, excluded=False)
+
+
+    def exclude_entries(self, entries: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """Exclude (swimmer name, event) entries from the session's projected points, returning the entries that didn't match."""
+        return self._set_entries_excluded(entries, excluded=True)
+
+
+    def include_entries(self, entries: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """Include (swimmer name, event) entries excluded by the session back in its projected points, returning the entries that didn't match."""
+        return self._set_entries_excluded(entries, excluded=False)
+
+
+    def exclude_lineup(self, lineup: list[Swimmer], captain: Swimmer) -> None:
+        """Exclude a specific lineup with a specific captain from the session's solutions."""
+        key = (frozenset(swimmer.id for swimmer in lineup), captain.id)
+        if key in self._forbidden_lineups:
+            self._forbidden_lineups[key].SetUb(ROSTER_SIZE)
+            return
+
+        # A lineup and its captain have ROSTER_SIZE + 1 variables set, so allowing at most ROSTER_SIZE forbids only it
+        positions = np.flatnonzero(np.isin(self.swimmer_ids, list(key[0])))
+        constraint = self.solver.Constraint(-self.solver.infinity(), ROSTER_SIZE)
+        for position in positions.tolist():
+            constraint.SetCoefficient(self._swimmer_vars[position], 1)
+            if self.swimmer_ids[position] == captain.id:
+                constraint.SetCoefficient(self._captain_vars[position], 1)
+        self._forbidden_lineups[key] = constraint
+
+
+    def include_lineup(self, lineup: list[Swimmer], captain: Swimmer) -> None:
+        """Include a lineup excluded by the session back in its solutions."""
+        constraint = self._forbidden_lineups.get((frozenset(swimmer.id for swimmer in lineup), captain.id))
+        if constraint is not None:
+            constraint.SetUb(self.solver.infinity())
+
+
+    def _build_model(self) -> None:
+        """Build the model for every swimmer of the day, with the points, costs and exclusions they have now."""
+        # OR-Tools is slow to import, so it's only loaded when a session is started
+        from ortools.linear_solver import pywraplp
+
+        day_points = self.data.points[:, self.day - 1]
+        female_ids = self._get_swimmer_ids(FEMALE, day_points)
+        male_ids = self._get_swimmer_ids(MALE, day_points)
+        self.swimmer_ids = np.concatenate((female_ids, male_ids))
+        self.num_females = len(female_ids)
+
+        # Forbidden lineups belong to the old model, so they're added again to the new one
+        forbidden_lineups = [(key, constraint.ub() < self.solver.infinity()) for key, constraint in self._forbidden_lineups.items()]
+        self._forbidden_lineups = {}
+
+        self.solver = pywraplp.Solver.CreateSolver("SAT")
+        with tracer.span("model_build", day=self.day, solver=repr(self)) as span:
+            self._swimmer_vars = [self.solver.IntVar(0, 1, f"s{swimmer_id}") for swimmer_id in self.swimmer_ids.tolist()]
+            self._captain_vars = [self.solver.IntVar(0, 1, f"c{swimmer_id}") for swimmer_id in self.swimmer_ids.tolist()]
+
+            self.solver.Objective().SetMaximization()
+            self._budget = self.solver.Constraint(-self.solver.infinity(), BUDGET)
+
+            # Half the roster from each sex
+            female_count = self.solver.Constraint(ROSTER_SIZE // 2, ROSTER_SIZE // 2)
+            male_count = self.solver.Constraint(ROSTER_SIZE // 2, ROSTER_SIZE // 2)
+            for position, var in enumerate(self._swimmer_vars):
+                (female_count if position < self.num_females else male_count).SetCoefficient(var, 1)
+
+            # Exactly one captain, who must be in the lineup
+            captain_count = self.solver.Constraint(1, 1)
+            for swimmer_var, captain_var in zip(self._swimmer_vars, self._captain_vars, strict=True):
+                captain_count.SetCoefficient(captain_var, 1)
+                captain_in_lineup = self.solver.Constraint(-self.solver.infinity(), 0)
+                captain_in_lineup.SetCoefficient(captain_var, 1)
+                captain_in_lineup.SetCoefficient(swimmer_var, -1)
+
+            span["variables"] = self.solver.NumVariables()
+            span["constraints"] = self.solver.NumConstraints()
+
+        # Every coefficient and bound starts unset, so the next update sets them all
+        num_swimmers = len(self.swimmer_ids)
+        self._points = np.zeros(num_swimmers, dtype=np.int64)
+        self._costs = np.zeros(num_swimmers, dtype=np.int64)
+        self._fixed = np.zeros(num_swimmers, dtype=bool)
+
+        swimmers = self.data.swimmers
+        for (swimmer_ids, captain_id), is_forbidden in forbidden_lineups:
+            lineup = [swimmers[swimmer_id] for swimmer_id in swimmer_ids]
+            self.exclude_lineup(lineup, swimmers[captain_id])
+            if not is_forbidden:
+                self.include_lineup(lineup, swimmers[captain_id])
+
+
+    def _update_model(self) -> None:
+        """Change only the coefficients and bounds that differ from the meet data and the session's exclusions."""
+        with tracer.span("model_update", day=self.day) as span:
+            points = self._get_points()
+            costs = self.data.cost[self.swimmer_ids]
+            excluded = self.data.excluded[self.swimmer_ids] | np.isin(self.swimmer_ids, list(self.excluded_swimmer_ids))
+            fixed = excluded | self._get_dominated(points, costs, excluded)
+
+            objective = self.solver.Objective()
+            changed_points = np.flatnonzero(points != self._points)
+            for position in changed_points.tolist():
+                objective.SetCoefficient(self._swimmer_vars[position], int(points[position]))
+                objective.SetCoefficient(self._captain_vars[position], int(points[position]))
+
+            changed_costs = np.flatnonzero(costs != self._costs)
+            for position in changed_costs.tolist():
+                self._budget.SetCoefficient(self._swimmer_vars[position], int(costs[position]))
+
+            changed_bounds = np.flatnonzero(fixed != self._fixed)
+            for position in changed_bounds.tolist():
+                upper_bound = 0 if fixed[position] else 1
+                self._swimmer_vars[position].SetUb(upper_bound)
+                self._captain_vars[position].SetUb(upper_bound)
+
+            self._points = points
+            self._costs = costs
+            self._fixed = fixed
+            span["points"] = len(changed_points)
+            span["costs"] = len(changed_costs)
+            span["bounds"] = len(changed_bounds)
+            span["fixed"] = int(np.count_nonzero(fixed))
+
+
+    def _get_dominated(self, points: np.ndarray, costs: np.ndarray, excluded: np.ndarray) -> np.ndarray:
+        """
+        Get whether each swimmer in the model can be left out of every lineup without lowering the best score.
+
+        A swimmer is dominated by another swimmer of the same sex who has at least as many points and costs no more.
+        A swimmer with enough dominators can always be swapped for one who isn't in the lineup yet: one more than the
+        rest of their half of the roster, plus one for each forbidden lineup the swap could land on.
+        """
+        num_forbidden = sum(constraint.ub() < self.solver.infinity() for constraint in self._forbidden_lineups.values())
+        min_dominators = ROSTER_SIZE // 2 + num_forbidden
+
+        dominated = np.zeros(len(points), dtype=bool)
+        for start, end in ((0, self.num_females), (self.num_females, len(points))):
+            candidates = np.flatnonzero(~excluded[start:end]) + start
+            # Ordered by points and then cost, so every swimmer's dominators come before them, and equal swimmers
+            # dominate only the ones after them
+            order = candidates[np.lexsort((costs[candidates], -points[candidates]))]
+            # A swimmer has enough dominators if their cost is at least the min_dominators-th cheapest cost before
+            # them, so only the cheapest costs so far are kept, in a max-heap of negated costs
+            cheapest = []
+            for position, cost in zip(order.tolist(), costs[order].tolist(), strict=True):
+                if len(cheapest) == min_dominators:
+                    dominated[position] = cost >= -cheapest[0]
+                    if cost < -cheapest[0]:
+                        heapq.heapreplace(cheapest, -cost)
+                else:
+                    heapq.heappush(cheapest, -cost)
+
+        return dominated
+
+
+    def _get_points(self) -> np.ndarray:
+        """Get the projected points of each swimmer in the model on the day, without the entries the session excluded."""
+        points = self.data.points[self.swimmer_ids, self.day - 1].copy()
+        entry_ids = [entry_id for entry_id in self.excluded_entry_ids if not self.data.entry_excluded[entry_id]]
+        if not entry_ids:
+            return points
+
+        positions = {swimmer_id: position for position, swimmer_id in enumerate(self.swimmer_ids.tolist())}
+        event_days = self.data.meet.event_days
+        for entry_id in entry_ids:
+            position = positions.get(int(self.data.entry_swimmer[entry_id]))
+            event = self.data.events[self.data.entry_event[entry_id]]
+            if position is not None and self.day in event_days.get(event, ()):
+                points[position] -= self.data.entry_points[entry_id]
+
+        return points
+
+
+    def _set_swimmers_excluded(self, swimmer_names: list[str], *, excluded: bool) -> list[str]:
+        """Exclude swimmers from (or include them back in) the session, returning the names that didn't match any swimmer."""
+        not_found = []
+        for name in swimmer_names:
+            swimmer = self.data.find_swimmer(name)
+            if swimmer is None:
+                not_found.append(name)
+            elif excluded:
+                self.excluded_swimmer_ids.add(swimmer.id)
+            else:
+                self.excluded_swimmer_ids.discard(swimmer.id)
+
+        return not_found
+
+
+    def _set_entries_excluded(self, entries: list[tuple[str, str]], *, excluded: bool) -> list[tuple[str, str]]:
+        """Exclude entries from (or include them back in) the session, returning the entries that didn't match."""
+        not_found = []
+        for name, event in entries:
+            entry = self.data.find_entry(name, event)
+            if entry is None:
+                not_found.append((name, event))
+            elif excluded:
+                self.excluded_entry_ids.add(entry.id)
+            else:
+                self.excluded_entry_ids.discard(entry.id)
+
+        return not_found
+
+
+    def _get_swimmer_ids(self, sex: int, day_points: np.ndarray) -> np.ndarray:
+        """Get the IDs of the swimmers of a sex, from most to fewest projected points on the day."""
+        swimmer_ids = np.flatnonzero(self.data.sex == sex)
+        # Stable sort so swimmers with equal points stay in psych sheet order
+        return swimmer_ids[np.argsort(-day_points[swimmer_ids], kind="stable")]
@@ -1,10 +1,16 @@
 """A class to solve the mixed integer program for a single day of a swim meet."""
 
-import sys
+from pathlib import Path
 
-from ortools.linear_solver import pywraplp
+import numpy as np
 
-from swimmer import Swimmer
+from keyed_cache import fingerprint
+from meet_data import MeetData
+from solvers import model_files
+from solvers.errors import SolveError
+from solvers.result_cache import SolveCache
+from swimmer import FEMALE, MALE, Swimmer
+from tracing import tracer
 
 BUDGET = 200
 DEBUG = False
@@ -13,10 +19,12 @@ ROSTER_SIZE = 8
 class SingleDaySolver:
     """A class to solve the mixed integer program for a single day of the swim meet."""
 
-    def __init__(self, swimmers: list[Swimmer], day: int) -> None:
-        """Initialize the SingleDaySolver with a list of swimmers and the day of the meet."""
-        self.all_swimmers = swimmers
+    def __init__(self, data: MeetData, day: int, cache: SolveCache | None = None) -> None:
+        """Initialize the SingleDaySolver with the meet data, the day of the meet, and optionally a cache of previous results."""
+        self.data = data
+        self.all_swimmers = data.swimmers
         self.day = day
+        self.cache = cache
 
         self.solver = None
         self.male_swimmers = []
@@ -29,6 +37,8 @@ class SingleDaySolver:
         self.num_females: int = 0
         self.num_males: int = 0
         self.solution_values: list[float] = []
+        self.objective_value: float = 0
+        self.cache_key: str | None = None # The key load_cached_solution looked the problem up by
 
         self.forbidden_lineups: list[list[Swimmer]] = []
 
@@ -40,10 +50,57 @@ class SingleDaySolver:
 
     def solve(self) -> tuple[list[Swimmer], Swimmer]:
         """Solve the mixed integer program to find the optimal lineup for the day."""
-        self.solver = pywraplp.Solver.CreateSolver("SAT")
-        self._get_data()
-        self._get_solution()
-        return self._get_optimal_lineup()
+        self.get_data()
+        if not self.load_cached_solution():
+            self.build_model()
+            self._solve_model()
+            self.cache_solution()
+
+        with tracer.span("lineup_extraction", day=self.day):
+            return self._get_optimal_lineup()
+
+
+    def export_model(self, path: Path) -> None:
+        """
+        Build the model for the day and write it to a file, with the swimmer and day of each variable next to it.
+
+        Keyword Arguments:
+            path: the file to write, ending in .mps, .lp, .pb or .pbtxt
+
+        """
+        self.get_data()
+        self.build_model()
+        model_files.export_model(
+            self.solver,
+            path,
+            self._get_variable_mapping(),
+            {
+                "solver": "SingleDaySolver",
+                "meet": self.data.meet.name,
+                "day": self.day,
+                "fingerprint": self._get_fingerprint(),
+            },
+        )
+
+
+    def solve_model_file(self, path: Path, backend: str = "SAT") -> tuple[list[Swimmer], Swimmer]:
+        """
+        Solve a model file exported by export_model instead of building the model, to find the optimal lineup for the day.
+
+        Keyword Arguments:
+            path: the model file, ending in .mps, .pb or .pbtxt
+            backend: the pywraplp solver to solve it with, e.g. "SAT", "CBC", "SCIP" or "HIGHS"
+
+        """
+        self.get_data()
+        self.solver, mapping = model_files.load_model(path, backend)
+        if mapping["metadata"].get("fingerprint") != self._get_fingerprint():
+            msg = f"The model file {path} wasn't exported for day {self.day} of this meet with these swimmers and entries."
+            raise ValueError(msg)
+        self._solve_model()
+
+        with tracer.span("lineup_extraction", day=self.day):
+            return self._get_optimal_lineup()
 
 
     def exclude_lineup(self, lineup: list[Swimmer], captain: Swimmer) -> None:
@@ -64,142 +121,232 @@ class SingleDaySolver:
 
     def exclude_swimmer(self, swimmer_name: str) -> None:
         """Exclude a swimmer from the lineup."""
-        for swimmer in self.all_swimmers:
-            if swimmer.name == swimmer_name:
-                swimmer.excluded = True
-                break
+        self.exclude_swimmers([swimmer_name])
 
 
     def include_swimmer(self, swimmer_name: str) -> None:
         """Include a swimmer in the lineup."""
-        for swimmer in self.all_swimmers:
-            if swimmer.name == swimmer_name:
-                swimmer.excluded = False
-                break
+        self.include_swimmers([swimmer_name])
+
+
+    def exclude_swimmers(self, swimmer_names: list[str]) -> list[str]:
+        """Exclude swimmers from the lineup, e.g. a scratch list, returning the names that didn't match any swimmer."""
+        return self.data.set_swimmers_excluded(swimmer_names, excluded=True)
+
+
+    def include_swimmers(self, swimmer_names: list[str]) -> list[str]:
+        """Include swimmers in the lineup, returning the names that didn't match any swimmer."""
+        return self.data.set_swimmers_excluded(swimmer_names, excluded=False)
 
 
     def exclude_entry(self, swimmer_name: str, entry_event: str) -> None:
         """Exclude a specific entry for a swimmer."""
-        for swimmer in self.all_swimmers:
-            if swimmer.name == swimmer_name and entry_event in swimmer.entries:
-                swimmer.entries[entry_event].excluded = True
-                print(f"Excluded entry {entry_event} for swimmer {swimmer_name}.")
-                swimmer.update_projected_points()
-                return
+        if not self.exclude_entries([(swimmer_name, entry_event)]):
+            print(f"Excluded entry {entry_event} for swimmer {swimmer_name}.")
 
 
     def include_entry(self, swimmer_name: str, entry_event: str) -> None:
         """Include a specific entry for a swimmer."""
-        for swimmer in self.all_swimmers:
-            if swimmer.name == swimmer_name and entry_event in swimmer.entries:
-                swimmer.entries[entry_event].excluded = False
-                print(f"Included entry {entry_event} for swimmer {swimmer_name}.")
-                swimmer.update_projected_points()
-                return
+        if not self.include_entries([(swimmer_name, entry_event)]):
+            print(f"Included entry {entry_event} for swimmer {swimmer_name}.")
 
 
-    def _get_data(self) -> None:
-        self.male_swimmers = self._get_male_swimmers()
-        self.female_swimmers = self._get_female_swimmers()
+    def exclude_entries(self, entries: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """Exclude (swimmer name, event) entries, returning the entries that didn't match."""
+        return self.data.set_entries_excluded(entries, excluded=True)
+
+
+    def include_entries(self, entries: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """Include (swimmer name, event) entries, returning the entries that didn't match."""
+        return self.data.set_entries_excluded(entries, excluded=False)
+
+
+    def get_data(self) -> None:
         """Get the data needed to solve the mixed integer program."""
-        # female projected points from greatest to least
-        self.female_points = [x.projected_points[self.day - 1] for x in self.female_swimmers]
-        # male projected points from greatest to least
-        self.male_points = [x.projected_points[self.day - 1] for x in self.male_swimmers]
-
-        # female costs in same swimmer order as projected points
-        self.female_costs = [x.cost for x in self.female_swimmers]
-        # male costs in same swimmer order as projected points
-        self.male_costs = [x.cost for x in self.male_swimmers]
-
-
-    def _get_solution(self) -> None:
-        # Declare decision variables for female swimmers
-        female_vars = []
-        for index in range(self.num_females):
-            var = self.solver.IntVar(0, 1, f"x{index + 1}")
-            female_vars.append(var)
-
-        # Declare decision variables for male swimmers
-        male_vars = []
-        for index in range(self.num_males):
-            var = self.solver.IntVar(0, 1, f"y{index + 1}")
-            male_vars.append(var)
-
-        female_captain_vars = []
-        for index in range(self.num_females):
-            var = self.solver.IntVar(0, 1, f"xc{index + 1}")
-            female_captain_vars.append(var)
-
-        male_captain_vars = []
-        for index in range(self.num_males):
-            var = self.solver.IntVar(0, 1, f"yc{index + 1}")
-            male_captain_vars.append(var)
-
-        # Create objective function - TODO: figure out how to factor in captain double points
-        objective_terms = []
-        for index, swimmer in enumerate(self.female_swimmers):
-            objective_terms.append(swimmer.projected_points[self.day - 1] * (female_vars[index] + female_captain_vars[index]))
-        for index, swimmer in enumerate(self.male_swimmers):
-            objective_terms.append(swimmer.projected_points[self.day - 1] * (male_vars[index] + male_captain_vars[index]))
-
-        self.solver.Maximize(sum(objective_terms))
-
-        # Budget constraint
-        budget_terms = []
-        for index, swimmer in enumerate(self.female_swimmers):
-            budget_terms.append(swimmer.cost * female_vars[index])
-        for index, swimmer in enumerate(self.male_swimmers):
-            budget_terms.append(swimmer.cost * male_vars[index])
-
-        self.solver.Add(sum(budget_terms) <= BUDGET)
-
-        # Forbidden lineups constraints
+        day_points = self.data.points[:, self.day - 1]
+        female_ids = self._get_swimmer_ids(FEMALE, day_points)
+        male_ids = self._get_swimmer_ids(MALE, day_points)
+        self.num_females = len(female_ids)
+        self.num_males = len(male_ids)
+        self.female_swimmers = [self.all_swimmers[swimmer_id] for swimmer_id in female_ids]
+        self.male_swimmers = [self.all_swimmers[swimmer_id] for swimmer_id in male_ids]
+
+        # projected points from greatest to least
+        self.female_points = day_points[female_ids].tolist()
+        self.male_points = day_points[male_ids].tolist()
+
+        # costs in same swimmer order as projected points
+        self.female_costs = self.data.cost[female_ids].tolist()
+        self.male_costs = self.data.cost[male_ids].tolist()
+
+
+    def _get_fingerprint(self) -> str:
+        """Get a key that identifies the problem, so identical problems can share a cached result."""
+        # The solution is stored by index into the sorted swimmer lists, so forbidden lineups are keyed the same way
+        forbidden_lineups = []
         for lineup, captain in self.forbidden_lineups:
-            # Use names instead of Swimmer objects for checking in case entries are excluded
-            lineup_names = [swimmer.name for swimmer in lineup]
+            lineup_names = {swimmer.name for swimmer in lineup}
+            female_indices = [index for index, swimmer in enumerate(self.female_swimmers) if swimmer.name in lineup_names]
+            male_indices = [index for index, swimmer in enumerate(self.male_swimmers) if swimmer.name in lineup_names]
+            captain_key = ""
+            for index in female_indices:
+                if self.female_swimmers[index].name == captain.name:
+                    captain_key = f"female_{index}"
+            for index in male_indices:
+                if self.male_swimmers[index].name == captain.name:
+                    captain_key = f"male_{index}"
+            forbidden_lineups.append((female_indices, male_indices, captain_key))
+
+        return fingerprint(
+            solver="SingleDaySolver",
+            day=self.day,
+            female_points=self.female_points,
+            male_points=self.male_points,
+            female_costs=self.female_costs,
+            male_costs=self.male_costs,
+            budget=BUDGET,
+            roster_size=ROSTER_SIZE,
+            forbidden_lineups=sorted(forbidden_lineups),
+        )
+
+
+    def load_cached_solution(self) -> bool:
+        """Take the solution from the cache if the problem got by get_data was solved before, returning whether it was."""
+        with tracer.span("solve_cache_lookup", day=self.day) as span:
+            self.cache_key = self._get_fingerprint() if self.cache else None
+            cached_result = self.cache.get(self.cache_key) if self.cache else None
+            span["hit"] = bool(cached_result)
+        if cached_result:
+            self.solution_values = cached_result["solution_values"]
+            self.objective_value = cached_result["objective_value"]
+        return bool(cached_result)
+
+
+    def cache_solution(self) -> None:
+        """Store the optimal solution in the cache, under the problem load_cached_solution looked up."""
+        if self.cache:
+            self.cache.put(self.cache_key, {"solution_values": self.solution_values, "objective_value": self.objective_value})
+
+
+    def build_model(self) -> None:
+        """Build the mixed integer program for the day in a new solver."""
+        # OR-Tools is slow to import, so it's only loaded when a model is built
+        from ortools.linear_solver import pywraplp
+        self.solver = pywraplp.Solver.CreateSolver("SAT")
 
-            vars_in_lineup = []
-            for index, swimmer in enumerate(self.female_swimmers):
-                if swimmer.name in lineup_names:
-                    vars_in_lineup.append(female_vars[index])
-                    if swimmer.name == captain.name:
-                        vars_in_lineup.append(female_captain_vars[index])
-            for index, swimmer in enumerate(self.male_swimmers):
-                if swimmer.name in lineup_names:
-                    vars_in_lineup.append(male_vars[index])
-                    if swimmer.name == captain.name:
-                        vars_in_lineup.append(male_captain_vars[index])
+        with tracer.span("model_build", day=self.day, solver=repr(self)) as span:
+            # Declare decision variables for female swimmers
+            female_vars = []
+            for index in range(self.num_females):
+                var = self.solver.IntVar(0, 1, f"x{index + 1}")
+                female_vars.append(var)
+
+            # Declare decision variables for male swimmers
+            male_vars = []
+            for index in range(self.num_males):
+                var = self.solver.IntVar(0, 1, f"y{index + 1}")
+                male_vars.append(var)
+
+            female_captain_vars = []
+            for index in range(self.num_females):
+                var = self.solver.IntVar(0, 1, f"xc{index + 1}")
+                female_captain_vars.append(var)
+
+            male_captain_vars = []
+            for index in range(self.num_males):
+                var = self.solver.IntVar(0, 1, f"yc{index + 1}")
+                male_captain_vars.append(var)
+
+            # Create objective function - TODO: figure out how to factor in captain double points
+            objective_terms = []
+            for index, points in enumerate(self.female_points):
+                objective_terms.append(points * (female_vars[index] + female_captain_vars[index]))
+            for index, points in enumerate(self.male_points):
+                objective_terms.append(points * (male_vars[index] + male_captain_vars[index]))
+
+            self.solver.Maximize(sum(objective_terms))
+
+            # Budget constraint
+            budget_terms = []
+            for index, cost in enumerate(self.female_costs):
+                budget_terms.append(cost * female_vars[index])
+            for index, cost in enumerate(self.male_costs):
+                budget_terms.append(cost * male_vars[index])
+
+            self.solver.Add(sum(budget_terms) <= BUDGET)
+
+            # Forbidden lineups constraints
+            for lineup, captain in self.forbidden_lineups:
+                # Use names instead of Swimmer objects for checking in case entries are excluded
+                lineup_names = [swimmer.name for swimmer in lineup]
+
+                vars_in_lineup = []
+                for index, swimmer in enumerate(self.female_swimmers):
+                    if swimmer.name in lineup_names:
+                        vars_in_lineup.append(female_vars[index])
+                        if swimmer.name == captain.name:
+                            vars_in_lineup.append(female_captain_vars[index])
+                for index, swimmer in enumerate(self.male_swimmers):
+                    if swimmer.name in lineup_names:
+                        vars_in_lineup.append(male_vars[index])
+                        if swimmer.name == captain.name:
+                            vars_in_lineup.append(male_captain_vars[index])
+
+                self.solver.Add(sum(vars_in_lineup) <= ROSTER_SIZE)
+
+            # Number of females constraint
+            self.solver.Add(sum(female_vars) == ROSTER_SIZE // 2)
+
+            # Number of males constraint
+            self.solver.Add(sum(male_vars) == ROSTER_SIZE // 2)
+
+            # Captain constraints (can't be captain if not in lineup)
+            for swimmer_var, captain_var in zip(female_vars + male_vars, female_captain_vars + male_captain_vars, strict=True):
+                self.solver.Add(captain_var <= swimmer_var)
+            self.solver.Add(sum(male_captain_vars + female_captain_vars) == 1)
+            span["variables"] = self.solver.NumVariables()
+            span["constraints"] = self.solver.NumConstraints()
+
+
+    def _get_variable_mapping(self) -> list[dict]:
+        """Get the kind, swimmer and day of each variable of the built model, in the model's variable order."""
+        swimmers = self.female_swimmers + self.male_swimmers
+        kinds = ["lineup"] * len(swimmers) + ["captain"] * len(swimmers)
+        return [
+            {"name": var.name(), "kind": kind, "swimmer": swimmer.name, "day": self.day}
+            for var, kind, swimmer in zip(self.solver.variables(), kinds, swimmers + swimmers, strict=True)
+        ]
+
+
+    def _solve_model(self) -> None:
+        """Solve the model in the solver and store its solution values, which are in the order the variables were declared."""
+        with tracer.span("solve", day=self.day, solver=repr(self)):
+            status = self.solver.Solve()
 
-            self.solver.Add(sum(vars_in_lineup) <= ROSTER_SIZE)
+        # Check that solver worked
+        if status != self.solver.OPTIMAL:
+            msg = f"Solver failed with status {status} for day {self.day}."
+            raise SolveError(msg)
 
-        # Number of females constraint
-        self.solver.Add(sum(female_vars) == ROSTER_SIZE // 2)
+        # Get solution values
+        with tracer.span("solution_extraction", day=self.day):
+            self.set_solution_values([var.solution_value() for var in self.solver.variables()], self.solver.Objective().Value())
 
-        # Number of males constraint
-        self.solver.Add(sum(male_vars) == ROSTER_SIZE // 2)
 
-        # Captain constraints (can't be captain if not in lineup)
-        for swimmer_var, captain_var in zip(female_vars + male_vars, female_captain_vars + male_captain_vars, strict=True):
-            self.solver.Add(captain_var <= swimmer_var)
-        self.solver.Add(sum(male_captain_vars + female_captain_vars) == 1)
+    def set_solution_values(self, values: list[float], objective_value: float) -> None:
+        """Store the values of the model's variables, in the order they were declared, and the objective value."""
+        self.solution_values = values
+        self.objective_value = objective_value
 
-        # Solve
-        status = self.solver.Solve()
 
-        # Check that solver worked
-        if status != pywraplp.Solver.OPTIMAL:
-            msg = f"Solver failed with status {status}. Exiting program."
-            sys.exit(msg)
+    def _get_optimal_lineup(self) -> tuple[list[Swimmer], Swimmer, int]:
+        lineup, captain, total_score = self.get_solution()
+        self._print_lineup(lineup, captain)
+        return lineup, captain, total_score
 
-        # Get solution values
-        self.solution_values = []
-        for var in female_vars + male_vars:
-            self.solution_values.append(var.solution_value())
-        for var in female_captain_vars + male_captain_vars:
-            self.solution_values.append(var.solution_value())
 
-    def _get_optimal_lineup(self) -> tuple[list[Swimmer], Swimmer]:
+    def get_solution(self) -> tuple[list[Swimmer], Swimmer, int]:
+        """Get the lineup, captain and total score from the solution values."""
         indices = list(filter(lambda x: self.solution_values[x], range(self.num_females)))
         lineup_female = [self.female_swimmers[x] for x in indices]
 
@@ -216,8 +363,7 @@ class SingleDaySolver:
         else:
             captain = self.male_swimmers[captain_index - self.num_females]
 
-        total_score = self._print_lineup(lineup, captain)
-        return lineup, captain, total_score
+        return lineup, captain, int(self.objective_value)
 
 
     def _print_lineup(self, lineup: list[Swimmer], captain: Swimmer) -> None:
@@ -229,20 +375,11 @@ class SingleDaySolver:
             else:
                 print(f" ({int(swimmer.projected_points[self.day - 1])})")
 
-        total_score = int(self.solver.Objective().Value())
-        print(f"With a total score of: {total_score}")
-        return total_score
-
-
-    def _get_male_swimmers(self) -> list[Swimmer]:
-        male_swimmers = [swimmer for swimmer in self.all_swimmers if swimmer.sex == "Male" and swimmer.excluded is False]
-        self.num_males = len(male_swimmers)
-
-        return sorted(male_swimmers, key=lambda x: x.projected_points[self.day - 1], reverse=True)
-
+        print(f"With a total score of: {int(self.objective_value)}")
 
-    def _get_female_swimmers(self) -> list[Swimmer]:
-        female_swimmers = [swimmer for swimmer in self.all_swimmers if swimmer.sex == "Female" and swimmer.excluded is False]
-        self.num_females = len(female_swimmers)
 
-        return sorted(female_swimmers, key=lambda x: x.projected_points[self.day - 1], reverse=True)
+    def _get_swimmer_ids(self, sex: int, day_points: np.ndarray) -> np.ndarray:
+        """Get the IDs of the swimmers of a sex who aren't excluded, from most to fewest projected points on the day."""
+        swimmer_ids = np.flatnonzero((self.data.sex == sex) & ~self.data.excluded)
+        # Stable sort so swimmers with equal points stay in psych sheet order
+        return swimmer_ids[np.argsort(-day_points[swimmer_ids], kind="stable")]
@@ -0,0 +1,259 @@
+"""A class to run a solve in a worker thread from asyncio, streaming improving lineups and allowing it to be cancelled."""
+
+import asyncio
+import math
+import threading
+import time
+from collections.abc import AsyncIterator
+from fractions import Fraction
+
+from solvers.errors import SolveError
+from solvers.full_meet_solver import FullMeetSolver
+from solvers.single_day_solver import SingleDaySolver
+from tracing import tracer
+
+NUM_WORKERS = 8 # CP-SAT workers, since a portfolio of strategies proves optimality much sooner than one, even on one core
+
+class SolveJob:
+    """
+    Solves the model of a SingleDaySolver or FullMeetSolver in a worker thread, streaming events as the solve improves.
+
+    pywraplp only reports a solution once the solve ends, so the model the solver builds is translated to CP-SAT, the
+    engine behind pywraplp's "SAT" backend, whose callbacks report every improving solution and bound. Each event is a
+    dictionary with a "kind" and the "wall_time" in seconds since the solve started:
+        "incumbent": a better solution was found, with its "objective_value", the "best_bound" and the "solution"
+        "bound": the bound on the best possible objective improved, with the "best_bound"
+        "done": the solve ended, with its "status" ("optimal", "feasible" if the time limit was hit, "cancelled" or
+            "failed") and the best "solution" found, or None if there is none
+    Solutions are in the form the solver's solve returns: (lineup, captain, total score) for a SingleDaySolver and the
+    solution dictionary for a FullMeetSolver.
+
+    For example, from a coroutine:
+        job = SolveJob(FullMeetSolver(data, switches)).start()
+        async for event in job.events():
+            ...
+        solution = await job.result()
+    """
+
+    def __init__(self, solver: SingleDaySolver | FullMeetSolver, time_limit: float | None = None) -> None:
+        """
+        Initialize a job that hasn't started yet.
+
+        Keyword Arguments:
+            solver: the solver whose model to solve, whose cache is used like in its solve
+            time_limit: if given, the seconds to search for before returning the best solution found
+
+        """
+        self.solver = solver
+        self.time_limit = time_limit
+        self.status: str | None = None
+        self.best_event: dict | None = None # The latest incumbent, or the done event once the solve has ended
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._future: asyncio.Future | None = None
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._cp_solver = None
+        self._objective_scale = 1
+        self._start_time = 0.0
+
+
+    def __repr__(self) -> str:
+        """Return a string representation of the SolveJob."""
+        return f"SolveJob(solver={self.solver!r}, time_limit={self.time_limit}, status={self.status})"
+
+
+    def start(self) -> "SolveJob":
+        """Start solving in the running event loop's default executor, returning the job so it can be chained."""
+        if self._future:
+            msg = "The solve job has already been started."
+            raise RuntimeError(msg)
+
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._future = self._loop.run_in_executor(None, self._run)
+        return self
+
+
+    async def events(self) -> AsyncIterator[dict]:
+        """Yield the events of the solve as they happen, ending with the done event."""
+        while True:
+            event = await self._queue.get()
+            yield event
+            if event["kind"] == "done":
+                return
+
+
+    async def result(self) -> tuple | dict | None:
+        """
+        Wait for the solve to end and get the best solution found, or None if it was cancelled before finding one.
+
+        If the coroutine waiting is cancelled, e.g. by ^C in asyncio.run, the solve is cancelled too.
+        """
+        try:
+            return await self._future
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+
+
+    def cancel(self) -> None:
+        """Stop the solve as soon as possible, keeping the best solution found so far. Can be called from any thread."""
+        self._cancelled.set()
+        with self._lock:
+            if self._cp_solver:
+                self._cp_solver.stop_search()
+
+
+    def _run(self) -> tuple | dict | None:
+        """Solve the model in the worker thread, returning the best solution found."""
+        self._start_time = time.perf_counter()
+        try:
+            return self._solve()
+        except Exception as e:
+            self.status = "failed"
+            self._emit({"kind": "done", "status": self.status, "error": str(e), "solution": None})
+            raise
+
+
+    def _solve(self) -> tuple | dict | None:
+        """Solve the model with CP-SAT, or take the solution from the solver's cache, emitting events along the way."""
+        # OR-Tools is slow to import, so it's only loaded when a job runs
+        from ortools.sat.python import cp_model
+
+        solver = self.solver
+        solver.get_data()
+        if solver.load_cached_solution():
+            return self._finish("optimal", solver.get_solution())
+
+        solver.build_model()
+        with tracer.span("cp_model_translation", solver=repr(solver)):
+            model, self._objective_scale = _to_cp_model(solver.solver)
+
+        cp_solver = cp_model.CpSolver()
+        cp_solver.parameters.num_workers = NUM_WORKERS
+        # CP-SAT's own ^C handler crashes when the solve isn't on the main thread, and the job cancels on ^C anyway
+        cp_solver.parameters.catch_sigint_signal = False
+        if self.time_limit:
+            cp_solver.parameters.max_time_in_seconds = self.time_limit
+        cp_solver.best_bound_callback = self._on_bound
+        with self._lock:
+            if self._cancelled.is_set():
+                return self._finish("cancelled", None)
+            self._cp_solver = cp_solver
+
+        with tracer.span("solve", solver=repr(solver), job=True):
+            status = cp_solver.solve(model, _create_incumbent_callback(self))
+
+        if status == cp_model.OPTIMAL:
+            solution = self._set_solution(cp_solver.response_proto.solution, cp_solver.objective_value / self._objective_scale)
+            solver.cache_solution()
+            return self._finish("optimal", solution)
+        if status == cp_model.FEASIBLE:
+            solution = self._set_solution(cp_solver.response_proto.solution, cp_solver.objective_value / self._objective_scale)
+            return self._finish("cancelled" if self._cancelled.is_set() else "feasible", solution)
+        if self._cancelled.is_set():
+            return self._finish("cancelled", None)
+
+        msg = f"Solver failed with status {status.name} for {solver!r}."
+        raise SolveError(msg)
+
+
+    def _on_incumbent(self, values: list[int], objective_value: float, best_bound: float) -> None:
+        """Emit an improving solution found by CP-SAT."""
+        if self._cancelled.is_set():
+            with self._lock:
+                self._cp_solver.stop_search()
+        objective_value /= self._objective_scale
+        best_bound /= self._objective_scale
+        solution = self._set_solution(values, objective_value)
+        self.best_event = {"kind": "incumbent", "objective_value": objective_value, "best_bound": best_bound, "solution": solution}
+        self._emit(dict(self.best_event))
+
+
+    def _on_bound(self, best_bound: float) -> None:
+        """Emit an improved bound found by CP-SAT."""
+        self._emit({"kind": "bound", "best_bound": best_bound / self._objective_scale})
+
+
+    def _set_solution(self, values: list[int], objective_value: float) -> tuple | dict:
+        """Store a solution in the solver and get it in the form the solver's solve returns."""
+        self.solver.set_solution_values([float(value) for value in values], objective_value)
+        return self.solver.get_solution()
+
+
+    def _finish(self, status: str, solution: tuple | dict | None) -> tuple | dict | None:
+        """Emit the done event and return the solution."""
+        self.status = status
+        self.best_event = {"kind": "done", "status": status, "solution": solution}
+        self._emit(dict(self.best_event))
+        return solution
+
+
+    def _emit(self, event: dict) -> None:
+        """Send an event from the worker thread to the event loop."""
+        event["wall_time"] = time.perf_counter() - self._start_time
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+
+
+def _create_incumbent_callback(job: SolveJob) -> object:
+    """Create a CP-SAT solution callback that passes each improving solution to a job."""
+    # The callback class subclasses an OR-Tools class, so it can only be defined once OR-Tools is imported
+    from ortools.sat.python import cp_model
+
+    class IncumbentCallback(cp_model.CpSolverSolutionCallback):
+        def on_solution_callback(self) -> None:
+            job._on_incumbent(self.response_proto.solution, self.objective_value, self.best_objective_bound) # noqa: SLF001
+
+    return IncumbentCallback()
+
+
+def _to_cp_model(solver: object) -> tuple[object, int]:
+    """
+    Translate the model built in a pywraplp solver to a CP-SAT model with the variables in the same order, and get the factor its objective was scaled by.
+
+    CP-SAT only allows integer coefficients in constraints, so each constraint is scaled by the smallest factor that
+    makes its coefficients integers, e.g. 2 for the full meet's total switches constraint, which halves its counts.
+
+    Keyword Arguments:
+        solver: the pywraplp solver holding the built model
+
+    """
+    from ortools.linear_solver import linear_solver_pb2
+    from ortools.sat.python import cp_model
+
+    model_proto = linear_solver_pb2.MPModelProto()
+    solver.ExportModelToProto(model_proto)
+
+    model = cp_model.CpModel()
+    variables = []
+    for var in model_proto.variable:
+        if not var.is_integer:
+            msg = f"CP-SAT can only solve models with integer variables, but {var.name} isn't one."
+            raise SolveError(msg)
+        variables.append(model.new_int_var(math.ceil(var.lower_bound), math.floor(var.upper_bound), var.name))
+
+    for constraint in model_proto.constraint:
+        coefficients = [Fraction(str(coefficient)) for coefficient in constraint.coefficient]
+        scale = math.lcm(*(coefficient.denominator for coefficient in coefficients))
+        expression = cp_model.LinearExpr.weighted_sum(
+            [variables[index] for index in constraint.var_index],
+            [int(coefficient * scale) for coefficient in coefficients],
+        )
+        lower_bound = math.ceil(constraint.lower_bound * scale) if math.isfinite(constraint.lower_bound) else cp_model.INT_MIN
+        upper_bound = math.floor(constraint.upper_bound * scale) if math.isfinite(constraint.upper_bound) else cp_model.INT_MAX
+        model.add_linear_constraint(expression, lower_bound, upper_bound)
+
+    # A floating point objective makes CP-SAT much slower to prove optimality, so the objective is scaled the same way
+    objective_coefficients = [Fraction(str(var.objective_coefficient)) for var in model_proto.variable]
+    objective_offset = Fraction(str(model_proto.objective_offset))
+    objective_scale = math.lcm(objective_offset.denominator, *(coefficient.denominator for coefficient in objective_coefficients))
+    objective = cp_model.LinearExpr.weighted_sum(variables, [int(coefficient * objective_scale) for coefficient in objective_coefficients])
+    objective += int(objective_offset * objective_scale)
+    if model_proto.maximize:
+        model.maximize(objective)
+    else:
+        model.minimize(objective)
+
+    return model, objective_scale
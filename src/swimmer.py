@@ -2,32 +2,36 @@
 
 from __future__ import annotations
 
-import json
-import math
-import sys
-from pathlib import Path
+from typing import TYPE_CHECKING
 
-from entry import Entry
-from wr_scraper import get_base_times_from_db
+from time_parsing import parse_time, parse_times
 
-FIVE = 5
+if TYPE_CHECKING:
+    import numpy as np
+
+    from entry import Entry
+    from meet import Meet
+    from meet_data import MeetData
+
+NO_SEX = 0
+FEMALE = 1
+MALE = 2
+SEX_NAMES = {NO_SEX: None, FEMALE: "Female", MALE: "Male"}
+SEX_CODES = {name: code for code, name in SEX_NAMES.items()}
 
 class Swimmer:
-    """Holds all information for a swimmer entered in the meet."""
+    """
+    Holds all information for a swimmer entered in the meet.
+
+    A swimmer is a view onto one row of a MeetData, so every attribute is read from and written to the meet's arrays.
+    """
 
-    def __init__(self, name: str, country: str | None, birthday: str | None, height: float | None, num_days: int) -> None:
-        """Cretes a swimmer with the given name, country, birthday, height, and number of days in the meet."""
-        self.name = name
-        self.country = country
-        self.birthday = birthday
-        self.height = height
-        self.entries = {}
-        self.projected_points = [0] * num_days
-        self.excluded = False
+    __slots__ = ("data", "id")
 
-        # Just a placeholder for the cost, which will figure out how to scrape later once the website is up
-        self.sex = None
-        self.cost = 25
+    def __init__(self, data: MeetData, swimmer_id: int) -> None:
+        """Create a view of the swimmer with the given ID in the meet data."""
+        self.data = data
+        self.id = swimmer_id
 
 
     def __repr__(self) -> str:
@@ -40,13 +44,10 @@ class Swimmer:
         if not isinstance(other, Swimmer):
             return NotImplemented
 
-        if self.name != other.name:
-            return False
+        if self.data is other.data and self.id == other.id:
+            return True
 
-        if self.name == other.name and self.entries != other.entries:
-            print("WARNING: Swimmers with the same name have different entries.")
-
-        return True
+        return self.name == other.name
 
 
     def __hash__(self) -> int:
@@ -54,6 +55,81 @@ class Swimmer:
         return hash(self.name)
 
 
+    @property
+    def name(self) -> str:
+        """The swimmer's name."""
+        return self.data.names[self.id]
+
+
+    @property
+    def country(self) -> str | None:
+        """The swimmer's country."""
+        return self.data.countries[self.id]
+
+
+    @property
+    def birthday(self) -> str | None:
+        """The swimmer's birthday."""
+        return self.data.birthdays[self.id]
+
+
+    @property
+    def height(self) -> float | None:
+        """The swimmer's height."""
+        return self.data.heights[self.id]
+
+
+    @property
+    def meet(self) -> Meet:
+        """The meet the swimmer is entered in."""
+        return self.data.meet
+
+
+    @property
+    def entries(self) -> dict[str, Entry]:
+        """The swimmer's entries, by event name."""
+        return {self.data.events[event_id]: self.data.entries[entry_id] for event_id, entry_id in self.data.swimmer_entries[self.id].items()}
+
+
+    @property
+    def projected_points(self) -> list[int]:
+        """The swimmer's projected points for each day of the meet."""
+        return self.data.points[self.id].tolist()
+
+
+    @property
+    def sex(self) -> str | None:
+        """The swimmer's sex ("Female" or "Male"), or None if they have no entries yet."""
+        return SEX_NAMES[int(self.data.sex[self.id])]
+
+
+    @sex.setter
+    def sex(self, sex: str | None) -> None:
+        self.data.sex[self.id] = SEX_CODES[sex]
+
+
+    @property
+    def cost(self) -> int:
+        """The swimmer's cost."""
+        return int(self.data.cost[self.id])
+
+
+    @cost.setter
+    def cost(self, cost: int) -> None:
+        self.data.cost[self.id] = cost
+
+
+    @property
+    def excluded(self) -> bool:
+        """Whether the swimmer is excluded from lineups."""
+        return bool(self.data.excluded[self.id])
+
+
+    @excluded.setter
+    def excluded(self, excluded: bool) -> None:
+        self.data.excluded[self.id] = excluded
+
+
     def add_event(self, entry: str) -> None:
         """
         Create and add an entry to the swimmer's entries.
@@ -62,18 +138,23 @@ class Swimmer:
             entry: the string representation of the entry to add
 
         """
-        time_text = entry.split()[-1]
-        if time_text[-1] not in [str(x) for x in range(10)]:
+        event, time = parse_entry(entry)
+        if time is None:
             return
 
-        time = int(time_text[-5:-3]) + int(time_text[-2:]) / 100
+        self.add_entry(event, time)
+
+
+    def add_entry(self, event: str, time: float) -> None:
+        """
+        Add an entry whose event and time are already parsed, and set the swimmer's sex from the event if it isn't set.
 
-        # If text is longer than 5 characters, it means there are minutes
-        if len(time_text) > FIVE:
-            time += 60 * int(time_text[:-6])
+        Keyword Arguments:
+            event: the event, e.g. "Women's 100m Freestyle"
+            time: the entry time in seconds
 
-        event = " ".join(entry.split()[:-1])
-        self.entries[event] = Entry(event, round(time, 2))
+        """
+        self.data.add_entry(self.id, event, time)
 
         # set sex
         if self.sex:
@@ -88,39 +169,36 @@ class Swimmer:
             raise ValueError(msg)
 
 
-    def update_seeds(self, swimmers: list[Swimmer]) -> None:
-        """
-        Get this swimmer's seeds for all events they're entered in.
+    def update_projected_points(self) -> None:
+        """Get the projected points for each day of the meet for this swimmer (and every other swimmer in the meet data)."""
+        self.data.update_projected_points()
 
-        Keyword Arguments:
-            swimmers: all swimmers to go through
 
-        """
-        for event in self.entries:
-            seed = 1
-            for swimmer in swimmers:
-                if event in swimmer.entries and swimmer.entries[event] < self.entries[event]:
-                    seed += 1
-            self.entries[event].seed = seed
+def parse_entry(entry: str) -> tuple[str, float | None]:
+    """
+    Get the event and the entry time in seconds from an entry on the psych sheet, with None for no time (e.g. "NT").
 
-    def update_projected_points(self) -> None:
-        """Get the projected points for each day of the meet for this swimmer."""
-        with Path("cached_data.json").open("r") as json_file:
-            data = json.load(json_file)
-
-        # TODO: Make this not have hard coded year and course, and not have to fetch every time (@lrucache?)
-        base_times = get_base_times_from_db(int(sys.argv[1].split()[0]), sys.argv[1].split()[1])
-        string_keys_schedule = data.get("schedule_data", {}).get("schedule", {})
-        schedule = {int(k): v for k, v in string_keys_schedule.items()}
-
-        # Reset projected points for each day to 0
-        self.projected_points = [0] * len(self.projected_points)
-
-        for swimmer_event, entry in self.entries.items():
-            entry.projected_points = math.floor((base_times[swimmer_event] / entry.time) ** 3 * 1000)
-            if entry.excluded:
-                continue
-            for day, day_events in schedule.items():
-                events = [x[0] for x in day_events]
-                if swimmer_event in events:
-                    self.projected_points[day - 1] += entry.projected_points
+    Keyword Arguments:
+        entry: the entry, e.g. "Women's 100m Freestyle 52.13"
+
+    """
+    event, _, time_text = entry.rpartition(" ")
+    return event, parse_time(time_text)
+
+
+def parse_entries(entries: list[str]) -> tuple[list[str], np.ndarray]:
+    """
+    Get the events and the entry times in seconds of a whole column of entries at once, with NaN for no time.
+
+    Keyword Arguments:
+        entries: the entries, e.g. ["Women's 100m Freestyle 52.13", "Women's 200m Freestyle 1:54.20"]
+
+    """
+    events = []
+    time_texts = []
+    for entry in entries:
+        event, _, time_text = entry.rpartition(" ")
+        events.append(event)
+        time_texts.append(time_text)
+
+    return events, parse_times(time_texts)
@@ -0,0 +1,125 @@
+"""Generate synthetic meets of any size, for testing how the solvers scale beyond real Worlds meets."""
+
+import numpy as np
+
+from data_parser import DataParser
+from meet import Meet
+from meet_data import DEFAULT_COST, MeetData
+
+BASE_MEET = "2024 SCM Worlds" # Meet whose events and base times synthetic meets use
+COST_DISTRIBUTIONS = ("constant", "uniform", "skill")
+MIN_COST = 5
+MAX_COST = 50
+SEMIFINAL_MAX_DISTANCE = 200 # Events up to this distance have semifinals the day before the final
+COUNTRIES = ("AUS", "BRA", "CAN", "CHN", "FRA", "GBR", "GER", "HUN", "ITA", "JPN", "NED", "RSA", "SWE", "USA")
+
+
+def generate_meet(  # noqa: PLR0913
+    num_swimmers: int = 500,
+    num_days: int = 6,
+    *,
+    entries_per_swimmer: float = 2.5,
+    female_fraction: float = 0.5,
+    cost_distribution: str = "skill",
+    skill_spread: float = 0.04,
+    base_meet: str = BASE_MEET,
+    seed: int = 0,
+) -> DataParser:
+    """
+    Generate a meet with random swimmers, entries, schedule and costs, in the same form DataParser produces.
+
+    The returned parser has its schedule, meet data and swimmers filled in, like after get_all_data and
+    create_swimmers, so seeds and projected points are updated the usual way.
+
+    Keyword Arguments:
+        num_swimmers: the number of swimmers in the meet
+        num_days: the number of days to spread the events over, e.g. 9 for an Olympic-length schedule
+        entries_per_swimmer: the average number of events each swimmer is entered in
+        female_fraction: the fraction of swimmers who are female
+        cost_distribution: "constant" (every swimmer costs the default), "uniform" (random costs) or "skill"
+            (faster swimmers cost more)
+        skill_spread: how far behind the base times a typical swimmer is, as a fraction of the base time
+        base_meet: the meet whose events and base times to use
+        seed: the random seed, so the same arguments always generate the same meet
+
+    """
+    if cost_distribution not in COST_DISTRIBUTIONS:
+        msg = f"Cost distribution must be one of {', '.join(COST_DISTRIBUTIONS)}, not {cost_distribution}."
+        raise ValueError(msg)
+
+    rng = np.random.default_rng(seed)
+    meet = Meet(base_meet)
+    base_times = meet.base_times
+    meet.schedule = generate_schedule(list(base_times), num_days, rng)
+
+    events_by_sex = {
+        "Female": [event for event in base_times if event.startswith("Women")],
+        "Male": [event for event in base_times if event.startswith("Men")],
+    }
+
+    # Each swimmer has an overall skill, how far behind the base times they swim, plus some variation between events
+    is_female = rng.random(num_swimmers) < female_fraction
+    skills = rng.exponential(skill_spread, num_swimmers)
+    num_entries = 1 + rng.poisson(max(entries_per_swimmer - 1, 0), num_swimmers)
+
+    data = MeetData(meet)
+    for swimmer_id in range(num_swimmers):
+        sex = "Female" if is_female[swimmer_id] else "Male"
+        swimmer = data.add_swimmer(f"SWIMMER {swimmer_id + 1:06}", COUNTRIES[swimmer_id % len(COUNTRIES)], None, None)
+        swimmer.sex = sex
+
+        events = events_by_sex[sex]
+        for event_index in rng.choice(len(events), size=min(num_entries[swimmer_id], len(events)), replace=False):
+            event = events[event_index]
+            time = base_times[event] * (1.01 + skills[swimmer_id] + rng.exponential(skill_spread / 4))
+            data.add_entry(swimmer_id, event, round(float(time), 2))
+
+    data.cost[:] = generate_costs(skills, cost_distribution, rng)
+
+    parser = DataParser(meet)
+    parser.schedule = meet.schedule
+    parser.data = data
+    parser.swimmers = data.swimmers
+    return parser
+
+
+def generate_schedule(events: list[str], num_days: int, rng: np.random.Generator) -> dict[int, list[tuple[str, str]]]:
+    """
+    Spread events over the days of a meet, with semifinals the day before the final for shorter events.
+
+    Keyword Arguments:
+        events: the events in the meet
+        num_days: the number of days in the meet
+        rng: the random number generator to place events with
+
+    """
+    schedule = {day: [] for day in range(1, num_days + 1)}
+    for event in events:
+        distance = int(event.split()[1].removesuffix("m"))
+        has_semifinal = distance <= SEMIFINAL_MAX_DISTANCE and num_days > 1
+        final_day = int(rng.integers(2 if has_semifinal else 1, num_days + 1))
+        if has_semifinal:
+            schedule[final_day - 1].append((event, "Semifinals"))
+        schedule[final_day].append((event, "Finals"))
+
+    return schedule
+
+
+def generate_costs(skills: np.ndarray, cost_distribution: str, rng: np.random.Generator) -> np.ndarray:
+    """
+    Get a cost for each swimmer.
+
+    Keyword Arguments:
+        skills: how far behind the base times each swimmer is, where smaller is faster
+        cost_distribution: "constant", "uniform" or "skill"
+        rng: the random number generator to draw costs with
+
+    """
+    if cost_distribution == "constant":
+        return np.full(len(skills), DEFAULT_COST)
+    if cost_distribution == "uniform":
+        return rng.integers(MIN_COST, MAX_COST + 1, len(skills))
+
+    # The fastest swimmers cost the most, with costs falling off quickly like real fantasy prices
+    percentiles = skills.argsort().argsort() / max(len(skills) - 1, 1)
+    return np.round(MIN_COST + (MAX_COST - MIN_COST) * (1 - percentiles) ** 3).astype(np.int32)
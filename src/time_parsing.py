@@ -0,0 +1,93 @@
+"""Parse swim times from psych sheets and world record pages, one at a time or a whole column at once, and world record dates."""
+
+import re
+
+import numpy as np
+
+# A swim time like "52.34" or "1:52.34", where world record pages sometimes give tenths ("52.3") and mark ties with "="
+TIME = r"(?:(\d+):)?(\d+)\.(\d\d?)[= ]*"
+TIME_PATTERN = re.compile(TIME)
+NON_TIME_LINE_PATTERN = re.compile(rf"^(?!{TIME}$).*$", re.MULTILINE)
+NO_MINUTES_LINE_PATTERN = re.compile(r"^(?=\d+\.)", re.MULTILINE)
+
+# Dates are like "5 March 2009" or "March 5, 2009", with the month written out or abbreviated
+MONTHS = ("January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December")
+MONTH_TO_NUM = {month: number for number, month in enumerate(MONTHS, 1)} | {month[:3]: number for number, month in enumerate(MONTHS, 1)}
+DATE_PARTS = 3 # day, month and year
+
+
+def parse_time(text: str) -> float | None:
+    """
+    Get a swim time in seconds, or None if the text isn't a time (e.g. "NT").
+
+    Keyword Arguments:
+        text: the time, e.g. "1:52.34"
+
+    """
+    match = TIME_PATTERN.fullmatch(text)
+    if not match:
+        return None
+
+    minutes, seconds, hundredths = match.groups()
+    if len(hundredths) == 1:
+        hundredths += "0"
+    time = int(seconds) + int(hundredths) / 100
+    if minutes:
+        time += 60 * int(minutes)
+
+    return round(time, 2)
+
+
+def parse_times(texts: list[str]) -> np.ndarray:
+    """
+    Get a column of swim times in seconds, with NaN for each text that isn't a time.
+
+    Rather than matching each text, the whole column is rewritten as numbers by two regex substitutions and read by
+    NumPy in one call, which is about three times as fast as calling parse_time on every text.
+
+    Keyword Arguments:
+        texts: the times, e.g. ["52.34", "1:52.34", "NT"]
+
+    """
+    text = _join_lines(texts)
+    if not texts:
+        return np.empty(0)
+
+    # Every line becomes "minutes seconds", e.g. "1 52.34" for "1:52.34" and "0 52.34" for "52.34"
+    text = NON_TIME_LINE_PATTERN.sub("nan nan", text)
+    text = NO_MINUTES_LINE_PATTERN.sub("0 ", text).replace(":", " ").replace("=", " ")
+    minutes, seconds = np.fromstring(text, sep=" ").reshape(-1, 2).T
+
+    return np.round(minutes * 60 + seconds, 2)
+
+
+def parse_date(text: str) -> tuple[int, str] | None:
+    """
+    Get a date as a YYYYMMDD number and in "day month year" form, or None if the text isn't a date.
+
+    Keyword Arguments:
+        text: the date, e.g. "March 5, 2009"
+
+    """
+    parts = text.replace(",", "").split(" ")
+    if len(parts) != DATE_PARTS:
+        return None
+
+    day, month, year = parts
+    if not day.isdigit():
+        day, month = month, day
+    month_num = MONTH_TO_NUM.get(month)
+    if month_num is None or not day.isdigit() or not year.isdigit():
+        return None
+
+    return int(year) * 10000 + month_num * 100 + int(day), f"{day} {month} {year}"
+
+
+def _join_lines(texts: list[str]) -> str:
+    """Join texts into one line each, so a column can be parsed with multiline patterns."""
+    text = "\n".join(texts)
+    if text.count("\n") != max(len(texts) - 1, 0):
+        msg = "Texts to parse can't contain line breaks."
+        raise ValueError(msg)
+
+    return text
@@ -0,0 +1,293 @@
+"""Tracer class for timing named stages of the pipeline, measuring their memory, and exporting them as a Chrome trace."""
+
+import contextlib
+import cProfile
+import json
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from pathlib import Path
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+MEMORY_TOP_SITES = 3 # Number of allocation sites to record for the memory retained by an outermost span
+
+
+class Tracer:
+    """
+    Records named spans with durations and counters, and optionally a cProfile dump of each span.
+
+    Tracing is off until enable is called, and spans cost almost nothing while it's off, so stages can stay wrapped
+    in spans permanently. Spans can be nested and can run on several threads at once. The trace is exported in the
+    Chrome trace event format, which chrome://tracing and https://ui.perfetto.dev can open.
+
+    With memory accounting on, each span also records the peak and retained Python allocations from tracemalloc, and
+    the process's peak RSS. tracemalloc only sees allocations made through Python, so the native memory of OR-Tools
+    models shows up in the peak RSS and the model sizes, not in the allocations.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a disabled tracer with no spans."""
+        self.enabled = False
+        self.profile_dir: Path | None = None
+        self.memory = False
+        self.events: list[dict] = []
+
+        self._start_ns = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._profiling = False # Only one cProfile profiler can run at a time, even across threads
+        self._num_profiles = 0
+        self._memory_spans: dict[int, dict[str, int]] = {} # Start and running peak of the spans being measured, by span number
+        self._num_memory_spans = 0
+
+
+    def __repr__(self) -> str:
+        """Return a string representation of the Tracer."""
+        return f"Tracer(enabled={self.enabled}, profile_dir={self.profile_dir}, memory={self.memory}, num_events={len(self.events)})"
+
+
+    def enable(self, profile_dir: Path | None = None, *, memory: bool = False) -> None:
+        """
+        Start recording spans.
+
+        Keyword Arguments:
+            profile_dir: if given, also write a cProfile dump of each span to this directory
+            memory: whether to also measure the memory each span allocates, which slows allocations down
+
+        """
+        self.enabled = True
+        self.profile_dir = profile_dir
+        if profile_dir:
+            profile_dir.mkdir(parents=True, exist_ok=True)
+
+        self.memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+    @property
+    def isolates_stages(self) -> bool:
+        """
+        Whether stages that could overlap should run one at a time, so each one's profile and memory only cover its own work.
+
+        cProfile and tracemalloc see the whole process, so a stage running at the same time as another would be
+        charged the other's calls and allocations.
+        """
+        return self.enabled and (self.profile_dir is not None or self.memory)
+
+
+    @contextlib.contextmanager
+    def span(self, name: str, *, profile: bool = True, **counters: float | str) -> Iterator[dict]:
+        """
+        Time the body of the with statement as a named span.
+
+        Yields the span's counters, so the body can add to them, e.g. `span["swimmers"] = len(swimmers)`.
+        When profiling, a span is only profiled if no other span is being profiled, so nested spans and spans on
+        other threads are attributed to the outermost profiled span. Spans that only group other spans are
+        recorded with profile=False, so the stages inside them each get their own profile.
+
+        Keyword Arguments:
+            name: the name of the span, e.g. "seeding"
+            profile: whether to profile the span when profiling is on
+            counters: initial counters to record with the span
+
+        """
+        if not self.enabled:
+            yield counters
+            return
+
+        memory_span = self._start_memory() if self.memory else None
+        profiler = self._start_profiler() if profile else None
+        start_ns = time.perf_counter_ns()
+        try:
+            yield counters
+        finally:
+            end_ns = time.perf_counter_ns()
+            if memory_span is not None:
+                counters.update(self._stop_memory(memory_span))
+            if profiler:
+                counters["profile"] = str(self._stop_profiler(profiler, name))
+            self._add_event({
+                "name": name,
+                "ph": "X",
+                "ts": (start_ns - self._start_ns) / 1000,
+                "dur": (end_ns - start_ns) / 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": counters,
+            })
+
+
+    def count(self, name: str, **values: float) -> None:
+        """
+        Record the current values of a counter, shown as a graph over time in the trace.
+
+        Keyword Arguments:
+            name: the name of the counter, e.g. "solve_cache"
+            values: the values to record, e.g. hits=3, misses=1
+
+        """
+        if not self.enabled:
+            return
+
+        self._add_event({
+            "name": name,
+            "ph": "C",
+            "ts": (time.perf_counter_ns() - self._start_ns) / 1000,
+            "pid": os.getpid(),
+            "args": values,
+        })
+
+
+    def export_chrome_trace(self, path: Path) -> None:
+        """
+        Write every recorded span and counter as a Chrome trace JSON file.
+
+        Keyword Arguments:
+            path: the file to write the trace to
+
+        """
+        with self._lock:
+            events = list(self.events)
+
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, indent=1))
+
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Get the number of times each span ran and its total duration in seconds, by span name."""
+        totals = {}
+        with self._lock:
+            for event in self.events:
+                if event["ph"] == "X":
+                    total = totals.setdefault(event["name"], {"count": 0, "seconds": 0.0})
+                    total["count"] += 1
+                    total["seconds"] += event["dur"] / 1_000_000
+
+        return totals
+
+
+    def memory_summary(self) -> dict[str, dict[str, float]]:
+        """
+        Get the memory of each span by span name, and by solver for spans recorded with a solver counter.
+
+        For each, the number of times it ran, the largest peak and total retained allocations in bytes, the highest
+        peak RSS in bytes, and the largest model it built.
+        """
+        totals = {}
+        with self._lock:
+            for event in self.events:
+                args = event.get("args", {})
+                if event["ph"] != "X" or "peak_bytes" not in args:
+                    continue
+                key = f"{event['name']} {args['solver']}" if "solver" in args else event["name"]
+                total = totals.setdefault(key, {"count": 0, "peak_bytes": 0, "retained_bytes": 0})
+                total["count"] += 1
+                total["peak_bytes"] = max(total["peak_bytes"], args["peak_bytes"])
+                total["retained_bytes"] += args["retained_bytes"]
+                for counter in ("peak_rss_bytes", "variables", "constraints"):
+                    if counter in args:
+                        total[counter] = max(total.get(counter, 0), args[counter])
+
+        return dict(sorted(totals.items()))
+
+
+    def format_memory_report(self) -> str:
+        """Get the memory summary as a table sorted by name, so reports from different versions can be diffed."""
+        summary = self.memory_summary()
+        width = max((len(name) for name in summary), default=5) + 2
+        lines = [f"{'Stage':<{width}}{'Count':>7}{'Peak MiB':>11}{'Retained MiB':>14}{'Peak RSS MiB':>14}{'Variables':>11}{'Constraints':>13}"]
+        for name, total in summary.items():
+            peak_rss = f"{total['peak_rss_bytes'] / 2**20:>14.1f}" if "peak_rss_bytes" in total else f"{'':>14}"
+            lines.append(f"{name:<{width}}{total['count']:>7}{total['peak_bytes'] / 2**20:>11.2f}{total['retained_bytes'] / 2**20:>14.2f}"
+                         f"{peak_rss}{total.get('variables', ''):>11}{total.get('constraints', ''):>13}")
+
+        return "\n".join(lines) + "\n"
+
+
+    def _add_event(self, event: dict) -> None:
+        """Add an event to the trace."""
+        with self._lock:
+            self.events.append(event)
+
+
+    def _start_memory(self) -> dict:
+        """Start measuring the memory of a span, taking a snapshot if no other span is being measured."""
+        with self._lock:
+            self._update_memory_peaks()
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            self._num_memory_spans += 1
+            number = self._num_memory_spans
+            self._memory_spans[number] = {"start": current, "peak": current}
+            outermost = len(self._memory_spans) == 1
+
+        return {"number": number, "snapshot": tracemalloc.take_snapshot() if outermost else None}
+
+
+    def _stop_memory(self, memory_span: dict) -> dict:
+        """Stop measuring the memory of a span, returning its counters."""
+        with self._lock:
+            self._update_memory_peaks()
+            tracemalloc.reset_peak() # Every open span has its peak so far, so the next peak only has to cover what comes after
+            state = self._memory_spans.pop(memory_span["number"])
+            current, _ = tracemalloc.get_traced_memory()
+
+        counters = {"peak_bytes": state["peak"] - state["start"], "retained_bytes": current - state["start"]}
+        if resource:
+            # Linux reports the peak RSS in kilobytes and macOS in bytes
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            counters["peak_rss_bytes"] = max_rss if sys.platform == "darwin" else max_rss * 1024
+        if memory_span["snapshot"]:
+            differences = tracemalloc.take_snapshot().compare_to(memory_span["snapshot"], "lineno")
+            counters["top_retained"] = [
+                f"{difference.traceback[0].filename}:{difference.traceback[0].lineno} {difference.size_diff / 1024:+.1f} KiB"
+                for difference in differences[:MEMORY_TOP_SITES]
+            ]
+
+        return counters
+
+
+    def _update_memory_peaks(self) -> None:
+        """Raise the running peak of every span being measured to the peak since the last reset."""
+        _, peak = tracemalloc.get_traced_memory()
+        for state in self._memory_spans.values():
+            state["peak"] = max(state["peak"], peak)
+
+
+    def _start_profiler(self) -> cProfile.Profile | None:
+        """Start profiling a span, unless profiling is off or another span is already being profiled."""
+        if not self.profile_dir:
+            return None
+
+        with self._lock:
+            if self._profiling:
+                return None
+            self._profiling = True
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+
+    def _stop_profiler(self, profiler: cProfile.Profile, name: str) -> Path:
+        """Stop profiling a span and write its profile, returning the path it was written to."""
+        profiler.disable()
+        with self._lock:
+            self._profiling = False
+            self._num_profiles += 1
+            number = self._num_profiles
+
+        path = self.profile_dir / f"{number:03}-{re.sub(r'[^a-z0-9]+', '-', name.lower())}.prof"
+        profiler.dump_stats(path)
+        return path
+
+
+# The tracer every module records spans with, enabled by the command line flags of lineup_optimizer.py
+tracer = Tracer()
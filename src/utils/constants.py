@@ -1,6 +1,5 @@
 """Contains constants used throughout the program."""
 
-NUM_EXPECTED_ARGS = 2 # Expected number of command line arguments
 NUM_DAYS = 6 # Number of days in the meet
 NUM_LINEUPS = 1 # Number of lineups to generate for the single day solver
 
@@ -0,0 +1,186 @@
+"""Analyze world records in the database, returning results as arrays and rendering charts without a display."""
+
+import itertools
+import sqlite3
+import time
+from functools import cache
+from pathlib import Path
+
+import numpy as np
+
+from wr_database import DB_PATH
+
+CHARTS_DIR = Path(__file__).parent.parent.resolve() / "charts"
+
+
+@cache
+def record_counts(db_path: Path = DB_PATH) -> dict[str, np.ndarray]:
+    """
+    Count world records by year, course, sex and stroke with a single grouped query.
+
+    Returns parallel arrays "year", "course", "sex", "stroke" and "count", one element per group.
+
+    Keyword Arguments:
+        db_path: the database to read world records from
+
+    """
+    conn = sqlite3.connect(db_path)
+    results = conn.execute("""
+        SELECT date_num / 10000 AS year, course, sex, stroke, COUNT(*)
+        FROM world_records
+        GROUP BY year, course, sex, stroke
+        ORDER BY year, course, sex, stroke
+    """).fetchall()
+    conn.close()
+
+    years, courses, sexes, strokes, counts = zip(*results, strict=True) if results else ([], [], [], [], [])
+    return {
+        "year": np.array(years, dtype=np.int32),
+        "course": np.array(courses, dtype=str),
+        "sex": np.array(sexes, dtype=str),
+        "stroke": np.array(strokes, dtype=str),
+        "count": np.array(counts, dtype=np.int32),
+    }
+
+
+def counts_by_year(start_year: int, end_year: int, *, course: str | None = None, sex: str | None = None, stroke: str | None = None, db_path: Path = DB_PATH) -> tuple[np.ndarray, np.ndarray]:  # noqa: PLR0913
+    """
+    Get the number of world records set each year, optionally only for one course, sex or stroke.
+
+    Keyword Arguments:
+        start_year: the first year to count
+        end_year: the last year to count, inclusive
+        course: only count records in this course, e.g. "LCM"
+        sex: only count records for this sex, e.g. "Women"
+        stroke: only count records in this stroke, e.g. "Freestyle"
+        db_path: the database to read world records from
+
+    Returns the years and the number of records set in each of them.
+
+    """
+    counts = record_counts(db_path)
+    mask = (counts["year"] >= start_year) & (counts["year"] <= end_year)
+    for column, value in (("course", course), ("sex", sex), ("stroke", stroke)):
+        if value is not None:
+            mask &= counts[column] == value
+
+    years = np.arange(start_year, end_year + 1)
+    year_counts = np.bincount(counts["year"][mask] - start_year, weights=counts["count"][mask], minlength=len(years))
+    return years, year_counts.astype(np.int32)
+
+
+@cache
+def best_time_progressions(db_path: Path = DB_PATH) -> dict[tuple[str, str, str, str], tuple[np.ndarray, np.ndarray]]:
+    """
+    Get the best time over time for every event, from a single query.
+
+    Returns the dates (as date numbers) and the best time as of each date, keyed by (course, sex, stroke, distance).
+
+    Keyword Arguments:
+        db_path: the database to read world records from
+
+    """
+    conn = sqlite3.connect(db_path)
+    results = conn.execute("""
+        SELECT course, sex, stroke, distance, date_num, time_in_seconds
+        FROM world_records
+        WHERE time_in_seconds > 0
+        ORDER BY course, sex, stroke, distance, date_num
+    """).fetchall()
+    conn.close()
+
+    if not results:
+        return {}
+
+    courses, sexes, strokes, distances, date_nums, times = zip(*results, strict=True)
+    date_nums = np.array(date_nums, dtype=np.int32)
+    times = np.array(times, dtype=np.float64)
+
+    # Rows are sorted by event, so each event is one contiguous slice
+    event_keys = list(zip(courses, sexes, strokes, distances, strict=True))
+    boundaries = [0] + [index for index in range(1, len(event_keys)) if event_keys[index] != event_keys[index - 1]] + [len(event_keys)]
+
+    progressions = {}
+    for start, end in itertools.pairwise(boundaries):
+        progressions[event_keys[start]] = (date_nums[start:end], np.minimum.accumulate(times[start:end]))
+
+    return progressions
+
+
+def render_counts_chart(start_year: int, end_year: int, course: str = "LCM", output_dir: Path = CHARTS_DIR, db_path: Path = DB_PATH) -> Path:
+    """
+    Save a chart of the number of world records set each year.
+
+    Keyword Arguments:
+        start_year: the first year to chart
+        end_year: the last year to chart, inclusive
+        course: the course to chart, e.g. "LCM"
+        output_dir: the directory to save the chart in
+        db_path: the database to read world records from
+
+    """
+    plt = _get_headless_pyplot()
+
+    years, counts = counts_by_year(start_year, end_year, course=course, db_path=db_path)
+    fig, ax = plt.subplots()
+    ax.plot(years, counts)
+    ax.set_xlabel("Year")
+    ax.set_ylabel("World Record Count")
+    ax.set_title(f"{course} World Record Counts ({start_year}-{end_year})")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"{course.lower()}-wr-counts-{start_year}-{end_year}.png"
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+def render_progression_charts(output_dir: Path = CHARTS_DIR, db_path: Path = DB_PATH) -> list[Path]:
+    """
+    Save a chart of the world record progression for every event.
+
+    Keyword Arguments:
+        output_dir: the directory to save the charts in
+        db_path: the database to read world records from
+
+    """
+    plt = _get_headless_pyplot()
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Reuse one figure for every event, since creating figures is most of the cost of rendering
+    fig, ax = plt.subplots()
+    paths = []
+    for (course, sex, stroke, distance), (date_nums, best_times) in best_time_progressions(db_path).items():
+        # Plot dates as fractional years so records are spaced by when they were set
+        years = date_nums // 10000 + (date_nums // 100 % 100 - 1) / 12 + (date_nums % 100 - 1) / 365
+        ax.clear()
+        ax.step(years, best_times, where="post")
+        ax.set_xlabel("Year")
+        ax.set_ylabel("World Record (seconds)")
+        ax.set_title(f"{sex}'s {distance}m {stroke} ({course}) World Record Progression")
+
+        path = output_dir / f"{course}-{sex}-{distance}m-{stroke}.png".lower().replace(" ", "-")
+        fig.savefig(path)
+        paths.append(path)
+
+    plt.close(fig)
+    return paths
+
+
+def _get_headless_pyplot() -> object:
+    """Import pyplot with a backend that renders to files, so charts never open a window or block."""
+    import matplotlib as mpl
+    mpl.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def main() -> None:
+    """Render every world record chart."""
+    start = time.time()
+    counts_path = render_counts_chart(2000, 2024)
+    progression_paths = render_progression_charts()
+    print(f"Saved {len(progression_paths) + 1} charts to {counts_path.parent} in {time.time() - start:.2f} seconds.")
+
+if __name__ == "__main__":
+    main()
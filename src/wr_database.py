@@ -0,0 +1,148 @@
+"""Read and precompute base times in the world record database, without loading any scraping libraries."""
+
+import datetime
+import sqlite3
+from collections import defaultdict
+from functools import cache
+from pathlib import Path
+
+DB_PATH = Path(__file__).parent.parent.resolve() / "swimming.db"
+
+
+def base_times_cutoff(year: int, course: str) -> int:
+    """
+    Get the last date (as a date number) of world records that count towards the base times for a given year.
+
+    Keyword Arguments:
+        year: the year of the meet
+        course: the course of the meet, "LCM" or "SCM"
+
+    """
+    if course not in ["LCM", "SCM"]:
+        msg = f"Unexpected course: {course}"
+        raise ValueError(msg)
+
+    # SCM base times are the world records as of August 31st, and LCM base times are as of December 31st of the year before
+    if course == "LCM":
+        return (year - 1) * 10000 + 1231
+    return year * 10000 + 831
+
+
+def materialize_base_times(conn: sqlite3.Connection) -> int:
+    """
+    Precompute the base times for every year and course into the base_times table.
+
+    The base time of an event is the running minimum of its world record times up to each year's cutoff date.
+    Returns the number of base times written.
+
+    Keyword Arguments:
+        conn: an open connection to the database, which the caller commits
+
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS base_times (
+            course TEXT,
+            date_num INTEGER,
+            sex TEXT,
+            stroke TEXT,
+            distance TEXT,
+            time_in_seconds REAL,
+            PRIMARY KEY (course, date_num, sex, stroke, distance)
+        )
+    """)
+    # Lookups by course and date use the primary key, which starts with them, so an index of its own is redundant
+    conn.execute("DROP INDEX IF EXISTS base_times_course_date")
+
+    records = conn.execute("""
+        SELECT course, sex, stroke, distance, date_num, time_in_seconds
+        FROM world_records
+        WHERE course IN ('LCM', 'SCM')
+        ORDER BY course, sex, stroke, distance, date_num
+    """).fetchall()
+    if not records:
+        return 0
+
+    first_year = min(record[4] for record in records) // 10000
+    last_year = datetime.datetime.now(tz=datetime.UTC).year + 1
+
+    base_times = []
+    event_records = defaultdict(list)
+    for course, sex, stroke, distance, date_num, time_in_seconds in records:
+        event_records[course, sex, stroke, distance].append((date_num, time_in_seconds))
+
+    for (course, sex, stroke, distance), progression in event_records.items():
+        record_index = 0
+        best_time = None
+        # Records are sorted by date, so walk through them once while moving the cutoff forward a year at a time
+        for year in range(first_year, last_year + 1):
+            cutoff = base_times_cutoff(year, course)
+            while record_index < len(progression) and progression[record_index][0] <= cutoff:
+                record_time = progression[record_index][1]
+                best_time = record_time if best_time is None else min(best_time, record_time)
+                record_index += 1
+            if best_time is not None:
+                base_times.append((course, cutoff, sex, stroke, distance, best_time))
+
+    conn.execute("DELETE FROM base_times")
+    conn.executemany("""
+        INSERT INTO base_times (course, date_num, sex, stroke, distance, time_in_seconds)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, base_times)
+
+    return len(base_times)
+
+
+@cache
+def get_base_times_from_db(year: int, course: str, db_path: Path = DB_PATH) -> dict[str, float]:
+    """
+    Get base times for each event for a given year.
+
+    Keyword Arguments:
+        year: the year of the meet
+        course: the course of the meet, "LCM" or "SCM"
+        db_path: the database to read the base times from
+
+    """
+    cutoff = base_times_cutoff(year, course)
+    adjusted_year, month = cutoff // 10000, f"{cutoff // 100 % 100:02}"
+
+    today = datetime.datetime.now(tz=datetime.UTC).date()
+    if today.year * 10000 + today.month * 100 + today.day < cutoff:
+        msg = f"The {year} {course} base times are not available yet. They will be available after {adjusted_year}-{month}-31."
+        raise ValueError(msg)
+
+    valid_start = f"{(int(month) + 1) % 12:02}-01-{adjusted_year + (course == 'LCM')}"
+    valid_end = f"{month}-31-{adjusted_year + 1}"
+    print(f"Fetching {year} {course} base times... (valid from {valid_start} to {valid_end})")
+
+    # Lookups only read, so many processes can share the database without contending for write locks
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    results = _read_base_times(conn, course, cutoff)
+    conn.close()
+    if not results:
+        # The base times haven't been precomputed since the world records were last updated, so do it once now
+        conn = sqlite3.connect(db_path)
+        with conn:
+            materialize_base_times(conn)
+        results = _read_base_times(conn, course, cutoff)
+        conn.close()
+
+    base_times = {}
+    for sex, stroke, distance, time_in_seconds in results:
+        event = f"{sex}'s {distance}m {stroke}"
+        base_times[event] = time_in_seconds
+
+    return base_times
+
+
+def _read_base_times(conn: sqlite3.Connection, course: str, cutoff: int) -> list[tuple]:
+    """Read the precomputed base times for a course and cutoff date, or nothing if they haven't been computed."""
+    try:
+        return conn.execute("""
+            SELECT sex, stroke, distance, time_in_seconds
+            FROM base_times
+            WHERE course = ? AND date_num = ?
+        """, (course, cutoff)).fetchall()
+    except sqlite3.OperationalError:
+        # The base_times table doesn't exist yet
+        return []
@@ -0,0 +1,123 @@
+"""Fetch world record pages concurrently, only downloading pages that changed since they were last fetched."""
+
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Self
+
+import requests
+from requests.adapters import HTTPAdapter
+
+PAGE_CACHE_DIR = Path(__file__).parent.parent.resolve() / "wr_page_cache"
+MAX_WORKERS = 8 # Maximum number of pages fetched at once
+REQUEST_TIMEOUT = 10 # Seconds to wait for a page to respond
+HTTP_NOT_MODIFIED = 304
+USER_AGENT = "swim-fantasy/0.1 (https://github.com/jbsmith314/swim-fantasy)" # Wikipedia asks clients to identify themselves
+
+
+class PageFetcher:
+    """
+    Fetches pages over a pooled HTTP session, caching each response on disk with its ETag and Last-Modified headers.
+
+    Cached pages are revalidated with conditional requests, so a page that hasn't changed is never downloaded again.
+    """
+
+    def __init__(self, cache_dir: Path = PAGE_CACHE_DIR, max_workers: int = MAX_WORKERS) -> None:
+        """
+        Initialize the fetcher with a pooled session.
+
+        Keyword Arguments:
+            cache_dir: the directory to cache responses in
+            max_workers: the maximum number of pages fetched at once
+
+        """
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+
+    def __repr__(self) -> str:
+        """Return a string representation of the PageFetcher."""
+        return f"PageFetcher(cache_dir={self.cache_dir}, max_workers={self.max_workers})"
+
+
+    def __enter__(self) -> Self:
+        """Use the fetcher as a context manager that closes its session on exit."""
+        return self
+
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the session."""
+        self.close()
+
+
+    def close(self) -> None:
+        """Close the pooled session."""
+        self.session.close()
+
+
+    def fetch(self, url: str) -> tuple[str, bool]:
+        """
+        Get the text of a page, revalidating the cached copy if there is one.
+
+        Keyword Arguments:
+            url: the URL of the page to fetch
+
+        Returns the page text and whether it changed since it was last fetched.
+
+        """
+        body_path, meta_path = self._cache_paths(url)
+
+        headers = {}
+        meta = {}
+        if body_path.exists() and meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = self.session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code == HTTP_NOT_MODIFIED and meta:
+            return body_path.read_text(encoding="utf-8"), False
+
+        response.raise_for_status()
+        body_path.write_text(response.text, encoding="utf-8")
+        meta_path.write_text(json.dumps({
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }))
+
+        return response.text, True
+
+
+    def fetch_all(self, urls: list[str]) -> tuple[dict[str, str], set[str]]:
+        """
+        Get the text of every page concurrently, using at most max_workers requests at once.
+
+        Keyword Arguments:
+            urls: the URLs of the pages to fetch
+
+        Returns the text of each page by URL, and the URLs of the pages that changed since they were last fetched.
+
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(self.fetch, urls))
+
+        pages = {url: text for url, (text, _) in zip(urls, results, strict=True)}
+        changed = {url for url, (_, is_changed) in zip(urls, results, strict=True) if is_changed}
+        return pages, changed
+
+
+    def _cache_paths(self, url: str) -> tuple[Path, Path]:
+        """Get the paths of the cached body and headers for a URL."""
+        name = hashlib.sha256(url.encode()).hexdigest()[:32]
+        return self.cache_dir / f"{name}.html", self.cache_dir / f"{name}.json"
@@ -1,97 +1,140 @@
 """Get world records from online."""
 
-import datetime
-import re
+import importlib.util
+import math
 import sqlite3
 import time
-from functools import cache
+from concurrent.futures import ProcessPoolExecutor
 
-import matplotlib.pyplot as plt
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+from time_parsing import parse_date, parse_times
+from wr_database import DB_PATH, get_base_times_from_db, materialize_base_times
+from wr_fetcher import PageFetcher
 
 EXPECTED_COLS = 9
 MINIMUM_TIME_LENGTH = 5
-MAXIMUM_TIME_LENGTH = 8
-EXPECTED_DATE_TOKENS = 3  # day, month, year
+WR_CATEGORY_URL = "https://en.wikipedia.org/wiki/Category:World_record_progressions_in_swimming"
+
+# lxml builds the tree several times faster than the built in parser, so use it when it's installed
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+WR_PAGE_STRAINER = SoupStrainer(["h1", "h2", "h3", "h4", "table"])
+
+# A world record is identified by these columns, so refreshing only writes records that aren't in the database yet
+WR_NATURAL_KEY = ("sex", "stroke", "distance", "course", "date_num", "swimmer", "time")
+WR_DETAIL_COLUMNS = (
+    "country",
+    "date",
+    "meet",
+    "location",
+    "awaiting_ratification",
+    "heat",
+    "semifinal",
+    "relay",
+    "b_final",
+    "race_split",
+    "time_trial",
+    "raw_circumstances",
+    "time_in_seconds",
+)
+WR_COLUMNS = WR_NATURAL_KEY + WR_DETAIL_COLUMNS
+
+COURSES = {"Long course": "LCM", "Short course": "SCM", "Short course (25m)": "SCM"}
 
 def add_to_db(rows: list[dict]) -> None:
-    """Add world records to the database."""
-    conn = sqlite3.connect("swimming.db")
-    cursor = conn.cursor()
-
-    cursor.execute("""DROP TABLE IF EXISTS world_records""")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS world_records (
-            id INTEGER PRIMARY KEY,
-            sex TEXT,
-            stroke TEXT,
-            distance TEXT,
-            course TEXT,
-            time TEXT,
-            swimmer TEXT,
-            country TEXT,
-            date TEXT,
-            meet TEXT,
-            location TEXT,
-            awaiting_ratification BOOLEAN,
-            heat BOOLEAN,
-            semifinal BOOLEAN,
-            relay BOOLEAN,
-            b_final BOOLEAN,
-            race_split BOOLEAN,
-            time_trial BOOLEAN,
-            raw_circumstances TEXT,
-            date_num INTEGER,
-            time_in_seconds REAL
-        )
-    """)
-
-    for row in rows:
-        cursor.execute("""
-            INSERT INTO world_records (sex, stroke, distance, course, time, swimmer, country, date, meet, location, awaiting_ratification, heat, semifinal, relay, b_final, race_split, time_trial, raw_circumstances, date_num, time_in_seconds)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            row["sex"],
-            row["stroke"],
-            row["distance"],
-            row["course"],
-            row["time"],
-            row["swimmer"],
-            row["country"],
-            row["date"],
-            row["meet"],
-            row["location"],
-            row["awaiting_ratification"],
-            row["heat"],
-            row["semifinal"],
-            row["relay"],
-            row["b_final"],
-            row["race_split"],
-            row["time_trial"],
-            row["raw_circumstances"],
-            row["date_num"],
-            row["time_in_seconds"],
-        ))
-
-    print(f"Added {len(rows)} world records to database.")
-    conn.commit()
+    """
+    Add world records to the database, writing only records that are new or changed.
+
+    Keyword Arguments:
+        rows: the world records to add
+
+    """
+    conn = sqlite3.connect(DB_PATH)
+    # WAL lets readers keep reading the old records while a refresh is being written
+    conn.execute("PRAGMA journal_mode=WAL")
+
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS world_records (
+                id INTEGER PRIMARY KEY,
+                sex TEXT,
+                stroke TEXT,
+                distance TEXT,
+                course TEXT,
+                time TEXT,
+                swimmer TEXT,
+                country TEXT,
+                date TEXT,
+                meet TEXT,
+                location TEXT,
+                awaiting_ratification BOOLEAN,
+                heat BOOLEAN,
+                semifinal BOOLEAN,
+                relay BOOLEAN,
+                b_final BOOLEAN,
+                race_split BOOLEAN,
+                time_trial BOOLEAN,
+                raw_circumstances TEXT,
+                date_num INTEGER,
+                time_in_seconds REAL
+            )
+        """)
+
+        # Databases created before the natural key existed may have duplicate records, which would block the unique index
+        conn.execute(f"""
+            DELETE FROM world_records
+            WHERE id NOT IN (SELECT MIN(id) FROM world_records GROUP BY {", ".join(WR_NATURAL_KEY)})
+        """)
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS world_records_natural_key ON world_records ({", ".join(WR_NATURAL_KEY)})")
+
+        changes_before = conn.total_changes
+        conn.executemany(f"""
+            INSERT INTO world_records ({", ".join(WR_COLUMNS)})
+            VALUES ({", ".join(f":{column}" for column in WR_COLUMNS)})
+            ON CONFLICT ({", ".join(WR_NATURAL_KEY)}) DO UPDATE SET
+                {", ".join(f"{column} = excluded.{column}" for column in WR_DETAIL_COLUMNS)}
+            WHERE ({", ".join(WR_DETAIL_COLUMNS)}) IS NOT ({", ".join(f"excluded.{column}" for column in WR_DETAIL_COLUMNS)})
+        """, rows)
+        num_written = conn.total_changes - changes_before
+
+        # Keep the precomputed base times in the same transaction, so readers never see them out of sync with the records
+        num_base_times = materialize_base_times(conn) if num_written else 0
+
+    print(f"Wrote {num_written} new or changed world records to database ({len(rows) - num_written} unchanged).")
+    print(f"Precomputed {num_base_times} base times.")
     conn.close()
 
-def get_wr_pages() -> list[str]:
-    """Get world record pages from Wikipedia."""
-    url = "https://en.wikipedia.org/wiki/Category:World_record_progressions_in_swimming"
-    response = requests.get(url, timeout=10)
-    soup = BeautifulSoup(response.text, "html.parser")
+
+def get_wr_pages(html: str | None = None) -> list[str]:
+    """
+    Get world record pages from Wikipedia.
+
+    Keyword Arguments:
+        html: the already fetched HTML of the category page (fetched if not given)
+
+    """
+    if html is None:
+        html = requests.get(WR_CATEGORY_URL, timeout=10).text
+    soup = BeautifulSoup(html, "html.parser")
     records = soup.find_all("a", title=lambda x: x and "metres" in x and "relay" not in x)
 
     return [f"https://en.wikipedia.org/{record['href']}" for record in records]
 
 
-def get_wrs(url: str) -> list[dict]:
-    """Get world records from a specific page."""
-    response = requests.get(url, timeout=10)
-    soup = BeautifulSoup(response.text, "html.parser")
+def get_wrs(url: str, html: str | None = None) -> list[dict]:
+    """
+    Get world records from a specific page.
+
+    Keyword Arguments:
+        url: the URL of the world record progression page
+        html: the already fetched HTML of the page (fetched if not given)
+
+    """
+    if html is None:
+        html = requests.get(url, timeout=10).text
+    # Only the headings and record tables are needed, so don't build a tree for the rest of the page
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=WR_PAGE_STRAINER)
     records = soup.find_all("table", class_="wikitable")
 
     is_100_im = "100_metres_individual_medley" in url
@@ -100,13 +143,22 @@ def get_wrs(url: str) -> list[dict]:
     num_tables = 2 if is_100_im else 4
 
     # filter out tables for old regulations and cut to only world record tables
-    records = [table for table in records if not table.find_previous("h4") or "old regulations" not in table.find_previous("h4").text.lower()][:num_tables]
+    tables = []
+    for table in records:
+        h4 = table.find_previous("h4")
+        if not h4 or "old regulations" not in h4.text.lower():
+            tables.append(table)
+    tables = tables[:num_tables]
+
+    # The page title is the same for every table
+    event = soup.find("h1").text.strip().replace("World record progression ", "") if tables else ""
 
     rows = []
-    for table in records:
-        sex = table.find_previous("h2").text.strip() if not is_100_im else table.find_previous("h3").text.strip()
-        course = {"Long course": "LCM", "Short course": "SCM", "Short course (25m)": "SCM"}.get(table.find_previous("h3").text.strip() if not is_100_im else table.find_previous("h2").text.strip(), "Unknown Course")
-        event = table.find_previous("h1").text.strip().replace("World record progression ", "")
+    for table in tables:
+        h2_text = table.find_previous("h2").text.strip()
+        h3_text = table.find_previous("h3").text.strip()
+        sex = h2_text if not is_100_im else h3_text
+        course = COURSES.get(h3_text if not is_100_im else h2_text, "Unknown Course")
         stroke = " ".join([word[0].upper() + word[1:] for word in event.split(" ")[2:]])
         distance = event.split(" ")[0]
 
@@ -144,55 +196,6 @@ def get_wrs(url: str) -> list[dict]:
 
             # Missing yd (800 free), [a], [b], [c], [d] (all 200 breast), [A] (400 free), = (equaled previous WR), [2] (Peter Williams 50 free), and * (Bernard 100 free) for circumstances
 
-            if "," in date:
-                month, day, year = date.replace(",", "").split(" ")
-                date = f"{day} {month} {year}"
-            else:
-                day, month, year = date.split(" ")
-
-            month_to_num = {
-                "Jan": "01",
-                "January": "01",
-                "Feb": "02",
-                "February": "02",
-                "Mar": "03",
-                "March": "03",
-                "Apr": "04",
-                "April": "04",
-                "May": "05",
-                "Jun": "06",
-                "June": "06",
-                "Jul": "07",
-                "July": "07",
-                "Aug": "08",
-                "August": "08",
-                "Sep": "09",
-                "September": "09",
-                "Oct": "10",
-                "October": "10",
-                "Nov": "11",
-                "November": "11",
-                "Dec": "12",
-                "December": "12",
-            }
-
-            date_num = int(year) * 10000 + int(month_to_num[month]) * 100 + int(day)
-
-            if len(time) == 0:
-                time_in_seconds = 0
-
-            # TODO: deal with = after the time
-            accurate_time = (time + "0" if time[-2] == "." else time).rstrip("= ")
-            if len(accurate_time) == MINIMUM_TIME_LENGTH:
-                seconds, hundreths = accurate_time.split(".")
-                time_in_seconds = int(seconds) + int(hundreths) / 100
-            elif len(accurate_time) in [MAXIMUM_TIME_LENGTH - 1, MAXIMUM_TIME_LENGTH]:
-                minutes, seconds, hundreths = re.split("[:.]", accurate_time)
-                time_in_seconds = int(minutes) * 60 + int(seconds) + int(hundreths) / 100
-            elif len(time) > 0:
-                msg = f"Unexpected time format: {time} (length: {len(time)})"
-                raise ValueError(msg)
-
             row_data = {
                 "sex": sex,
                 "stroke": stroke,
@@ -212,115 +215,79 @@ def get_wrs(url: str) -> list[dict]:
                 "race_split": race_split,
                 "time_trial": time_trial,
                 "raw_circumstances": circumstance,
-                "date_num": date_num,
-                "time_in_seconds": time_in_seconds,
             }
             rows.append(row_data)
 
+    # Parse the times of the whole page at once
+    times = parse_times([row["time"] for row in rows])
+    for row, time_in_seconds in zip(rows, times.tolist(), strict=True):
+        if math.isnan(time_in_seconds) and row["time"]:
+            msg = f"Unexpected time format: {row['time']} (length: {len(row['time'])})"
+            raise ValueError(msg)
+        date = parse_date(row["date"])
+        if date is None:
+            msg = f"Unexpected date format: {row['date']}"
+            raise ValueError(msg)
+        row["date_num"], row["date"] = date
+        row["time_in_seconds"] = 0 if math.isnan(time_in_seconds) else time_in_seconds
+
     return rows
 
 
-def update_db() -> None:
-    """Get world records."""
-    print("Fetching world records...\n")
-    start = time.time()
+def parse_wr_pages(pages: dict[str, str], max_workers: int | None = None) -> list[dict]:
+    """
+    Get world records from already fetched pages, parsing the pages in parallel processes.
 
-    wr_pages = get_wr_pages()
-    wrs = []
-    for url in wr_pages:  # Limit to first two pages for testing
-        url_start_len = len("https://en.wikipedia.org//wiki/World_record_progression_")
-        print(f"Fetching records for {" ".join(url[url_start_len:].split('_')).replace('metres', 'meter')}...")
-        wrs.extend(get_wrs(url))
+    Keyword Arguments:
+        pages: the HTML of each world record progression page by URL
+        max_workers: the maximum number of processes to use (defaults to the number of CPUs)
 
-    end = time.time()
-    print(f"\nFetched {len(wrs)} world records in {end - start:.2f} seconds.")
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        page_rows = pool.map(_get_wrs_from_page, pages.items())
+        return [row for rows in page_rows for row in rows]
 
-    add_to_db(wrs)
 
+def _get_wrs_from_page(page: tuple[str, str]) -> list[dict]:
+    """Get world records from a (URL, HTML) pair, so pages can be mapped over a process pool."""
+    url, html = page
+    return get_wrs(url, html)
 
-def wr_counts_by_year() -> None:
-    """Get world record counts by year."""
-    conn = sqlite3.connect("swimming.db")
-    cursor = conn.cursor()
 
-    wr_counts = []
-    for year in range(2000, 2025):
-        cursor.execute(f"""SELECT
-                        COUNT(*)
-                        FROM world_records
-                        WHERE
-                            date_num >= {year}0101 AND
-                            date_num <= {year}1231 AND
-                        course = 'LCM'""")
-        count = cursor.fetchone()[0]
-        wr_counts.append(count)
+def update_db(*, force: bool = False) -> None:
+    """
+    Get world records.
 
-    for count in wr_counts:
-        print(count)
+    Keyword Arguments:
+        force: rebuild the database even if no world record page changed since the last update
 
-    conn.close()
+    """
+    print("Fetching world records...\n")
+    start = time.time()
 
-    # plot results
-    start_year = 2000
-    end_year = 2024
-    x_data = range(start_year, end_year + 1)
-    y_data = wr_counts
-    plt.plot(x_data, y_data)
-    plt.xlabel("Year")
-    plt.ylabel("World Record Count")
-    plt.title(f"LCM World Record Counts ({start_year}-{end_year})")
-    plt.show()
-
-@cache
-def get_base_times_from_db(year: int, course: str) -> dict[str, float]:
-    """Get base times for each event for a given year."""
-    conn = sqlite3.connect("swimming.db")
-    cursor = conn.cursor()
-
-    if course not in ["LCM", "SCM"]:
-        msg = f"Unexpected course: {course}"
-        raise ValueError(msg)
-
-    month = "08"
-    adjusted_year = year
-    if course == "LCM":
-        month = "12"
-        adjusted_year -= 1
-
-    today = datetime.datetime.now(tz=datetime.UTC).date()
-    if today.year * 10000 + today.month * 100 + today.day < adjusted_year * 10000 + int(month) * 100 + 31:
-        msg = f"The {year} {course} base times are not available yet. They will be available after {adjusted_year}-{month}-31."
-        raise ValueError(msg)
-
-    valid_start = f"{(int(month) + 1) % 12:02}-01-{adjusted_year + (course == 'LCM')}"
-    valid_end = f"{month}-31-{adjusted_year + 1}"
-    print(f"Fetching {year} {course} base times... (valid from {valid_start} to {valid_end})")
-
-    base_times = {}
-    cursor.execute(f"""SELECT
-                    sex,
-                    stroke,
-                    distance,
-                    MIN(time_in_seconds)
-                    FROM world_records
-                    WHERE
-                        date_num <= {adjusted_year}{month}31 AND
-                    course = '{course}'
-                    GROUP BY sex, stroke, distance""")
-    results = cursor.fetchall()
-    for sex, stroke, distance, time_in_seconds in results:
-        event = f"{sex}'s {distance}m {stroke}"
-        base_times[event] = time_in_seconds
+    with PageFetcher() as fetcher:
+        category_html, category_changed = fetcher.fetch(WR_CATEGORY_URL)
+        wr_pages = get_wr_pages(category_html)
+        pages, changed_pages = fetcher.fetch_all(wr_pages)
 
-    conn.close()
-    return base_times
+    print(f"Fetched {len(wr_pages)} world record pages ({len(changed_pages)} changed) in {time.time() - start:.2f} seconds.")
+    if not force and not category_changed and not changed_pages:
+        print("World records are already up to date.")
+        return
+
+    wrs = parse_wr_pages(pages)
+
+    end = time.time()
+    print(f"\nFetched {len(wrs)} world records in {end - start:.2f} seconds.")
+
+    add_to_db(wrs)
 
 
 def main() -> None:
     """Control flow of program."""
     # update_db()
 
-    # wr_counts_by_year()
+    # World record counts and progression charts are in wr_analytics.py
 
     get_base_times_from_db(2024, "SCM")
 
@@ -0,0 +1,117 @@
+"""Shared fixtures, including a local HTTP server that stands in for the websites pages are fetched from."""
+
+import threading
+import time
+from collections.abc import Iterator
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+FIXTURES_DIR = Path(__file__).parent.resolve() / "fixtures"
+
+
+class LocalSite:
+    """
+    Serves saved pages over HTTP, answering conditional requests the way a real server would.
+
+    A page is served with its ETag and Last-Modified headers if it has them, and a request whose If-None-Match or
+    If-Modified-Since header still matches gets a 304 with no body. Every request is recorded as (path, status), and
+    each one can be held for a delay to see how many are in flight at once.
+    """
+
+    def __init__(self) -> None:
+        """Start the server on a free local port."""
+        self.pages: dict[str, dict] = {}
+        self.requests: list[tuple[str, int]] = []
+        self.delay = 0.0 # Seconds to hold each request before answering it
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 (http.server dispatches requests to this name)
+                site.handle(self)
+
+            def log_message(self, *_: object) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+
+    def url(self, path: str) -> str:
+        """Get the URL a path is served at."""
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
+
+
+    def add_page(self, path: str, body: str, etag: str | None = None, last_modified: str | None = None) -> str:
+        """
+        Serve a page at a path, replacing any page already there, and return its URL.
+
+        Keyword Arguments:
+            path: the path to serve the page at, e.g. "/schedule"
+            body: the HTML of the page
+            etag: the ETag header to send with the page
+            last_modified: the Last-Modified header to send with the page
+
+        """
+        with self._lock:
+            self.pages[path] = {"body": body.encode(), "etag": etag, "last_modified": last_modified}
+        return self.url(path)
+
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        """Answer a GET request with the page at its path, a 304 if it hasn't changed, or a 404."""
+        with self._lock:
+            page = self.pages.get(request.path)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        time.sleep(self.delay)
+
+        if page is None:
+            status = HTTPStatus.NOT_FOUND
+        elif (page["etag"] and request.headers.get("If-None-Match") == page["etag"]) or (
+            page["last_modified"] and request.headers.get("If-Modified-Since") == page["last_modified"]
+        ):
+            status = HTTPStatus.NOT_MODIFIED
+        else:
+            status = HTTPStatus.OK
+
+        with self._lock:
+            self.requests.append((request.path, status))
+            self.in_flight -= 1
+
+        request.send_response(status)
+        if status == HTTPStatus.OK:
+            if page["etag"]:
+                request.send_header("ETag", page["etag"])
+            if page["last_modified"]:
+                request.send_header("Last-Modified", page["last_modified"])
+            request.send_header("Content-Type", "text/html; charset=utf-8")
+            request.send_header("Content-Length", str(len(page["body"])))
+            request.end_headers()
+            request.wfile.write(page["body"])
+        else:
+            request.send_header("Content-Length", "0")
+            request.end_headers()
+
+
+    def close(self) -> None:
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+@pytest.fixture
+def local_site() -> Iterator[LocalSite]:
+    """Get a local HTTP server to serve saved pages from."""
+    site = LocalSite()
+    yield site
+    site.close()
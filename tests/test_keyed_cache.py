@@ -0,0 +1,110 @@
+"""Tests for the least recently used order, copies, memory-only mode and separate tables of the keyed caches."""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import keyed_cache
+from pipeline import StageCache
+from solvers.result_cache import SolveCache
+
+
+def _last_used(path: Path) -> dict[str, int]:
+    """Get the last use counter of every result in a cache database."""
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute("SELECT key, last_used FROM solve_results").fetchall())
+    finally:
+        conn.close()
+
+
+def test_memory_hits_keep_results_on_disk(tmp_path: Path) -> None:
+    """A result only ever used from memory counts as recently used when results are evicted from disk."""
+    path = tmp_path / "solve_cache.db"
+    cache = SolveCache(path, max_entries=3)
+    for key in ("a", "b", "c"):
+        cache.put(key, {"key": key})
+    for _ in range(5):
+        assert cache.get("a") == {"key": "a"}
+
+    cache.put("d", {"key": "d"})
+
+    assert sorted(_last_used(path)) == ["a", "c", "d"]
+    other_process = SolveCache(path, max_entries=3)
+    assert other_process.get("a") == {"key": "a"}
+    assert other_process.get("b") is None
+
+
+def test_memory_hits_are_written_in_batches(tmp_path: Path) -> None:
+    """Uses from memory reach the disk once a batch of them has built up, without waiting for a put."""
+    path = tmp_path / "solve_cache.db"
+    cache = SolveCache(path)
+    cache.put("a", {"key": "a"})
+    cache.put("b", {"key": "b"})
+    before = _last_used(path)
+
+    for _ in range(keyed_cache.USE_FLUSH_BATCH - 1):
+        cache.get("a")
+    assert _last_used(path) == before
+
+    cache.get("a")
+    after = _last_used(path)
+    assert after["a"] > after["b"] == before["b"]
+
+
+def test_get_returns_copies(tmp_path: Path) -> None:
+    """Changing a result that was stored or got doesn't change what the cache returns next."""
+    cache = SolveCache(tmp_path / "solve_cache.db")
+    result = {"solution_values": [1.0, 0.0], "objective_value": 3.0}
+    cache.put("a", result)
+    result["solution_values"].append(2.0)
+
+    got = cache.get("a")
+    got["solution_values"][0] = 0.0
+    got["objective_value"] = 0
+
+    assert cache.get("a") == {"solution_values": [1.0, 0.0], "objective_value": 3.0}
+    assert cache.get("a") is not cache.get("a")
+
+
+def test_memory_only_cache_never_touches_disk(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without a database path, results are kept and evicted in memory without ever connecting to a database."""
+    monkeypatch.chdir(tmp_path)
+
+    def no_database(*_: object, **__: object) -> None:
+        pytest.fail("The memory-only cache connected to a database")
+
+    monkeypatch.setattr(keyed_cache.sqlite3, "connect", no_database)
+    cache = SolveCache(None, max_memory_entries=2)
+    assert cache.get("a") is None
+    for key in ("a", "b", "c"):
+        cache.put(key, {"key": key})
+    for _ in range(keyed_cache.USE_FLUSH_BATCH):
+        assert cache.get("c") == {"key": "c"}
+
+    assert cache.get("a") is None
+    assert cache.get("b") == {"key": "b"}
+    assert (cache.hits, cache.misses) == (keyed_cache.USE_FLUSH_BATCH + 1, 2)
+    cache.clear()
+    assert cache.get("b") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stage_and_solve_results_are_kept_apart(tmp_path: Path) -> None:
+    """A stage cache and a solve cache sharing a database keep their results in their own tables."""
+    path = tmp_path / "cache.db"
+    stage_cache = StageCache(path)
+    solve_cache = SolveCache(path)
+    stage_cache.put("a", {"lines": ["stage"]})
+
+    assert solve_cache.get("a") is None
+    solve_cache.put("a", {"objective_value": 1.0})
+    assert StageCache(path).get("a") == {"lines": ["stage"]}
+    assert SolveCache(path).get("a") == {"objective_value": 1.0}
+    conn = sqlite3.connect(path)
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        conn.close()
+    assert tables == {"stage_results", "solve_results"}
@@ -0,0 +1,78 @@
+"""Tests for rerunning pipeline stages when a psych sheet can't be read while it is being replaced."""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+import pipeline as pipeline_module
+from data_parser import PsychSheetError
+from meet import PSYCH_SHEETS_DIR, Meet
+from pipeline import Pipeline
+from schedule_store import ScheduleStore
+
+MEET_NAME = "2024 SCM Worlds"
+
+
+@pytest.fixture
+def psych_sheet(tmp_path: Path) -> Path:
+    """Copy the meet's psych sheet into a directory the test can replace it in."""
+    path = tmp_path / f"{MEET_NAME.lower().replace(' ', '-')}-psych-sheet.pdf"
+    shutil.copyfile(PSYCH_SHEETS_DIR / path.name, path)
+    return path
+
+
+@pytest.fixture
+def loaded_pipeline(psych_sheet: Path) -> Pipeline:
+    """Get a pipeline that has run every stage once for the copied psych sheet."""
+    pipeline = Pipeline(Meet(MEET_NAME, ScheduleStore(), psych_sheets_dir=psych_sheet.parent))
+    pipeline.run()
+    return pipeline
+
+
+@pytest.mark.parametrize("fraction", [0, 0.5, 0.99])
+def test_partly_written_psych_sheet_keeps_previous_state(loaded_pipeline: Pipeline, psych_sheet: Path, fraction: float, capsys: pytest.CaptureFixture) -> None:
+    """A psych sheet that is only partly written doesn't rerun anything, and the previous swimmers and key are kept."""
+    full = psych_sheet.read_bytes()
+    keys = dict(loaded_pipeline.keys)
+    data = loaded_pipeline.parser.data
+    num_entries = data.num_entries
+
+    psych_sheet.write_bytes(full[:int(len(full) * fraction)])
+    assert loaded_pipeline.run() == {}
+    assert loaded_pipeline.keys == keys
+    assert loaded_pipeline.parser.data is data
+    assert data.num_entries == num_entries
+    assert "Keeping the previous psych sheet" in capsys.readouterr().out
+
+    # Once the psych sheet is whole again it's the one the stages already ran with
+    psych_sheet.write_bytes(full)
+    assert loaded_pipeline.run() == {}
+
+
+def test_watch_keeps_running_while_psych_sheet_is_replaced(loaded_pipeline: Pipeline, psych_sheet: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """The watch loop keeps polling through unreadable psych sheets instead of stopping on the read error."""
+    full = psych_sheet.read_bytes()
+    writes = [full[:100], full[:len(full) // 2], full]
+
+    def replace_psych_sheet(_interval: float) -> None:
+        if not writes:
+            raise KeyboardInterrupt
+        psych_sheet.write_bytes(writes.pop(0))
+
+    monkeypatch.setattr(pipeline_module.time, "sleep", replace_psych_sheet)
+    changes = []
+    with pytest.raises(KeyboardInterrupt):
+        loaded_pipeline.watch(changes.append, interval=0)
+
+    assert writes == []
+    assert changes == []
+
+
+def test_unreadable_psych_sheet_on_first_run_raises(psych_sheet: Path) -> None:
+    """With no previous psych sheet to keep, the first run raises the read error."""
+    psych_sheet.write_bytes(b"")
+    pipeline = Pipeline(Meet(MEET_NAME, ScheduleStore(), psych_sheets_dir=psych_sheet.parent))
+
+    with pytest.raises(PsychSheetError):
+        pipeline.run()
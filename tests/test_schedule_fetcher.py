@@ -0,0 +1,83 @@
+"""
+Tests for fetching schedules, against saved schedule pages served by a local HTTP server.
+
+The saved pages in fixtures/schedules are rebuilt from the cached 2024 SCM Worlds schedule with the markup of the
+live page: 2024-scm-worlds.html has the schedule in its HTML, 2024-scm-worlds-shell.html only renders it with
+JavaScript, and 2024-scm-worlds-rendered.json is the text of each day as the browser fallback reads it.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+from conftest import FIXTURES_DIR, LocalSite
+
+import schedule_fetcher
+from schedule_fetcher import fetch_schedule, parse_schedule_chunks, prefetch_schedules
+from schedule_store import CACHE_FILE_PATH, ScheduleStore
+from utils import constants
+
+MEET_NAME = "2024 SCM Worlds"
+SCHEDULE_FIXTURES_DIR = FIXTURES_DIR / "schedules"
+
+
+@pytest.fixture
+def stored_schedule() -> dict[int, list]:
+    """Get the schedule stored for the meet, as ScheduleStore.get returns it."""
+    return ScheduleStore(CACHE_FILE_PATH).get(MEET_NAME)
+
+
+@pytest.fixture
+def rendered_chunks() -> list[str]:
+    """Get the text of each day of the schedule as the browser fallback reads it."""
+    return json.loads((SCHEDULE_FIXTURES_DIR / "2024-scm-worlds-rendered.json").read_text(encoding="utf-8"))
+
+
+def _serve(local_site: LocalSite, fixture_name: str) -> str:
+    """Serve a saved schedule page and return its URL."""
+    html = (SCHEDULE_FIXTURES_DIR / fixture_name).read_text(encoding="utf-8")
+    return local_site.add_page(f"/{fixture_name}", html)
+
+
+def test_html_matches_rendered_text(rendered_chunks: list[str]) -> None:
+    """The text parsed from the page HTML is the same as the text the browser fallback reads."""
+    html = (SCHEDULE_FIXTURES_DIR / "2024-scm-worlds.html").read_text(encoding="utf-8")
+    assert parse_schedule_chunks(html) == rendered_chunks
+
+
+def test_fetch_schedule_over_http(local_site: LocalSite, stored_schedule: dict[int, list], monkeypatch: pytest.MonkeyPatch) -> None:
+    """A page with the schedule in its HTML gives the stored schedule without starting a browser."""
+    def no_browser(schedule_url: str) -> list[str]:
+        pytest.fail(f"Browser fallback used for {schedule_url}")
+
+    monkeypatch.setattr(schedule_fetcher, "_get_rendered_schedule_chunks", no_browser)
+    url = _serve(local_site, "2024-scm-worlds.html")
+
+    assert json.loads(json.dumps(fetch_schedule(url))) == json.loads(json.dumps(stored_schedule))
+
+
+def test_fetch_schedule_falls_back_to_browser(local_site: LocalSite, stored_schedule: dict[int, list], rendered_chunks: list[str], monkeypatch: pytest.MonkeyPatch) -> None:
+    """A page that only renders the schedule with JavaScript is read in the browser, and gives the same schedule."""
+    rendered_urls = []
+
+    def render(schedule_url: str) -> list[str]:
+        rendered_urls.append(schedule_url)
+        return rendered_chunks
+
+    monkeypatch.setattr(schedule_fetcher, "_get_rendered_schedule_chunks", render)
+    url = _serve(local_site, "2024-scm-worlds-shell.html")
+
+    assert json.loads(json.dumps(fetch_schedule(url))) == json.loads(json.dumps(stored_schedule))
+    assert rendered_urls == [url]
+
+
+def test_prefetch_schedules(local_site: LocalSite, stored_schedule: dict[int, list], tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Prefetching adds missing schedules to the store, and fetches nothing once they're all stored."""
+    monkeypatch.setitem(constants.SCHEDULE_URLS, MEET_NAME, _serve(local_site, "2024-scm-worlds.html"))
+    store = ScheduleStore(tmp_path / "cached_data.json")
+
+    assert prefetch_schedules([MEET_NAME], store) == [MEET_NAME]
+    assert store.get(MEET_NAME) == stored_schedule
+
+    assert prefetch_schedules([MEET_NAME], store) == []
+    assert len(local_site.requests) == 1
@@ -0,0 +1,85 @@
+"""Tests for writing the schedule store's cache file."""
+
+import json
+import stat
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import schedule_store
+from schedule_store import CACHE_FILE_PATH, ScheduleStore
+from utils.constants import SCHEDULE_URLS
+
+MEET_NAME = "2024 SCM Worlds"
+NUM_PUTS = 20 # Schedules each process stores, one after another
+
+
+@pytest.fixture
+def cache_path(tmp_path: Path) -> Path:
+    """Copy the cache file into a directory the test can write to."""
+    path = tmp_path / CACHE_FILE_PATH.name
+    path.write_bytes(CACHE_FILE_PATH.read_bytes())
+    return path
+
+
+def _changed_schedule() -> dict[int, list]:
+    """Get the meet's stored schedule with one more event on the first day."""
+    schedule = ScheduleStore(CACHE_FILE_PATH).get(MEET_NAME)
+    schedule[1] = [*schedule[1], ["Mixed 4x50m Freestyle Relay", "Finals"]]
+    return schedule
+
+
+@pytest.mark.parametrize("mode", [0o644, 0o664, 0o600])
+def test_write_keeps_file_mode(cache_path: Path, mode: int) -> None:
+    """Replacing the cache file keeps the permissions it had, instead of those of the temporary file."""
+    cache_path.chmod(mode)
+    ScheduleStore(cache_path).put(MEET_NAME, _changed_schedule())
+
+    assert stat.S_IMODE(cache_path.stat().st_mode) == mode
+    assert ScheduleStore(cache_path).get(MEET_NAME) == _changed_schedule()
+
+
+def test_new_file_is_readable_by_others(tmp_path: Path) -> None:
+    """A cache file that didn't exist yet gets the permissions a normally created file would."""
+    cache_path = tmp_path / CACHE_FILE_PATH.name
+    ScheduleStore(cache_path).put(MEET_NAME, _changed_schedule())
+
+    assert stat.S_IMODE(cache_path.stat().st_mode) == schedule_store.NEW_FILE_MODE
+
+
+def test_failed_write_leaves_no_temporary_file(cache_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A write that fails partway removes its temporary file and leaves the cache file as it was."""
+    original = cache_path.read_bytes()
+
+    def fail_partway(data: dict, file: object, **_: object) -> None:
+        file.write(json.dumps(data)[:100])
+        msg = "No space left on device"
+        raise OSError(msg)
+
+    monkeypatch.setattr(schedule_store.json, "dump", fail_partway)
+    with pytest.raises(OSError, match="No space left"):
+        ScheduleStore(cache_path).put(MEET_NAME, _changed_schedule())
+
+    assert cache_path.read_bytes() == original
+    assert list(cache_path.parent.glob("*.tmp")) == []
+
+
+def _put_schedules(path: Path, meet_name: str) -> None:
+    """Store a new schedule for a meet NUM_PUTS times, like a backtest worker fetching it again and again."""
+    store = ScheduleStore(path)
+    for number in range(NUM_PUTS):
+        store.put(meet_name, {1: [[f"Event {number}", "Finals"]]})
+
+
+def test_concurrent_processes_keep_each_others_schedules(tmp_path: Path) -> None:
+    """Processes storing different meets' schedules at the same time don't overwrite each other's."""
+    cache_path = tmp_path / CACHE_FILE_PATH.name
+    meet_names = list(SCHEDULE_URLS)
+    with ProcessPoolExecutor(max_workers=len(meet_names)) as pool:
+        for future in [pool.submit(_put_schedules, cache_path, meet_name) for meet_name in meet_names]:
+            future.result()
+
+    store = ScheduleStore(cache_path)
+    for meet_name in meet_names:
+        assert store.get(meet_name) == {1: [[f"Event {NUM_PUTS - 1}", "Finals"]]}, meet_name
@@ -0,0 +1,76 @@
+"""Tests for loading meets in the optimization server."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import server
+
+LOAD_TIMEOUT = 5 # Seconds to wait for a load before failing the test
+
+
+@pytest.fixture
+def slow_parse(monkeypatch: pytest.MonkeyPatch) -> dict:
+    """Replace meet parsing with one that waits until the test releases it, and count how often each meet is parsed."""
+    state = {"started": threading.Event(), "release": threading.Event(), "calls": {}}
+
+    def parse_meet(meet_name: str) -> object:
+        state["calls"][meet_name] = state["calls"].get(meet_name, 0) + 1
+        state["started"].set()
+        assert state["release"].wait(LOAD_TIMEOUT)
+        return object()
+
+    monkeypatch.setattr(server, "_parse_meet", parse_meet)
+    monkeypatch.setattr(server, "loaded_meets", {})
+    monkeypatch.setattr(server, "loading_meets", {})
+    return state
+
+
+def test_loaded_meet_does_not_wait_for_another_meets_cold_load(slow_parse: dict) -> None:
+    """A loaded meet is served while a different meet is still being parsed."""
+    warm = object()
+    server.loaded_meets["2024 SCM Worlds"] = warm
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        cold = pool.submit(server.load_meet, "2025 LCM Worlds")
+        assert slow_parse["started"].wait(LOAD_TIMEOUT)
+
+        # The cold load is still running, but the loaded meet is returned straight away
+        assert server.load_meet("2024 SCM Worlds") is warm
+
+        slow_parse["release"].set()
+        cold.result(LOAD_TIMEOUT)
+
+
+def test_same_meet_is_parsed_once_for_concurrent_requests(slow_parse: dict) -> None:
+    """Requests for a meet that is being parsed wait for that parse instead of starting their own."""
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        first = pool.submit(server.load_meet, "2025 LCM Worlds")
+        assert slow_parse["started"].wait(LOAD_TIMEOUT)
+        waiting = [pool.submit(server.load_meet, "2025 LCM Worlds") for _ in range(3)]
+
+        slow_parse["release"].set()
+        parser = first.result(LOAD_TIMEOUT)
+        assert all(future.result(LOAD_TIMEOUT) is parser for future in waiting)
+
+    assert slow_parse["calls"] == {"2025 LCM Worlds": 1}
+    assert server.loading_meets == {}
+
+
+def test_failed_load_is_retried_by_the_next_request(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A meet that failed to load isn't remembered as loading, so the next request parses it again."""
+    def fail_parse(meet_name: str) -> object:
+        msg = f"No psych sheet for {meet_name}"
+        raise OSError(msg)
+
+    monkeypatch.setattr(server, "loaded_meets", {})
+    monkeypatch.setattr(server, "loading_meets", {})
+    monkeypatch.setattr(server, "_parse_meet", fail_parse)
+
+    with pytest.raises(OSError, match="No psych sheet"):
+        server.load_meet("2025 LCM Worlds")
+
+    parser = object()
+    monkeypatch.setattr(server, "_parse_meet", lambda _: parser)
+    assert server.load_meet("2025 LCM Worlds") is parser
@@ -0,0 +1,137 @@
+"""Tests that a single day session gives the same lineups as solving each what-if from scratch."""
+
+import contextlib
+import io
+
+import pytest
+
+from data_parser import DataParser
+from meet import Meet
+from meet_data import MeetData
+from schedule_store import ScheduleStore
+from solvers import SingleDaySession, SingleDaySolver
+from swimmer import Swimmer
+from synthetic_meet import generate_meet
+
+MEET_NAME = "2024 SCM Worlds"
+
+
+@pytest.fixture(scope="module")
+def parser() -> DataParser:
+    """Get the meet's data, with its swimmers seeded and scored."""
+    parser = DataParser(Meet(MEET_NAME, ScheduleStore()))
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.load_concurrently()
+        parser.update_seeds()
+        parser.update_projected_points()
+    return parser
+
+
+class WhatIfs:
+    """The what-ifs applied to a session so far, which can be solved from scratch with a new SingleDaySolver."""
+
+    def __init__(self, data: MeetData, day: int) -> None:
+        """Start with no what-ifs."""
+        self.data = data
+        self.day = day
+        self.excluded_swimmers: list[str] = []
+        self.excluded_entries: list[tuple[str, str]] = []
+        self.forbidden_lineups: list[tuple[list[Swimmer], Swimmer]] = []
+
+
+    def solve_from_scratch(self) -> int:
+        """Get the best total score with the what-ifs, from a new solver on the meet data with them applied."""
+        self.data.set_swimmers_excluded(self.excluded_swimmers, excluded=True)
+        self.data.set_entries_excluded(self.excluded_entries, excluded=True)
+        try:
+            solver = SingleDaySolver(self.data, self.day)
+            for lineup, captain in self.forbidden_lineups:
+                solver.exclude_lineup(lineup, captain)
+            with contextlib.redirect_stdout(io.StringIO()):
+                _, _, total_score = solver.solve()
+        finally:
+            self.data.set_swimmers_excluded(self.excluded_swimmers, excluded=False)
+            self.data.set_entries_excluded(self.excluded_entries, excluded=False)
+        return total_score
+
+
+    def check(self, session: SingleDaySession) -> tuple[list[Swimmer], Swimmer]:
+        """Check the session's lineup respects the what-ifs and scores the same as solving from scratch, returning it."""
+        lineup, captain, total_score = session.solve()
+        assert total_score == self.solve_from_scratch()
+        assert not {swimmer.name for swimmer in lineup} & set(self.excluded_swimmers)
+        assert captain in lineup
+        forbidden = [({swimmer.name for swimmer in forbidden_lineup}, forbidden_captain.name) for forbidden_lineup, forbidden_captain in self.forbidden_lineups]
+        assert ({swimmer.name for swimmer in lineup}, captain.name) not in forbidden
+        return lineup, captain
+
+
+def _day_entries(data: MeetData, swimmer: Swimmer, day: int) -> list[tuple[str, str]]:
+    """Get the (swimmer name, event) of a swimmer's entries that score on a day."""
+    return [(swimmer.name, event) for event in swimmer.entries if day in data.meet.event_days.get(event, ())]
+
+
+@pytest.mark.parametrize("day", [1, 3])
+def test_session_matches_solver_after_each_what_if(parser: DataParser, day: int) -> None:
+    """After each exclusion and inclusion, the session scores the same as a new SingleDaySolver."""
+    data = parser.data
+    session = SingleDaySession(data, day)
+    what_ifs = WhatIfs(data, day)
+    lineup, captain = what_ifs.check(session)
+
+    top_swimmers = sorted(lineup, key=lambda swimmer: -swimmer.projected_points[day - 1])[:2]
+    what_ifs.excluded_swimmers = [swimmer.name for swimmer in top_swimmers]
+    assert session.exclude_swimmers(what_ifs.excluded_swimmers) == []
+    lineup, captain = what_ifs.check(session)
+
+    assert session.include_swimmers(what_ifs.excluded_swimmers[:1]) == []
+    what_ifs.excluded_swimmers = what_ifs.excluded_swimmers[1:]
+    lineup, captain = what_ifs.check(session)
+
+    for _ in range(2):
+        session.exclude_lineup(lineup, captain)
+        what_ifs.forbidden_lineups.append((lineup, captain))
+        lineup, captain = what_ifs.check(session)
+
+    what_ifs.excluded_entries = _day_entries(data, captain, day)
+    assert what_ifs.excluded_entries
+    assert session.exclude_entries(what_ifs.excluded_entries) == []
+    lineup, captain = what_ifs.check(session)
+
+    assert session.include_entries(what_ifs.excluded_entries) == []
+    what_ifs.excluded_entries = []
+    forbidden_lineup, forbidden_captain = what_ifs.forbidden_lineups.pop(0)
+    session.include_lineup(forbidden_lineup, forbidden_captain)
+    what_ifs.check(session)
+
+
+def test_rebuilt_session_keeps_forbidden_lineups() -> None:
+    """When swimmers are added to the meet the model is rebuilt, and the lineups forbidden before it stay forbidden."""
+    parser = generate_meet(60, 2, seed=3)
+    data = parser.data
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.update_seeds()
+        parser.update_projected_points()
+
+    session = SingleDaySession(data, 1)
+    what_ifs = WhatIfs(data, 1)
+    lineup, captain = what_ifs.check(session)
+    session.exclude_lineup(lineup, captain)
+    what_ifs.forbidden_lineups.append((lineup, captain))
+    lineup, captain = what_ifs.check(session)
+    # An excluded lineup that was included again is kept in the rebuilt model, but still allowed
+    session.exclude_lineup(lineup, captain)
+    session.include_lineup(lineup, captain)
+
+    # A cheap swimmer entered in a day 1 event, so the rebuilt model has one more swimmer to choose from
+    event = next(event for event, days in data.meet.event_days.items() if 1 in days and event.startswith("Women"))
+    swimmer = data.add_swimmer("SWIMMER ADDED", "AUS", None, None)
+    swimmer.sex = "Female"
+    swimmer.add_entry(event, data.meet.base_times[event] * 1.01)
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.update_seeds()
+        parser.update_projected_points()
+
+    num_swimmers = len(session.swimmer_ids)
+    what_ifs.check(session)
+    assert len(session.swimmer_ids) == num_swimmers + 1
@@ -0,0 +1,168 @@
+"""
+Tests for solve jobs: the events they stream, cancelling them, failing, and sharing the solver's cache.
+
+Streaming and cancelling use synthetic meets solved over every day, which are big enough that CP-SAT finds several
+improving lineups, and takes seconds to prove the last one optimal, so a job can be cancelled in the middle of it.
+"""
+
+import asyncio
+import contextlib
+import io
+from pathlib import Path
+
+import pytest
+
+from data_parser import DataParser
+from meet import Meet
+from schedule_store import ScheduleStore
+from solvers import FullMeetSolver, SingleDaySolver, SolveCache, SolveError, SolveJob
+from synthetic_meet import generate_meet
+
+MEET_NAME = "2024 SCM Worlds"
+NUM_DAYS = 6
+SWITCHES = 5
+STREAMED_SWIMMERS = 150 # Solved in a couple of seconds, with several incumbents on the way
+CANCELLED_SWIMMERS = 500 # Takes seconds to prove optimal after its first incumbent, so it can be cancelled in between
+
+
+@pytest.fixture(scope="module")
+def parser() -> DataParser:
+    """Get the meet's data, with its swimmers seeded and scored."""
+    parser = DataParser(Meet(MEET_NAME, ScheduleStore()))
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.load_concurrently()
+        parser.update_seeds()
+        parser.update_projected_points()
+    return parser
+
+
+def _generate_full_meet_solver(num_swimmers: int, **kwargs: object) -> FullMeetSolver:
+    """Get a solver for every day of a synthetic meet, with its swimmers seeded and scored."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser = generate_meet(num_swimmers, NUM_DAYS, **kwargs)
+        parser.update_seeds()
+        parser.update_projected_points()
+    return FullMeetSolver(parser.data, SWITCHES, 1, NUM_DAYS)
+
+
+async def _collect_events(job: SolveJob) -> list[dict]:
+    """Get every event of a job up to and including the done event."""
+    return [event async for event in job.events()]
+
+
+def _run_job(solver: SingleDaySolver | FullMeetSolver) -> tuple[SolveJob, tuple | dict | None]:
+    """Run a job for a solver to the end, returning it and its solution."""
+    async def run() -> tuple[SolveJob, tuple | dict | None]:
+        job = SolveJob(solver).start()
+        return job, await job.result()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("create_solver", [
+    lambda data, cache: SingleDaySolver(data, 1, cache),
+    lambda data, cache: FullMeetSolver(data, 1, 1, 2, cache),
+])
+def test_job_and_solve_share_cache(parser: DataParser, tmp_path: Path, create_solver: object) -> None:
+    """A job stores its optimal solution where solve looks for it, and a later job finds what solve stored."""
+    cache = SolveCache(tmp_path / "solve_cache.db")
+
+    job, job_solution = _run_job(create_solver(parser.data, cache))
+    assert job.status == "optimal"
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        solution = create_solver(parser.data, cache).solve()
+    assert solution == job_solution
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        solution = create_solver(parser.data, cache).solve()
+    job, cached_solution = _run_job(create_solver(parser.data, cache))
+    assert job.status == "optimal"
+    assert cached_solution == solution
+    assert cache.hits == 2
+
+
+def test_events_stream_improving_incumbents_then_done() -> None:
+    """A job streams incumbents whose objective only ever improves, and then a done event with the last of them."""
+    async def run() -> tuple[SolveJob, list[dict], dict]:
+        job = SolveJob(_generate_full_meet_solver(STREAMED_SWIMMERS)).start()
+        events = await _collect_events(job)
+        return job, events, await job.result()
+
+    job, events, solution = asyncio.run(run())
+    incumbents = [event for event in events if event["kind"] == "incumbent"]
+    assert incumbents
+    assert {event["kind"] for event in events} <= {"incumbent", "bound", "done"}
+    assert [event["kind"] for event in events].index("done") == len(events) - 1
+
+    objective_values = [event["objective_value"] for event in incumbents]
+    assert objective_values == sorted(objective_values)
+    assert all(event["objective_value"] <= event["best_bound"] for event in incumbents)
+    wall_times = [event["wall_time"] for event in events]
+    assert wall_times == sorted(wall_times)
+
+    assert job.status == events[-1]["status"] == "optimal"
+    assert events[-1]["solution"] is solution
+    assert solution == incumbents[-1]["solution"]
+    assert solution["Grand Total"]["total_points"] == pytest.approx(objective_values[-1])
+
+
+def test_cancel_returns_best_solution_so_far() -> None:
+    """Cancelling a job once it has an incumbent stops the search and returns that incumbent."""
+    async def run() -> tuple[SolveJob, list[dict], dict]:
+        job = SolveJob(_generate_full_meet_solver(CANCELLED_SWIMMERS)).start()
+        events = []
+        async for event in job.events():
+            events.append(event)
+            if event["kind"] == "incumbent":
+                job.cancel()
+        return job, events, await job.result()
+
+    job, events, solution = asyncio.run(run())
+    incumbents = [event for event in events if event["kind"] == "incumbent"]
+    assert job.status == events[-1]["status"] == "cancelled"
+    assert solution is not None
+    assert solution == incumbents[-1]["solution"]
+
+
+def test_cancelled_result_cancels_job() -> None:
+    """Cancelling the coroutine waiting on a job's result cancels the job, which ends with its best incumbent."""
+    async def run() -> tuple[SolveJob, list[dict]]:
+        job = SolveJob(_generate_full_meet_solver(CANCELLED_SWIMMERS)).start()
+        waiter = asyncio.create_task(job.result())
+        events = []
+        async for event in job.events():
+            events.append(event)
+            if event["kind"] == "incumbent" and not waiter.done():
+                waiter.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await waiter
+        return job, events
+
+    job, events = asyncio.run(run())
+    incumbents = [event for event in events if event["kind"] == "incumbent"]
+    assert job.status == events[-1]["status"] == "cancelled"
+    assert events[-1]["solution"] is not None
+    assert events[-1]["solution"] == incumbents[-1]["solution"]
+    assert job.best_event == {key: value for key, value in events[-1].items() if key != "wall_time"}
+
+
+def test_failed_solve_reports_failure_and_raises() -> None:
+    """A problem with no lineup ends with a failed done event, and its result raises the SolveError."""
+    async def run() -> tuple[SolveJob, list[dict]]:
+        # With no female swimmers, no lineup can have half its roster female
+        job = SolveJob(_generate_full_meet_solver(STREAMED_SWIMMERS, female_fraction=0)).start()
+        events = await _collect_events(job)
+        with pytest.raises(SolveError, match="INFEASIBLE"):
+            await job.result()
+        return job, events
+
+    job, events = asyncio.run(run())
+    assert job.status == "failed"
+    assert [event["kind"] for event in events] == ["done"]
+    assert events[0]["status"] == "failed"
+    assert events[0]["solution"] is None
+    assert "INFEASIBLE" in events[0]["error"]
@@ -0,0 +1,35 @@
+"""Tests for parsing a whole column of psych sheet entries at once."""
+
+import math
+
+import pytest
+
+from swimmer import parse_entries, parse_entry
+
+ENTRIES = [
+    "Women's 100m Freestyle 52.13",
+    "Men's 1500m Freestyle 14:31.02",
+    "Women's 200m Butterfly 2:05.10",
+    "Men's 50m Breaststroke NT",
+    "Women's 50m Backstroke 27.0",
+]
+
+
+def test_parse_entries_matches_parse_entry() -> None:
+    """Parsing entries as a column gives the same events and times as parsing them one at a time, with NaN for None."""
+    events, times = parse_entries(ENTRIES)
+    parsed = [(event, None if math.isnan(time) else time) for event, time in zip(events, times.tolist(), strict=True)]
+    assert parsed == [parse_entry(entry) for entry in ENTRIES]
+
+
+def test_parse_entries_with_no_entries() -> None:
+    """An empty column gives no events and no times."""
+    events, times = parse_entries([])
+    assert events == []
+    assert times.size == 0
+
+
+def test_parse_entries_rejects_line_breaks() -> None:
+    """An entry with a line break would shift every time after it, so it is rejected."""
+    with pytest.raises(ValueError, match="line breaks"):
+        parse_entries(["Women's 100m Freestyle 52.13\n", "Men's 100m Freestyle 47.00"])
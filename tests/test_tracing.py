@@ -0,0 +1,96 @@
+"""Tests for profiling and measuring the memory of each traced stage on its own."""
+
+import contextlib
+import io
+import itertools
+import pstats
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+from meet import Meet
+from pipeline import INPUT_STAGES, Pipeline
+from schedule_store import ScheduleStore
+from solvers.single_day_solver import SingleDaySolver
+from tracing import tracer
+
+MEET_NAME = "2024 SCM Worlds"
+WRAPPER_SPANS = {"load", "single_day_solver"}
+STAGE_HOLD = 0.2 # Seconds each input stage is held open for
+
+
+@pytest.fixture
+def profile_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Profile every span into a new directory, with the tracer's previous state restored afterwards."""
+    profile_dir = tmp_path / "profiles"
+    profile_dir.mkdir()
+    monkeypatch.setattr(tracer, "enabled", True)
+    monkeypatch.setattr(tracer, "profile_dir", profile_dir)
+    monkeypatch.setattr(tracer, "events", [])
+    return profile_dir
+
+
+@pytest.fixture
+def memory_tracer(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Measure the memory of every span, with the tracer's previous state restored afterwards."""
+    monkeypatch.setattr(tracer, "enabled", True)
+    monkeypatch.setattr(tracer, "memory", True)
+    monkeypatch.setattr(tracer, "events", [])
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    yield
+    if started:
+        tracemalloc.stop()
+
+
+def test_one_profile_per_stage(profile_dir: Path) -> None:
+    """Every stage inside the wrapper spans lineup_optimizer.py records gets a profile of its own."""
+    pipeline = Pipeline(Meet(MEET_NAME, ScheduleStore()))
+    with contextlib.redirect_stdout(io.StringIO()):
+        with tracer.span("load", profile=False):
+            pipeline.run()
+        with tracer.span("single_day_solver", profile=False):
+            SingleDaySolver(pipeline.parser.data, 1).solve()
+
+    stages = [event for event in tracer.events if event["ph"] == "X" and event["name"] not in WRAPPER_SPANS]
+    assert {"pdf_extraction", "swimmer_creation", "seeding", "scoring", "model_build", "solve"} <= {event["name"] for event in stages}
+    assert all("profile" not in event["args"] for event in tracer.events if event["name"] in WRAPPER_SPANS)
+
+    profiles = sorted(profile_dir.glob("*.prof"))
+    assert len(profiles) == len(stages)
+    assert sorted(Path(event["args"]["profile"]) for event in stages) == profiles
+    for event in stages:
+        assert Path(event["args"]["profile"]).name.endswith(f"-{event['name'].replace('_', '-')}.prof")
+        assert pstats.Stats(event["args"]["profile"]).total_calls > 0
+
+
+@pytest.mark.usefixtures("memory_tracer")
+def test_input_stages_dont_overlap_when_measuring_memory() -> None:
+    """The input stages take turns while their memory is measured, so none of them is charged another's allocations."""
+    pipeline = Pipeline(Meet(MEET_NAME, ScheduleStore()))
+    windows = []
+
+    def record(run_stage: Callable[[str | None], None]) -> Callable[[str | None], None]:
+        def run(key: str | None) -> None:
+            start = time.perf_counter()
+            run_stage(key)
+            # Long enough that stages running at the same time would always overlap
+            time.sleep(STAGE_HOLD)
+            windows.append((start, time.perf_counter()))
+        return run
+
+    for stage in ("_run_psych_sheet", "_run_schedule", "_run_base_times"):
+        setattr(pipeline, stage, record(getattr(pipeline, stage)))
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline.run()
+
+    windows.sort()
+    assert len(windows) == len(INPUT_STAGES)
+    for (_, previous_end), (start, _) in itertools.pairwise(windows):
+        assert start >= previous_end
+    measured = {event["name"] for event in tracer.events if "peak_bytes" in event["args"]}
+    assert {"pdf_extraction", "swimmer_creation", "base_times_query"} <= measured
@@ -0,0 +1,41 @@
+"""Tests for precomputing and reading base times from the world record database."""
+
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from wr_database import DB_PATH, get_base_times_from_db, materialize_base_times
+
+BASE_TIMES_QUERY = "SELECT sex, stroke, distance, time_in_seconds FROM base_times WHERE course = ? AND date_num = ?"
+
+
+@pytest.fixture
+def db_copy(tmp_path: Path) -> Path:
+    """Copy the world record database into a directory the test can change."""
+    path = tmp_path / DB_PATH.name
+    shutil.copyfile(DB_PATH, path)
+    return path
+
+
+def test_base_times_lookup_uses_primary_key(db_copy: Path) -> None:
+    """Base times are looked up through the primary key, without an index that only repeats its first columns."""
+    conn = sqlite3.connect(db_copy)
+    with conn:
+        conn.execute("CREATE INDEX base_times_course_date ON base_times (course, date_num)")
+        materialize_base_times(conn)
+    indexes = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'base_times'")]
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {BASE_TIMES_QUERY}", ("LCM", 20240831)).fetchall()
+    conn.close()
+
+    assert indexes == ["sqlite_autoindex_base_times_1"]
+    assert "USING INDEX sqlite_autoindex_base_times_1 (course=? AND date_num=?)" in plan[0][3]
+
+
+def test_relative_db_path(db_copy: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture) -> None:
+    """A database path relative to the working directory reads the same base times as the absolute path."""
+    monkeypatch.chdir(db_copy.parent)
+
+    assert get_base_times_from_db(2024, "SCM", Path(db_copy.name)) == get_base_times_from_db(2024, "SCM", db_copy)
+    assert "base times" in capsys.readouterr().out
@@ -0,0 +1,99 @@
+"""
+Tests for fetching world record pages, against saved pages served by a local HTTP server.
+
+The saved pages in fixtures/wr_pages are rebuilt from the 50m butterfly and backstroke records in swimming.db with
+the markup of the Wikipedia progression pages, along with a category page linking to them.
+"""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+from conftest import FIXTURES_DIR, LocalSite
+
+from wr_database import DB_PATH
+from wr_fetcher import PageFetcher
+from wr_scraper import WR_COLUMNS, get_wr_pages, get_wrs
+
+WR_FIXTURES_DIR = FIXTURES_DIR / "wr_pages"
+WR_PAGE_NAMES = ["50-metres-butterfly", "50-metres-backstroke"]
+LAST_MODIFIED = "Sat, 14 Dec 2024 18:00:00 GMT"
+
+
+@pytest.fixture
+def wr_urls(local_site: LocalSite) -> dict[str, str]:
+    """Serve the saved world record pages, the butterfly page with an ETag and the backstroke page with only a Last-Modified date."""
+    pages = {name: (WR_FIXTURES_DIR / f"{name}.html").read_text(encoding="utf-8") for name in WR_PAGE_NAMES}
+    return {
+        "50-metres-butterfly": local_site.add_page("/wiki/50-metres-butterfly", pages["50-metres-butterfly"], etag='"v1"'),
+        "50-metres-backstroke": local_site.add_page("/wiki/50-metres-backstroke", pages["50-metres-backstroke"], last_modified=LAST_MODIFIED),
+    }
+
+
+def test_unchanged_pages_are_revalidated_and_read_from_the_cache(local_site: LocalSite, wr_urls: dict[str, str], tmp_path: Path) -> None:
+    """The first fetch downloads every page, and a later fetch gets 304s and reads the same pages from disk."""
+    urls = list(wr_urls.values())
+    with PageFetcher(tmp_path) as fetcher:
+        first_pages, first_changed = fetcher.fetch_all(urls)
+
+    assert first_changed == set(urls)
+    assert sorted(status for _, status in local_site.requests) == [200, 200]
+
+    local_site.requests.clear()
+    # A new fetcher only has the disk cache to go on, like the next run of the scraper
+    with PageFetcher(tmp_path) as fetcher:
+        second_pages, second_changed = fetcher.fetch_all(urls)
+
+    assert second_changed == set()
+    assert second_pages == first_pages
+    assert sorted(status for _, status in local_site.requests) == [304, 304]
+
+
+def test_only_changed_pages_are_reported(local_site: LocalSite, wr_urls: dict[str, str], tmp_path: Path) -> None:
+    """A page served with a new ETag is downloaded again and reported as changed, and the other page is not."""
+    urls = list(wr_urls.values())
+    with PageFetcher(tmp_path) as fetcher:
+        fetcher.fetch_all(urls)
+
+    changed_html = (WR_FIXTURES_DIR / "50-metres-butterfly.html").read_text(encoding="utf-8").replace("21.32", "21.30")
+    local_site.add_page("/wiki/50-metres-butterfly", changed_html, etag='"v2"')
+
+    with PageFetcher(tmp_path) as fetcher:
+        pages, changed = fetcher.fetch_all(urls)
+
+    assert changed == {wr_urls["50-metres-butterfly"]}
+    assert pages[wr_urls["50-metres-butterfly"]] == changed_html
+
+
+def test_pages_are_fetched_concurrently(local_site: LocalSite, tmp_path: Path) -> None:
+    """fetch_all has more than one request in flight, but never more than max_workers."""
+    html = (WR_FIXTURES_DIR / "50-metres-butterfly.html").read_text(encoding="utf-8")
+    urls = [local_site.add_page(f"/wiki/page-{index}", html) for index in range(12)]
+    local_site.delay = 0.05
+
+    with PageFetcher(tmp_path, max_workers=4) as fetcher:
+        pages, changed = fetcher.fetch_all(urls)
+
+    assert list(pages) == urls
+    assert changed == set(urls)
+    assert 1 < local_site.max_in_flight <= 4
+
+
+def test_fetched_pages_parse_to_the_stored_records(wr_urls: dict[str, str], tmp_path: Path) -> None:
+    """The category page links to the saved pages, and the fetched pages parse to the records in swimming.db."""
+    category_html = (WR_FIXTURES_DIR / "category.html").read_text(encoding="utf-8")
+    assert [url.rsplit("/", 1)[-1] for url in get_wr_pages(category_html)] == [
+        "World_record_progression_50_metres_backstroke",
+        "World_record_progression_50_metres_butterfly",
+    ]
+
+    with PageFetcher(tmp_path) as fetcher:
+        pages, _ = fetcher.fetch_all(list(wr_urls.values()))
+    rows = [row for url, html in pages.items() for row in get_wrs(url, html)]
+
+    conn = sqlite3.connect(DB_PATH)
+    stored = conn.execute(f"SELECT {", ".join(WR_COLUMNS)} FROM world_records WHERE distance = '50' AND stroke IN ('Butterfly', 'Backstroke')").fetchall()
+    conn.close()
+
+    parsed = [tuple(row[column] for column in WR_COLUMNS) for row in rows]
+    assert sorted(parsed) == sorted(stored)